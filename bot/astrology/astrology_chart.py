@@ -13,6 +13,7 @@ from timezonefinder import TimezoneFinder
 from bot.astrology.exception import AstrologyInvalidInput
 from bot.models.astrology_chart import AstrologyChart as AstrologyChartModel
 from bot.models.user import User
+from bot.social.profile_cache import profile_cache
 
 
 class AstrologyChart():
@@ -21,7 +22,17 @@ class AstrologyChart():
         astrology_chart = await AstrologyChartModel.get_by_user_id(user_id)
         if not astrology_chart:
             return None
+        return self.build_user_chart(astrology_chart)
 
+    def build_user_chart(self, astrology_chart: AstrologyChartModel):
+        """
+        Calculates the chart stored for an user
+
+        :param astrology_chart: User's stored chart data
+        :type astrology_chart: AstrologyChartModel
+        :return: User's chart
+        :rtype: Chart
+        """
         chart_datetime = (
             [
                 astrology_chart.datetime.year,
@@ -73,7 +84,9 @@ class AstrologyChart():
         astrology_chart.latitude = chart.pos.lat
         astrology_chart.longitude = chart.pos.lon
         
-        return await AstrologyChartModel.save(astrology_chart)
+        astrology_chart_id = await AstrologyChartModel.save(astrology_chart)
+        profile_cache.invalidate(int(user_id))
+        return astrology_chart_id
 
     async def _get_lat_lng_from_city_name(self, city_name: str):
         async with Nominatim(
@@ -3,13 +3,12 @@ from copy import deepcopy
 from io import BytesIO
 from itertools import groupby
 
-from PIL import Image, ImageDraw, ImageFont
-
 from bot.card_jitsu.card import Card, Color, Element
 from bot.card_jitsu.deck import Deck
 from bot.card_jitsu.game import Game
 from bot.card_jitsu.player import Player
-from bot.utils import run_cpu_bound_task
+from bot.card_jitsu.rendering import IMAGE_FORMATS, render_hand, render_turn
+from bot.utils import run_rendering_task
 
 
 class Bot():
@@ -28,6 +27,11 @@ class Bot():
             Card(id=26, color=Color.PURPLE, element=Element.WATER, value=4),
             Card(id=81, color=Color.GREEN, element=Element.SNOW, value=10),
         ])
+        self.image_scale = float(os.environ.get("CARD_JITSU_IMAGE_SCALE", '1'))
+        self.image_format = os.environ.get("CARD_JITSU_IMAGE_FORMAT", 'png')
+        self.png_compress_level = int(os.environ.get("CARD_JITSU_PNG_COMPRESS_LEVEL", '6'))
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f'CARD_JITSU_IMAGE_FORMAT must be one of: {", ".join(IMAGE_FORMATS)}')
         
     def new_game(self, user_1, user_2) -> Game:
         player_1 = Player(user_1, Deck(cards=self.starter_deck.cards.copy()))
@@ -48,92 +52,27 @@ class Bot():
         
         return game
     
-    @run_cpu_bound_task
-    def draw_hand(self, user) -> BytesIO:
+    async def draw_hand(self, user) -> BytesIO:
         player, _ = self._find_player_and_game(user)
-        card_width = 910
-        card_height = 1024
-        card_padding = 10
-        final_image = Image.new('RGB', ((card_width + card_padding) * 5, card_height))
-        
-        for index, card in enumerate(player.hand):
-            card_image = Image.open(card.path)
-            card_position = ((card_width + card_padding) * index, 0)
-            final_image.paste(card_image.resize((card_width, card_height)), card_position)
-            
-        bytesio = BytesIO()
-        final_image.save(bytesio, format="png")
-        bytesio.seek(0)
-        return bytesio
+        return await run_rendering_task(render_hand, [card.id for card in player.hand])
     
-    @run_cpu_bound_task
-    def draw_turn(self, game: Game) -> BytesIO:
+    async def draw_turn(self, game: Game) -> BytesIO:
         player_1_card = game.player_1.move
         player_2_card = game.player_2.move
         
         game.score_turn()
         
-        player_1_score = game.player_1.score
-        player_2_score = game.player_2.score
-        
-        image_width = 2730
-        image_height = 2048
-        card_width = 910
-        card_height = 1024
-        final_image = Image.new('RGB', ((image_width, image_height)))
-        
-        card_vertical_pos = 200
-        card_1_image = Image.open(player_1_card.path)
-        if player_2_card > player_1_card:
-            card_1_image = card_1_image.convert("L")
-        card_1_position = (round(card_width * 0.5), card_vertical_pos)
-        final_image.paste(card_1_image.resize((card_width, card_height)), card_1_position)
-        card_2_image = Image.open(player_2_card.path)
-        if player_1_card > player_2_card:
-            card_2_image = card_2_image.convert("L")
-        card_2_position = (round(card_width * 1.5), card_vertical_pos)
-        final_image.paste(card_2_image.resize((card_width, card_height)), card_2_position)
-        
-        score_vertical_pos = round(card_height * 1.4)
-        player_1_score_by_element = {k: list(v) for k, v in groupby(sorted(player_1_score, key=lambda c: c.element), lambda c: c.element)}
-        for elem_index, cards in enumerate(player_1_score_by_element.values()):
-            for color_index, score in reversed(list(enumerate(cards))):
-                score_image = Image.open(score.path)
-                score_position = ((elem_index * 300) + round(card_width * .25), score_vertical_pos + color_index * 75)
-                score_crop = (15, 15, 235, 235)
-                if score.value >= 9:
-                    score_crop = (x + 60 for x in score_crop)
-                final_image.paste(score_image.resize((card_width, card_height)).crop(score_crop), score_position)
-                
-        player_2_score_by_element = {k: list(v) for k, v in groupby(sorted(player_2_score, key=lambda c: c.element), lambda c: c.element)}
-        for elem_index, cards in enumerate(player_2_score_by_element.values()):
-            for color_index, score in reversed(list(enumerate(cards))):
-                score_image = Image.open(score.path)
-                score_position = ((elem_index * 300) + round(card_width * (3 - .25)) - 900, score_vertical_pos + color_index * 75)
-                score_crop = (15, 15, 235, 235)
-                if score.value >= 9:
-                    score_crop = (x + 60 for x in score_crop)
-                final_image.paste(score_image.resize((card_width, card_height)).crop(score_crop), score_position)
-                
-        image_font_title = ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_PROFILE"), size=72)
-        max_user_name_len = 30
-        image_draw = ImageDraw.Draw(final_image)
-        image_draw.text((120, 25), game.player_1.name[:max_user_name_len], fill="#FFF", font=image_font_title)
-        image_draw.text(
-            (image_width - 120 - len(game.player_2.name[:max_user_name_len]) * 42, 25),
-            game.player_2.name[:max_user_name_len], fill="#FFF", font=image_font_title
+        return await run_rendering_task(
+            render_turn,
+            [
+                self._turn_render_info(game.player_1, player_1_card, player_2_card > player_1_card),
+                self._turn_render_info(game.player_2, player_2_card, player_1_card > player_2_card)
+            ],
+            background_key=game.id,
+            scale=self.image_scale,
+            image_format=self.image_format,
+            compress_level=self.png_compress_level
         )
-        if game.player_1.avatar_bytes:
-            image_user_avatar = Image.open(BytesIO(game.player_1.avatar_bytes))
-            final_image.paste(image_user_avatar.resize((200, 200)), (120, 125))
-        if game.player_2.avatar_bytes:
-            image_user_avatar = Image.open(BytesIO(game.player_2.avatar_bytes))
-            final_image.paste(image_user_avatar.resize((200, 200)), (120 + round(card_width * 2.5), 125))
-        
-        bytesio = BytesIO()
-        final_image.save(bytesio, format="png")
-        bytesio.seek(0)
-        return bytesio
         
     def end_game(self, game: Game) -> None:
         del self.games[game.player_1.id]
@@ -145,4 +84,13 @@ class Bot():
             raise Exception('User not in a game')
         
         return game.player_1 if game.player_1.id == user.id else game.player_2, game
-        
+    
+    def _turn_render_info(self, player: Player, card: Card, lost: bool) -> dict:
+        score_by_element = {k: list(v) for k, v in groupby(sorted(player.score, key=lambda c: c.element), lambda c: c.element)}
+        return {
+            "name": player.name,
+            "avatar_bytes": player.avatar_bytes,
+            "card_id": card.id,
+            "lost": lost,
+            "score": [[(score.id, score.value) for score in cards] for cards in score_by_element.values()]
+        }
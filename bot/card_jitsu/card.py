@@ -25,6 +25,10 @@ class Color(Enum):
         return self.value > other.value
 
 
+def card_path(card_id: int) -> str:
+    return os.path.join(os.environ['CARD_JITSU_CARDS_BASE_PATH'], f'{card_id}.png')
+
+
 @dataclass
 class Card():
     id: int
@@ -34,7 +38,7 @@ class Card():
     
     @property
     def path(self):
-        return os.path.join(os.environ['CARD_JITSU_CARDS_BASE_PATH'], f'{self.id}.png')
+        return card_path(self.id)
     
     def __gt__(self, card: 'Card') -> bool:
         return self.element > card.element or (self.element == card.element and self.value > card.value)
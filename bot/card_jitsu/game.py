@@ -1,14 +1,17 @@
 from itertools import groupby
+from uuid import UUID, uuid4
 
 from bot.card_jitsu.card import Element
 from bot.card_jitsu.player import Player
 
 
 class Game():
+    id: UUID
     player_1: Player
     player_2: Player
     
     def __init__(self, player_1: Player, player_2: Player):
+        self.id = uuid4()
         self.player_1 = player_1
         self.player_2 = player_2
         
@@ -0,0 +1,323 @@
+import os
+from collections import OrderedDict
+from hashlib import sha1
+from io import BytesIO
+from threading import Lock
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw
+
+from bot.card_jitsu.card import card_path
+from bot.misc.rendering import load_font
+
+CARD_SIZE = (910, 1024)
+SCORE_CROP = (15, 15, 235, 235)
+HIGH_VALUE_SCORE_CROP = tuple(x + 60 for x in SCORE_CROP)
+SCORE_STACK_OFFSET = 75
+TURN_IMAGE_SIZE = (2730, 2048)
+IMAGE_FORMATS = ['png', 'webp']
+WEBP_QUALITY = 80
+
+
+class CardSpriteAtlas():
+    """
+    Cards' images, decoded and resized once per process
+
+    Every card is kept at the size it is drawn on hands and turns, in color
+    and in grayscale, and as the thumbnail drawn on scores, so rendering
+    only pastes them. Sprites are built the first time they are needed,
+    or beforehand by `load`. Every render gets the same sprite objects,
+    so they must never be drawn on.
+    """
+
+    def __init__(self):
+        self._sprites: Dict[Hashable, Image.Image] = {}
+        self._lock = Lock()
+
+    def card(self, card_id: int, grayscale: bool=False, scale: float=1) -> Image.Image:
+        """
+        Gets card's image at `CARD_SIZE`
+
+        :param card_id: Card id
+        :type card_id: int
+        :param grayscale: Whether to get card's grayscale variant
+        :type grayscale: bool
+        :param scale: Scale applied to `CARD_SIZE`
+        :type scale: float
+        :return: Card sprite, only to be pasted
+        :rtype: Image.Image
+        """
+        card_size = _scale_size(CARD_SIZE, scale)
+        if grayscale:
+            return self._get(
+                ('grayscale', card_path(card_id), card_size),
+                lambda: Image.open(card_path(card_id)).convert("L").resize(card_size)
+            )
+        return self._get(
+            ('card', card_path(card_id), card_size),
+            lambda: Image.open(card_path(card_id)).resize(card_size)
+        )
+
+    def score_thumbnail(self, card_id: int, card_value: int, scale: float=1) -> Image.Image:
+        """
+        Gets card's thumbnail drawn on scores
+
+        :param card_id: Card id
+        :type card_id: int
+        :param card_value: Card value, as high value cards are cropped differently
+        :type card_value: int
+        :param scale: Thumbnail's scale
+        :type scale: float
+        :return: Thumbnail sprite, only to be pasted
+        :rtype: Image.Image
+        """
+        score_crop = HIGH_VALUE_SCORE_CROP if card_value >= 9 else SCORE_CROP
+
+        def build():
+            thumbnail = self.card(card_id).crop(score_crop)
+            if scale != 1:
+                thumbnail = thumbnail.resize(_scale_size(thumbnail.size, scale), Image.LANCZOS)
+            return thumbnail
+
+        return self._get(('score', card_path(card_id), score_crop, scale), build)
+
+    def load(self, cards: Iterable[tuple], scale: float=1):
+        """
+        Builds every sprite of given cards
+
+        :param cards: Cards' id and value
+        :type cards: Iterable[tuple]
+        :param scale: Sprites' scale
+        :type scale: float
+        """
+        for card_id, card_value in cards:
+            self.card(card_id, scale=scale)
+            self.card(card_id, grayscale=True, scale=scale)
+            self.score_thumbnail(card_id, card_value, scale=scale)
+
+    def clear(self):
+        """
+        Drops every sprite
+        """
+        with self._lock:
+            self._sprites.clear()
+
+    def _get(self, key: Hashable, build: Callable[[], Image.Image]) -> Image.Image:
+        with self._lock:
+            sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = build()
+            sprite.load()
+            with self._lock:
+                sprite = self._sprites.setdefault(key, sprite)
+        return sprite
+
+
+card_sprites = CardSpriteAtlas()
+
+
+def render_hand(card_ids: List[int]) -> BytesIO:
+    """
+    Renders a player's hand
+
+    :param card_ids: Ids of cards in hand
+    :type card_ids: List[int]
+    :return: Image's bytesIO
+    :rtype: BytesIO
+    """
+    card_width, card_height = CARD_SIZE
+    card_padding = 10
+    final_image = Image.new('RGB', ((card_width + card_padding) * 5, card_height))
+
+    for index, card_id in enumerate(card_ids):
+        card_position = ((card_width + card_padding) * index, 0)
+        final_image.paste(card_sprites.card(card_id), card_position)
+
+    bytesio = BytesIO()
+    final_image.save(bytesio, format="png")
+    bytesio.seek(0)
+    return bytesio
+
+
+def render_turn(players: List[dict], background_key: Optional[Hashable]=None, scale: float=1,
+                image_format: str='png', compress_level: int=6) -> BytesIO:
+    """
+    Renders both players' cards played on a turn and their scores
+
+    Each player is described by a dict with their `name`, `avatar_bytes`,
+    played `card_id`, whether their card `lost` and their `score`, which
+    lists `(card_id, value)` of scored cards grouped by element.
+
+    :param players: Player 1 and player 2 info
+    :type players: List[dict]
+    :param background_key: Key under which image's background is cached, such as the game's.
+        Background is rendered from scratch if not given
+    :type background_key: Optional[Hashable]
+    :param scale: Output image's scale. Image is drawn at that scale rather than resized
+    :type scale: float
+    :param image_format: Output image's format, either png or webp
+    :type image_format: str
+    :param compress_level: PNG compression level, from 0 (fastest) to 9 (smallest)
+    :type compress_level: int
+    :return: Image's bytesIO
+    :rtype: BytesIO
+    """
+    card_width, card_height = CARD_SIZE
+    final_image = turn_backgrounds.get(background_key, players, scale)
+
+    card_vertical_pos = 200
+    card_horizontal_positions = [round(card_width * 0.5), round(card_width * 1.5)]
+    for player, card_horizontal_pos in zip(players, card_horizontal_positions):
+        card_image = card_sprites.card(player['card_id'], grayscale=player['lost'], scale=scale)
+        final_image.paste(card_image, _scale_size((card_horizontal_pos, card_vertical_pos), scale))
+
+    bytesio = BytesIO()
+    if image_format == 'webp':
+        final_image.save(bytesio, format="webp", quality=WEBP_QUALITY, method=0)
+    else:
+        final_image.save(bytesio, format="png", compress_level=compress_level)
+    bytesio.seek(0)
+    return bytesio
+
+
+class TurnBackgroundCache():
+    """
+    Bounded LRU cache of turn images' backgrounds, which hold players' names,
+    avatars and scores
+
+    Scores only grow during a game, so a cached background is updated by
+    drawing newly scored cards only. It is rendered again from scratch if
+    players' names or avatars change or if previously drawn scores moved.
+    The cache keeps its own backgrounds and hands out copies, on which cards
+    played on the turn are drawn.
+
+    :param max_entries: Max number of backgrounds kept
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries: int=8):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[tuple, list, Image.Image]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Optional[Hashable], players: List[dict], scale: float=1) -> Image.Image:
+        """
+        Gets background for given players, updating cached one
+
+        :param key: Background's key. Background is not cached if not given
+        :type key: Optional[Hashable]
+        :param players: Player 1 and player 2 info, as given to `render_turn`
+        :type players: List[dict]
+        :param scale: Background's scale
+        :type scale: float
+        :return: Background image, which can be drawn on
+        :rtype: Image.Image
+        """
+        if key is None:
+            return _render_turn_background(players, scale)
+        header = (scale,) + tuple(
+            (player['name'], sha1(player['avatar_bytes'] or b'').hexdigest()) for player in players)
+        scores = [[tuple(cards) for cards in player['score']] for player in players]
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        new_cards = entry and entry[0] == header and [
+            _scored_cards_added(previous_score, score) for previous_score, score in zip(entry[1], scores)
+        ]
+        if new_cards and None not in new_cards:
+            background = entry[2]
+            _draw_scored_cards(background, new_cards, scale)
+        else:
+            background = _render_turn_background(players, scale)
+
+        with self._lock:
+            self._entries[key] = (header, scores, background)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return background.copy()
+
+    def clear(self):
+        """
+        Drops every background
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def _render_turn_background(players: List[dict], scale: float=1) -> Image.Image:
+    card_width, _ = CARD_SIZE
+    final_image = Image.new('RGB', _scale_size(TURN_IMAGE_SIZE, scale))
+    _draw_scored_cards(final_image, [
+        [(elem_index, color_index, card)
+            for elem_index, cards in enumerate(player['score'])
+            for color_index, card in enumerate(cards)]
+        for player in players
+    ], scale)
+
+    image_font_title = load_font(os.environ.get("TRUETYPE_FONT_FOR_PROFILE"), max(round(72 * scale), 1))
+    max_user_name_len = 30
+    image_draw = ImageDraw.Draw(final_image)
+    player_1_name = players[0]['name'][:max_user_name_len]
+    player_2_name = players[1]['name'][:max_user_name_len]
+    image_draw.text(_scale_size((120, 25), scale), player_1_name, fill="#FFF", font=image_font_title)
+    image_draw.text(
+        _scale_size((TURN_IMAGE_SIZE[0] - 120 - len(player_2_name) * 42, 25), scale),
+        player_2_name, fill="#FFF", font=image_font_title
+    )
+    avatar_positions = [(120, 125), (120 + round(card_width * 2.5), 125)]
+    for player, avatar_position in zip(players, avatar_positions):
+        if player['avatar_bytes']:
+            image_user_avatar = Image.open(BytesIO(player['avatar_bytes']))
+            final_image.paste(
+                image_user_avatar.resize(_scale_size((200, 200), scale)), _scale_size(avatar_position, scale))
+    return final_image
+
+
+def _draw_scored_cards(image: Image.Image, players_cards: List[List[tuple]], scale: float=1):
+    """
+    Draws scored cards, given per player as `(elem_index, color_index, (card_id, value))`.
+    Cards of the same element are stacked, each one partially covering the
+    next one, so only the part of a card not covered by the previous one is drawn.
+    """
+    card_width, card_height = CARD_SIZE
+    score_vertical_pos = round(card_height * 1.4 * scale)
+    score_horizontal_positions = [round(card_width * .25), round(card_width * (3 - .25)) - 900]
+    score_stack_offset = round(SCORE_STACK_OFFSET * scale)
+    for player_cards, score_horizontal_pos in zip(players_cards, score_horizontal_positions):
+        for elem_index, color_index, (card_id, card_value) in player_cards:
+            score_image = card_sprites.score_thumbnail(card_id, card_value, scale)
+            covered_height = min(max(score_image.height - score_stack_offset, 0), score_image.height) if color_index else 0
+            score_position = (
+                round(((elem_index * 300) + score_horizontal_pos) * scale),
+                score_vertical_pos + color_index * score_stack_offset + covered_height
+            )
+            image.paste(score_image.crop((0, covered_height, score_image.width, score_image.height)), score_position)
+
+
+def _scale_size(size: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    return tuple(round(value * scale) for value in size)
+
+
+def _scored_cards_added(previous_score: List[tuple], score: List[tuple]) -> Optional[List[tuple]]:
+    """
+    Gets cards added to `previous_score` to get to `score`, as
+    `(elem_index, color_index, card)`, or None if any card has moved
+    """
+    if len(score) < len(previous_score):
+        return None
+    added_cards = []
+    for elem_index, cards in enumerate(score):
+        previous_cards = previous_score[elem_index] if elem_index < len(previous_score) else ()
+        if cards[:len(previous_cards)] != previous_cards:
+            return None
+        added_cards += [
+            (elem_index, color_index, cards[color_index])
+            for color_index in range(len(previous_cards), len(cards))
+        ]
+    return added_cards
+
+
+load_dotenv()
+turn_backgrounds = TurnBackgroundCache(
+    max_entries=int(os.environ.get("CARD_JITSU_BACKGROUND_CACHE_SIZE", '8')))
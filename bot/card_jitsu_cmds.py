@@ -77,7 +77,7 @@ class CardJitsuCmds(app_commands.Group):
             return
         
         turn_img = await self.bot.draw_turn(game)
-        await interaction.followup.send(file=discord.File(turn_img, 'turn.png'), ephemeral=False)
+        await interaction.followup.send(file=discord.File(turn_img, f'turn.{self.bot.image_format}'), ephemeral=False)
         if game.is_game_over():
             await interaction.followup.send(i(interaction, "Game over! {user} wins").format(user=game.winner.name))
             self.bot.end_game(game)
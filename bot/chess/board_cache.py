@@ -0,0 +1,161 @@
+import logging
+import os
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from typing import Dict, Hashable, Optional
+
+from dotenv import load_dotenv
+
+
+class BoardImageCache():
+    """
+    Bounded LRU cache of rendered board images
+
+    Images are kept in memory up to `max_entries` and, if `disk_path` is given,
+    are also written to that directory so they survive evictions and restarts.
+    Safe to be used by multiple rendering threads at once.
+
+    :param max_entries: Max number of images kept in memory
+    :type max_entries: int
+    :param disk_path: Directory for the on-disk tier. Disabled if not given
+    :type disk_path: str
+    :param max_disk_entries: Max number of images kept on disk
+    :type max_disk_entries: int
+    """
+
+    DISK_PRUNE_INTERVAL = 64
+
+    def __init__(self, max_entries: int=512, disk_path: Optional[str]=None, max_disk_entries: int=10000):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._lock = Lock()
+        self._disk_writes = 0
+        if self.disk_path:
+            os.makedirs(self.disk_path, exist_ok=True)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Gets cached image for given key, promoting it to most recently used
+
+        :param key: Rendering parameters
+        :type key: Hashable
+        :return: Image bytes or None if not cached
+        :rtype: Optional[bytes]
+        """
+        with self._lock:
+            image_bytes = self._entries.get(key)
+            if image_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image_bytes
+
+        image_bytes = self._read_from_disk(key)
+        with self._lock:
+            if image_bytes is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, image_bytes)
+            return image_bytes
+
+    def put(self, key: Hashable, image_bytes: bytes):
+        """
+        Caches image for given key
+
+        :param key: Rendering parameters
+        :type key: Hashable
+        :param image_bytes: Rendered image
+        :type image_bytes: bytes
+        """
+        with self._lock:
+            self._store(key, image_bytes)
+        self._write_to_disk(key, image_bytes)
+
+    def clear(self):
+        """
+        Clears in-memory images and resets counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache hit and miss counters
+
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, image_bytes: bytes):
+        self._entries[key] = image_bytes
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_file_path(self, key: Hashable) -> str:
+        return os.path.join(self.disk_path, f'{sha1(repr(key).encode()).hexdigest()}.png')
+
+    def _read_from_disk(self, key: Hashable) -> Optional[bytes]:
+        if not self.disk_path:
+            return None
+        try:
+            with open(self._disk_file_path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.warning(e)
+            return None
+
+    def _write_to_disk(self, key: Hashable, image_bytes: bytes):
+        if not self.disk_path:
+            return
+        file_path = self._disk_file_path(key)
+        try:
+            temp_file_path = f'{file_path}.{os.getpid()}.tmp'
+            with open(temp_file_path, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            logging.warning(e)
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            should_prune = self._disk_writes % self.DISK_PRUNE_INTERVAL == 0
+        if should_prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            files = [entry for entry in os.scandir(self.disk_path) if entry.name.endswith('.png')]
+            if len(files) <= self.max_disk_entries:
+                return
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:len(files) - self.max_disk_entries]:
+                os.remove(entry.path)
+        except OSError as e:
+            logging.warning(e)
+
+
+load_dotenv()
+board_cache = BoardImageCache(
+    max_entries=int(os.environ.get("CHESS_BOARD_CACHE_SIZE", '512')),
+    disk_path=os.environ.get("CHESS_BOARD_CACHE_PATH") or None
+)
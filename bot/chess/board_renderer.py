@@ -0,0 +1,197 @@
+import os
+from functools import lru_cache
+from io import BytesIO
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from cairosvg import svg2png
+from PIL import Image, ImageDraw
+
+import chess
+import chess.svg
+
+BOARD_MARGIN = 15
+SQUARE_SIZE = chess.svg.SQUARE_SIZE
+BOARD_SIZE = 8 * SQUARE_SIZE + 2 * BOARD_MARGIN
+
+BoardColors = Tuple[str, str, str, str]
+
+
+def board_css(colors: BoardColors) -> str:
+    """
+    Builds the CSS used to paint board squares
+
+    :param colors: Light, dark, light last move and dark last move square colors
+    :type colors: BoardColors
+    :return: CSS stylesheet
+    :rtype: str
+    """
+    return """
+    .square.light {
+        fill: %s;
+    }
+    .square.dark {
+        fill: %s;
+    }
+    .square.light.lastmove {
+        fill: %s;
+    }
+    .square.dark.lastmove {
+        fill: %s;
+    }
+    """ % colors
+
+
+class SvgBoardRenderer():
+    """
+    Renders boards by rasterising python-chess' SVG through Cairo
+    """
+
+    name = 'svg'
+
+    def render(self, board: chess.BaseBoard, lastmove: Optional[chess.Move],
+               colors: BoardColors, size: Optional[int]=None) -> bytes:
+        """
+        Renders given board as a PNG image
+
+        :param board: Board to be rendered
+        :type board: chess.BaseBoard
+        :param lastmove: Move to be highlighted
+        :type lastmove: Optional[chess.Move]
+        :param colors: Square colors, as returned by `Chess._board_colors`
+        :type colors: BoardColors
+        :param size: Image width and height in pixels. Defaults to the SVG's own size
+        :type size: Optional[int]
+        :return: PNG image's bytes
+        :rtype: bytes
+        """
+        return svg2png(bytestring=chess.svg.board(
+            board=board, lastmove=lastmove, style=board_css(colors), size=size))
+
+
+class PillowBoardRenderer():
+    """
+    Renders boards by pasting pre-rasterised sprites with Pillow
+
+    The empty board (frame, coordinates and squares) and each piece are rasterised
+    through Cairo only once per color schema and size. Every board afterwards is
+    composed from those sprites, which is much cheaper than rasterising a full SVG.
+    """
+
+    name = 'pillow'
+
+    def __init__(self):
+        self._lock = Lock()
+        self._empty_boards: Dict[Tuple[BoardColors, int], Image.Image] = {}
+        self._piece_sprites: Dict[Tuple[str, int], Image.Image] = {}
+
+    def render(self, board: chess.BaseBoard, lastmove: Optional[chess.Move],
+               colors: BoardColors, size: Optional[int]=None) -> bytes:
+        """
+        Renders given board as a PNG image
+
+        :param board: Board to be rendered
+        :type board: chess.BaseBoard
+        :param lastmove: Move to be highlighted
+        :type lastmove: Optional[chess.Move]
+        :param colors: Square colors, as returned by `Chess._board_colors`
+        :type colors: BoardColors
+        :param size: Image width and height in pixels. Defaults to the SVG's own size
+        :type size: Optional[int]
+        :return: PNG image's bytes
+        :rtype: bytes
+        """
+        size = size or BOARD_SIZE
+        edges = _square_edges(size)
+        image = self._empty_board(colors, size).copy()
+
+        if lastmove:
+            draw = ImageDraw.Draw(image)
+            for square in {lastmove.from_square, lastmove.to_square}:
+                x0, y0, x1, y1 = _square_box(square, edges)
+                is_light = bool(chess.BB_LIGHT_SQUARES & chess.BB_SQUARES[square])
+                draw.rectangle((x0, y0, x1 - 1, y1 - 1), fill=colors[2] if is_light else colors[3])
+
+        for square, piece in board.piece_map().items():
+            x0, y0, x1, y1 = _square_box(square, edges)
+            sprite = self._piece_sprite(piece.symbol(), x1 - x0)
+            image.paste(sprite, (x0, y0), sprite)
+
+        image_bytes = BytesIO()
+        image.save(image_bytes, format='PNG')
+        return image_bytes.getvalue()
+
+    def _empty_board(self, colors: BoardColors, size: int) -> Image.Image:
+        with self._lock:
+            empty_board = self._empty_boards.get((colors, size))
+        if empty_board is None:
+            empty_board = Image.open(BytesIO(svg2png(bytestring=chess.svg.board(
+                board=None, style=board_css(colors), size=size)))).convert('RGBA')
+            with self._lock:
+                self._empty_boards[(colors, size)] = empty_board
+        return empty_board
+
+    def _piece_sprite(self, symbol: str, size: int) -> Image.Image:
+        with self._lock:
+            sprite = self._piece_sprites.get((symbol, size))
+        if sprite is None:
+            sprite = Image.open(BytesIO(svg2png(bytestring=chess.svg.piece(
+                chess.Piece.from_symbol(symbol), size=size)))).convert('RGBA')
+            with self._lock:
+                self._piece_sprites[(symbol, size)] = sprite
+        return sprite
+
+
+@lru_cache(maxsize=32)
+def _square_edges(size: int) -> List[int]:
+    scale = size / BOARD_SIZE
+    return [round((BOARD_MARGIN + i * SQUARE_SIZE) * scale) for i in range(9)]
+
+
+def _square_box(square: chess.Square, edges: List[int]) -> Tuple[int, int, int, int]:
+    file_index = chess.square_file(square)
+    row_index = 7 - chess.square_rank(square)
+    return edges[file_index], edges[row_index], edges[file_index + 1], edges[row_index + 1]
+
+
+BOARD_RENDERERS = {
+    SvgBoardRenderer.name: SvgBoardRenderer,
+    PillowBoardRenderer.name: PillowBoardRenderer
+}
+
+
+def build_board_renderer(name: Optional[str]=None):
+    """
+    Builds board renderer by its name. Reads `CHESS_BOARD_RENDERER`
+    if no name is given, defaulting to the SVG renderer.
+
+    :param name: Either `svg` or `pillow`
+    :type name: Optional[str]
+    :return: Board renderer
+    :rtype: Union[SvgBoardRenderer, PillowBoardRenderer]
+    :raises ValueError: Unknown renderer name
+    """
+    name = name or os.environ.get("CHESS_BOARD_RENDERER", SvgBoardRenderer.name)
+    try:
+        return BOARD_RENDERERS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown chess board renderer: {name}')
+
+
+@lru_cache(maxsize=None)
+def _get_board_renderer(name: str):
+    return build_board_renderer(name)
+
+
+def get_board_renderer(name: Optional[str]=None):
+    """
+    Gets board renderer shared by the whole process, building it on first use.
+    Reads `CHESS_BOARD_RENDERER` if no name is given.
+
+    :param name: Either `svg` or `pillow`
+    :type name: Optional[str]
+    :return: Board renderer
+    :rtype: Union[SvgBoardRenderer, PillowBoardRenderer]
+    :raises ValueError: Unknown renderer name
+    """
+    return _get_board_renderer(name or os.environ.get("CHESS_BOARD_RENDERER", SvgBoardRenderer.name))
@@ -1,29 +1,32 @@
+import asyncio
 import logging
 import os
 from io import BytesIO
-from math import copysign, exp, floor, log, pow, sqrt
+from math import copysign, exp, log
 from typing import List, Optional, Tuple
 
-import asyncssh
-from cairosvg import svg2png
-from PIL import Image
-
 import chess
 import chess.engine
-import chess.svg
 from chess.pgn import Game as ChessGame
 
-from bot.chess.exceptions import (GameAlreadyInProgress, GameNotFound, 
-                                InvalidMove, MultipleGamesAtOnce, NoGamesWithPlayer)
+from bot.chess.board_cache import BoardImageCache
+from bot.chess.board_renderer import BoardColors, get_board_renderer
+from bot.chess.engine_pool import EnginePool
+from bot.chess.exceptions import (EngineBusy, GameAlreadyInProgress, GameNotFound, 
+                                InvalidMove, MultipleGamesAtOnce, NoGamesWithPlayer,
+                                SequenceTooLong)
 from bot.chess.game import Game
+from bot.chess.game_registry import GameRegistry
+from bot.chess.rendering import (MAX_BOARDS_PER_MOSAIC, mosaic_layout, render_board,
+                                 render_boards_mosaic, render_sequence_gif)
 from bot.models.chess_game import ChessGame as ChessGameModel
-from bot.utils import convert_users_to_players, paginate, run_cpu_bound_task
+from bot.utils import convert_users_to_players, paginate, run_rendering_task
 
 
 class Chess():
 
     def __init__(self):
-        self.games = []
+        self.games = GameRegistry()
         self.stockfish_path = os.environ.get("STOCKFISH_PATH_EXE", '')
         self.stockfish_limit = {
             "time": int(os.environ.get("STOCKFISH_TIME_LIMIT", '5')),
@@ -36,6 +39,28 @@ class Chess():
             "port": int(os.environ.get("STOCKFISH_SSH_PORT", '22')),
             "known_hosts": None
         }
+        self.engine_pool = EnginePool(
+            self.stockfish_path,
+            size=int(os.environ.get("STOCKFISH_POOL_SIZE", '2')),
+            max_queue=int(os.environ.get("STOCKFISH_MAX_QUEUE", '20')),
+            ssh_options=self.stockfish_ssh if self.stockfish_ssh["host"] else None
+        )
+        self.board_renderer = get_board_renderer()
+        self.mosaic_cache = BoardImageCache(max_entries=int(os.environ.get("CHESS_MOSAIC_CACHE_SIZE", '16')))
+        self.gif_max_moves = int(os.environ.get("CHESS_GIF_MAX_MOVES", '40'))
+        self.gif_max_bytes = int(os.environ.get("CHESS_GIF_MAX_BYTES", '8000000'))
+        self.gif_colors = int(os.environ.get("CHESS_GIF_COLORS", '64'))
+
+    @property
+    def games(self) -> GameRegistry:
+        """
+        Ongoing games
+        """
+        return self._games
+
+    @games.setter
+    def games(self, games: List[Game]):
+        self._games = games if isinstance(games, GameRegistry) else GameRegistry(games)
 
     async def load_games(self) -> List[Game]:
         """
@@ -45,12 +70,13 @@ class Chess():
         :rtype: List[Games]
         """
         try:
+            await self.save_games()
             chess_games_models = await ChessGameModel.get_all_ongoing_games()
             self.games = [Game.from_chess_game_model(x) for x in chess_games_models]
         except Exception as e:
             logging.warning(e, exc_info=True)
         finally:
-            return self.games
+            return list(self.games)
 
     async def get_game_by_id(self, chess_game_id: str) -> Game:
         """
@@ -72,10 +98,9 @@ class Chess():
 
     def new_game(self, user1, user2, color_schema: str=None, cpu_level: int=None) -> Game:
         player1, player2 = convert_users_to_players(user1, user2)
-        current_players_pairs = map(lambda x: [x.player1, x.player2], self.games)
-        given_players_pairs = [player1, player2]
+        current_games = self.games.find_by_players(player1.id, player2.id)
 
-        if given_players_pairs in current_players_pairs:
+        if any(g.player1 == player1 and g.player2 == player2 for g in current_games):
             raise GameAlreadyInProgress()
 
         game = Game()
@@ -106,13 +131,14 @@ class Chess():
         :raises GameNotFound: No game with given user and other_user was found
         """
         player, other_player = convert_users_to_players(user, other_user)
-        game = [g for g in self.games if g.current_player == player]
+        game = self.games.find_by_current_player(player.id)
         if game == []:
             raise NoGamesWithPlayer()
         if len(game) > 1:
             if not other_player:
                 raise MultipleGamesAtOnce(number_of_games=len(game))
-            game = [g for g in game if set([player.id, other_player.id]) == set([g.player1.id, g.player2.id])]
+            game = [g for g in self.games.find_by_players(player.id, other_player.id)
+                    if g.current_player == player]
             if game == []:
                 raise GameNotFound()
         return game[0]
@@ -133,18 +159,24 @@ class Chess():
             raise InvalidMove()
         game.board.push(chess_move)
 
-        game.current_player = game.player1 if game.current_player == game.player2 else game.player2
+        self.games.set_current_player(
+            game, game.player1 if game.current_player == game.player2 else game.player2)
 
         if self.is_pve_game(game) and not self.is_game_over(game):
-            stockfish_result = await self._play_move(game)
+            try:
+                stockfish_result = await self._play_move(game)
+            except EngineBusy:
+                game.board.pop()
+                self.games.set_current_player(game, game.player1)
+                raise
             game.board.push(stockfish_result.move)
-            game.current_player = game.player1
+            self.games.set_current_player(game, game.player1)
         
         if self.is_game_over(game):
             game.result = game.board.result(claim_draw=True)
             self.games.remove(game)
             
-        await game.save()
+        await self.games.save(game)
         return game
 
     def is_game_over(self, game: Game) -> bool:
@@ -171,16 +203,26 @@ class Chess():
         """
         board_png_bytes = self.build_png_board(game)
         game.result = '0-1' if game.board.turn == chess.WHITE else '1-0'
-        await game.save()
+        await self.games.save(game)
         self.games.remove(game)
         return game
 
     async def save_games(self):
         """
-        Save all ongoing games into database
+        Save all ongoing games into database, including moves
+        not yet written
         """
         for game in self.games:
-            await game.save()
+            await self.games.save(game, force=True)
+
+    async def close(self):
+        """
+        Writes pending moves and shuts down pooled chess engines
+        """
+        try:
+            await self.save_games()
+        finally:
+            await self.engine_pool.close()
 
     def generate_pgn(self, game: Game) -> str:
         """
@@ -204,41 +246,40 @@ class Chess():
             result += f'Game id: `{game.id}`'
         return result
 
-    @run_cpu_bound_task
-    def get_all_boards_png(self, page: int=0) -> BytesIO:
+    async def get_all_boards_png(self, page: int=0) -> BytesIO:
         """
         Gets an image showing all ongoing games' current position.
         If there are more than 9 games being played at once, this
         command is paginated.
 
+        Boards are rendered concurrently at their final size. Pages are cached
+        by their boards' position, so a page is only rendered again once one of
+        its games has moved or games were added or removed.
+
         :param page: Page index (defaults to 0)
         :type page: int
         :return: Image's bytesIO
         :rtype: BytesIO
         """
-        full_width = 1200
-        max_number_of_board_per_page = 9
-
         if not self.games:
             return None
 
-        final_image = Image.new('RGB', (full_width, full_width))
-        next_perfect_sqr = lambda n: int(pow(floor(sqrt(n)) + 1, 2)) if n%n**0.5 != 0 else n
-        number_of_boards_sqrt = sqrt(min(next_perfect_sqr(len(self.games)), max_number_of_board_per_page))
-        board_width = int(full_width / number_of_boards_sqrt)
-        start_page_position = max_number_of_board_per_page * page
-        paginated_games, _ = paginate(self.games, page, max_number_of_board_per_page)
-        
-        for index, game in enumerate(paginated_games):
-            board_png = self.build_png_board(game)
-            board_image = Image.open(board_png)
-            board_position = (board_width * int(index % number_of_boards_sqrt), board_width * int(floor(index / number_of_boards_sqrt)))
-            final_image.paste(board_image.resize((board_width, board_width)), board_position)
-
-        bytesio = BytesIO()
-        final_image.save(bytesio, format="png")
-        bytesio.seek(0)
-        return bytesio
+        paginated_games, _ = paginate(self.games, page, MAX_BOARDS_PER_MOSAIC)
+        number_of_columns, tile_size = mosaic_layout(len(self.games))
+        boards = tuple(self._board_render_args(game) for game in paginated_games)
+        cache_key = (boards, tile_size, self.board_renderer.name)
+        png_bytes = self.mosaic_cache.get(cache_key)
+        if png_bytes is None:
+            unique_boards = list(dict.fromkeys(boards))
+            rendered_tiles = await asyncio.gather(*[
+                run_rendering_task(render_board, board_fen, lastmove_uci, colors, tile_size, self.board_renderer.name)
+                for board_fen, lastmove_uci, colors in unique_boards
+            ])
+            tiles_by_board = dict(zip(unique_boards, rendered_tiles))
+            png_bytes = await run_rendering_task(
+                render_boards_mosaic, [tiles_by_board[board] for board in boards], number_of_columns, tile_size)
+            self.mosaic_cache.put(cache_key, png_bytes)
+        return BytesIO(png_bytes)
 
     def is_pve_game(self, game: Game) -> bool:
         """
@@ -274,44 +315,30 @@ class Chess():
         if not self.is_stockfish_enabled():
             return eval_dict
         
-        analysis = await self._eval_game(game)
+        try:
+            analysis = await self._eval_game(game)
+        except EngineBusy:
+            return eval_dict
         eval_dict["blunder"] = self._is_last_move_blunder(game, analysis)
         eval_dict["mate_in"] = analysis["score"].relative.mate()
         return eval_dict
     
-    def build_png_board(self, game: Game) -> BytesIO:
+    def build_png_board(self, game: Game, size: Optional[int]=None) -> BytesIO:
         """
-        Builds a PNG for current given game's board position
+        Builds a PNG for current given game's board position.
+        Rendered images are cached by position, last move, colors and size.
 
         :param game: Game with position to be displayed
         :type game: Game
+        :param size: Image width and height in pixels. Defaults to the SVG's own size
+        :type size: Optional[int]
         :return: PNG image's bytes
         :rtype: BytesIO
         """
-        try:
-            last_move = game.board.peek()
-        except IndexError:
-            last_move = None
-        colors = self._board_colors(game.color_schema)
-        css = """
-        .square.light {
-            fill: %s;
-        }
-        .square.dark {
-            fill: %s;
-        }
-        .square.light.lastmove {
-            fill: %s;
-        }
-        .square.dark.lastmove {
-            fill: %s;
-        }
-        """ % colors
-        png_bytes = svg2png(bytestring=chess.svg.board(board=game.board, lastmove=last_move, style=css))
-        return BytesIO(png_bytes)
+        board_fen, lastmove_uci, colors = self._board_render_args(game)
+        return BytesIO(render_board(board_fen, lastmove_uci, colors, size, self.board_renderer.name))
 
-    @run_cpu_bound_task
-    def build_animated_sequence_gif(self, game: Game, game_move: int, sequence: list) -> BytesIO:
+    async def build_animated_sequence_gif(self, game: Game, game_move: int, sequence: list) -> BytesIO:
         """
         Builds an animated GIF for illustrating a given game's possible variation
 
@@ -321,9 +348,14 @@ class Chess():
         :type game_move: int
         :param sequence: Variation's sequence of move
         :type sequence: str[]
-        :return: Animated gif's bytesIO
+        :return: Animated gif's bytesIO or None if sequence has an invalid move
         :rtype: BytesIO
+        :raises SequenceTooLong: Sequence has more moves than allowed
+        :raises GifTooLarge: GIF would be larger than allowed
         """
+        if len(sequence) > self.gif_max_moves:
+            raise SequenceTooLong(self.gif_max_moves)
+
         game_moves = game.board.move_stack
         new_board = chess.Board()
         new_game = Game()
@@ -332,27 +364,17 @@ class Chess():
         for move in game_moves[:game_move]:
             new_board.push(move)
         
-        first_gif_frame = Image.open(self.build_png_board(new_game))
-        gif_frames = []
+        positions = [self._board_render_args(new_game)[:2]]
         for variant_move in sequence:
             variant_chess_move = self._parse_str_move(new_game, variant_move)
             if not variant_chess_move:
                 return
             new_board.push(variant_chess_move)
-            gif_frame = Image.open(self.build_png_board(new_game))
-            gif_frames.append(gif_frame)
+            positions.append(self._board_render_args(new_game)[:2])
         
-        bytesio = BytesIO()
-        first_gif_frame.save(
-            bytesio,
-            format='gif',
-            save_all=True,
-            append_images=gif_frames,
-            duration=1000,
-            loop=0
-        )
-        bytesio.seek(0)
-        return bytesio
+        return await run_rendering_task(
+            render_sequence_gif, positions, self._board_colors(game.color_schema), self.board_renderer.name,
+            gif_colors=self.gif_colors, max_bytes=self.gif_max_bytes)
     
     def _parse_str_move(self, game: Game, move: str) -> Optional[chess.Move]:
         try:
@@ -387,35 +409,20 @@ class Chess():
 
         return normalizer(evaluation)
     
-    async def _eval_game(self, game: Game):
+    async def _eval_game(self, game: Game) -> chess.engine.InfoDict:
         limit = chess.engine.Limit(**self.stockfish_limit)
-        if self.stockfish_ssh["host"]:
-            async with asyncssh.connect(**self.stockfish_ssh) as conn:
-                _channel, engine = await conn.create_subprocess(chess.engine.UciProtocol, self.stockfish_path)
-                await engine.initialize()
-                return await engine.analyse(game.board, limit)
-        else:
-            try:
-                transport, engine = await chess.engine.popen_uci(self.stockfish_path)
-                return await engine.analyse(game.board, limit)
-            finally:
-                await engine.quit()
-                transport.close()
+        return await self.engine_pool.analyse(game.board, limit)
 
-    async def _play_move(self, game: Game) -> chess.engine.InfoDict:
+    async def _play_move(self, game: Game) -> chess.engine.PlayResult:
         limit = chess.engine.Limit(**self.stockfish_limit)
-        if self.stockfish_ssh["host"]:
-            async with asyncssh.connect(**self.stockfish_ssh) as conn:
-                _channel, engine = await conn.create_subprocess(chess.engine.UciProtocol, self.stockfish_path)
-                await engine.initialize()
-                return await engine.play(game.board, limit, options={'Skill level': game.cpu_level})
-        else:
-            try:
-                transport, engine = await chess.engine.popen_uci(self.stockfish_path)
-                return await engine.play(game.board, limit, options={'Skill level': game.cpu_level})
-            finally:
-                await engine.quit()
-                transport.close()
+        return await self.engine_pool.play(game.board, limit, options={'Skill level': game.cpu_level})
+
+    def _board_render_args(self, game: Game) -> Tuple[str, Optional[str], BoardColors]:
+        try:
+            last_move = game.board.peek()
+        except IndexError:
+            last_move = None
+        return game.board.board_fen(), last_move and last_move.uci(), self._board_colors(game.color_schema)
 
     def _board_colors(self, color_schema: str) -> Tuple[str, str, str, str]:
         colors = {
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+import asyncssh
+import chess
+import chess.engine
+
+from bot.chess.exceptions import EngineBusy
+
+
+class PooledEngine():
+    def __init__(self, transport, protocol: chess.engine.UciProtocol):
+        self.transport = transport
+        self.protocol = protocol
+
+    def is_alive(self) -> bool:
+        return not self.protocol.returncode.done()
+
+    async def close(self):
+        try:
+            await asyncio.wait_for(self.protocol.quit(), timeout=5)
+        except Exception as e:
+            logging.debug(f'Could not quit engine gracefully: {e}')
+        finally:
+            self.transport.close()
+
+
+class EnginePool():
+    """
+    Long-lived pool of UCI engines shared by every chess game
+
+    Engines are spawned on demand, either as local processes or through a persistent
+    SSH connection, and are kept alive between requests. Engines are pinged before being
+    handed out and replaced if they have crashed. When all engines are busy, requests
+    wait in line until one is released; once too many requests are waiting, new ones
+    are rejected with `EngineBusy`.
+
+    :param engine_path: Engine executable path
+    :type engine_path: str
+    :param size: Max number of engines running at once
+    :type size: int
+    :param max_queue: Max number of requests waiting for an idle engine
+    :type max_queue: int
+    :param ssh_options: asyncssh connection options. Engines run locally if not given
+    :type ssh_options: dict
+    :param health_check_timeout: Seconds to wait for an engine to answer a ping
+    :type health_check_timeout: float
+    """
+
+    def __init__(self, engine_path: str, size: int=2, max_queue: int=20,
+                 ssh_options: Optional[dict]=None, health_check_timeout: float=5):
+        self.engine_path = engine_path
+        self.size = size
+        self.max_queue = max_queue
+        self.ssh_options = ssh_options
+        self.health_check_timeout = health_check_timeout
+        self._loop: asyncio.AbstractEventLoop = None
+        self._semaphore: asyncio.Semaphore = None
+        self._ssh_lock: asyncio.Lock = None
+        self._ssh_connection: asyncssh.SSHClientConnection = None
+        self._idle: List[PooledEngine] = []
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        """
+        Number of requests currently waiting for an idle engine
+        """
+        return self._waiting
+
+    async def play(self, board: chess.Board, limit: chess.engine.Limit,
+                   options: dict=None) -> chess.engine.PlayResult:
+        """
+        Plays given position on a pooled engine. Given options are only
+        applied for this request.
+
+        :param board: Position to be played
+        :type board: chess.Board
+        :param limit: Search limit
+        :type limit: chess.engine.Limit
+        :param options: Engine options, such as `Skill level`
+        :type options: dict
+        :return: Engine's move
+        :rtype: chess.engine.PlayResult
+        :raises EngineBusy: Too many requests are already waiting for an engine
+        """
+        return await self._run(lambda engine: engine.play(board, limit, options=options or {}))
+
+    async def analyse(self, board: chess.Board, limit: chess.engine.Limit,
+                      options: dict=None) -> chess.engine.InfoDict:
+        """
+        Analyses given position on a pooled engine. Given options are only
+        applied for this request.
+
+        :param board: Position to be analysed
+        :type board: chess.Board
+        :param limit: Search limit
+        :type limit: chess.engine.Limit
+        :param options: Engine options
+        :type options: dict
+        :return: Position analysis
+        :rtype: chess.engine.InfoDict
+        :raises EngineBusy: Too many requests are already waiting for an engine
+        """
+        return await self._run(lambda engine: engine.analyse(board, limit, options=options or {}))
+
+    @asynccontextmanager
+    async def engine(self) -> AsyncIterator[chess.engine.UciProtocol]:
+        """
+        Borrows an engine from the pool for the duration of the context
+
+        :raises EngineBusy: Too many requests are already waiting for an engine
+        """
+        pooled_engine = await self._acquire()
+        try:
+            yield pooled_engine.protocol
+        finally:
+            self._release(pooled_engine)
+
+    async def close(self):
+        """
+        Quits all idle engines and closes the SSH connection, if any
+        """
+        idle_engines, self._idle = self._idle, []
+        for pooled_engine in idle_engines:
+            await pooled_engine.close()
+        if self._ssh_connection:
+            self._ssh_connection.close()
+            self._ssh_connection = None
+
+    async def _run(self, command):
+        for attempt in range(2):
+            async with self.engine() as engine:
+                try:
+                    return await command(engine)
+                except chess.engine.EngineTerminatedError:
+                    if attempt:
+                        raise
+                    logging.warning('Chess engine terminated unexpectedly, retrying on a new one')
+
+    async def _acquire(self) -> PooledEngine:
+        self._bind_to_running_loop()
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise EngineBusy()
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            while self._idle:
+                pooled_engine = self._idle.pop()
+                if await self._is_healthy(pooled_engine):
+                    return pooled_engine
+                await pooled_engine.close()
+            return await self._spawn()
+        except:
+            self._semaphore.release()
+            raise
+
+    def _release(self, pooled_engine: PooledEngine):
+        if pooled_engine.is_alive():
+            self._idle.append(pooled_engine)
+        else:
+            pooled_engine.transport.close()
+        self._semaphore.release()
+
+    async def _is_healthy(self, pooled_engine: PooledEngine) -> bool:
+        if not pooled_engine.is_alive():
+            return False
+        try:
+            await asyncio.wait_for(pooled_engine.protocol.ping(), timeout=self.health_check_timeout)
+            return True
+        except (chess.engine.EngineError, asyncio.TimeoutError) as e:
+            logging.warning(f'Chess engine failed health check: {e}')
+            return False
+
+    async def _spawn(self) -> PooledEngine:
+        if not self.ssh_options:
+            transport, protocol = await chess.engine.popen_uci(self.engine_path)
+            return PooledEngine(transport, protocol)
+
+        try:
+            connection = await self._get_ssh_connection()
+            channel, protocol = await connection.create_subprocess(
+                chess.engine.UciProtocol, self.engine_path)
+        except (asyncssh.Error, OSError) as e:
+            logging.warning(f'Could not open engine through SSH, reconnecting: {e}')
+            connection = await self._get_ssh_connection(reconnect=True)
+            channel, protocol = await connection.create_subprocess(
+                chess.engine.UciProtocol, self.engine_path)
+        try:
+            await protocol.initialize()
+        except:
+            channel.close()
+            raise
+        return PooledEngine(channel, protocol)
+
+    async def _get_ssh_connection(self, reconnect: bool=False) -> asyncssh.SSHClientConnection:
+        async with self._ssh_lock:
+            if reconnect and self._ssh_connection:
+                self._ssh_connection.close()
+                self._ssh_connection = None
+            if not self._ssh_connection:
+                self._ssh_connection = await asyncssh.connect(**self.ssh_options)
+            return self._ssh_connection
+
+    def _bind_to_running_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Engines and connections are bound to the loop they were created on
+        for pooled_engine in self._idle:
+            try:
+                pooled_engine.transport.close()
+            except Exception:
+                pass
+        self._idle = []
+        self._ssh_connection = None
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._ssh_lock = asyncio.Lock()
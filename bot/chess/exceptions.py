@@ -32,6 +32,22 @@ class InvalidMove(ChessException):
         super().__init__("Invalid move", *args, **kwargs)
 
 
+class EngineBusy(ChessException):
+    def __init__(self, *args, **kwargs):
+        super().__init__("The chess engine is busy right now. Please try again in a few moments", *args, **kwargs)
+
+
 class PuzzleNotFound(ChessException):
     def __init__(self, *args, **kwargs):
         super().__init__("Puzzle not found", *args, **kwargs)
+
+
+class SequenceTooLong(ChessException):
+    def __init__(self, max_length, *args, **kwargs):
+        super().__init__("Variations can be at most {max_length} moves long", *args, **kwargs)
+        self.max_length = max_length
+
+
+class GifTooLarge(ChessException):
+    def __init__(self, *args, **kwargs):
+        super().__init__("This variation's GIF is too large. Please try a shorter one", *args, **kwargs)
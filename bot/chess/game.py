@@ -1,3 +1,4 @@
+import os
 from io import StringIO
 
 from chess import Board, WHITE
@@ -7,9 +8,11 @@ from chess.pgn import read_game
 
 from bot.chess.player import Player
 from bot.models.chess_game import ChessGame
-from bot.models.user import User
+from bot.social.profile_cache import profile_cache
 from bot.utils import convert_users_to_players
 
+MOVES_PER_WRITE = int(os.environ.get("CHESS_MOVES_PER_WRITE", '1'))
+
 
 class Game():
     def __init__(self):
@@ -22,6 +25,7 @@ class Game():
         self.color_schema: str = None
         self.last_eval: Cp = Cp(0)
         self.cpu_level: int = None
+        self._saved_ply: int = None
 
     def __eq__(self, value):
         try:
@@ -29,17 +33,40 @@ class Game():
         except:
             return False
 
-    async def save(self):
-        chess_game = await ChessGame.get(self.id) or ChessGame()
-        chess_game.player1 = await User.get(self.player1.id) or User(id=self.player1.id, name=self.player1.name)
-        chess_game.player2 = await User.get(self.player2.id) or User(id=self.player2.id, name=self.player2.name)
+    async def save(self, force: bool=False):
+        """
+        Persists game. Once the game is stored, ongoing games only append the
+        moves played since last save instead of rewriting its whole PGN.
+        Moves are written in batches of `CHESS_MOVES_PER_WRITE` unless forced.
+
+        :param force: Write pending moves even if there are fewer than a batch
+        :type force: bool
+        """
+        if self._can_append_moves():
+            pending_moves = self.board.move_stack[self._saved_ply:]
+            if not pending_moves or (not force and len(pending_moves) < MOVES_PER_WRITE):
+                return
+            await ChessGame.append_moves(self.id, [move.uci() for move in pending_moves])
+            self._saved_ply = len(self.board.move_stack)
+            return
+
         pgn_game = PGN().from_board(self.board)
-        chess_game.pgn = str(pgn_game)
-        chess_game.result = {'1-0': 1, '0-1': -1, '1/2-1/2': 0, '*': None}[self.result]
-        chess_game.color_schema = self.color_schema
-        chess_game.cpu_level = self.cpu_level
-        chess_game_id = await ChessGame.save(chess_game)
-        self.id = chess_game_id
+        self.id = await ChessGame.save_with_players(
+            self.id,
+            [(self.player1.id, self.player1.name), (self.player2.id, self.player2.name)],
+            pgn=str(pgn_game),
+            moves=None,
+            result={'1-0': 1, '0-1': -1, '1/2-1/2': 0, '*': None}[self.result],
+            color_schema=self.color_schema,
+            cpu_level=self.cpu_level
+        )
+        self._saved_ply = len(self.board.move_stack)
+        if self.result != '*':
+            profile_cache.invalidate(self.player1.id, self.player2.id)
+
+    def _can_append_moves(self) -> bool:
+        return (self.id is not None and self._saved_ply is not None and self.result == '*' and
+            len(self.board.move_stack) >= self._saved_ply)
 
     @classmethod
     def from_chess_game_model(cls, chess_game: ChessGame) -> 'Game':
@@ -48,7 +75,10 @@ class Game():
         game.player1, = convert_users_to_players(chess_game.player1)
         game.player2, = convert_users_to_players(chess_game.player2)
         game.board = read_game(StringIO(chess_game.pgn)).end().board()
+        for move in (chess_game.moves or '').split():
+            game.board.push_uci(move)
         game.current_player = game.player1 if game.board.turn == WHITE else game.player2
         game.color_schema = chess_game.color_schema
         game.cpu_level = chess_game.cpu_level
+        game._saved_ply = len(game.board.move_stack)
         return game
@@ -0,0 +1,199 @@
+from itertools import count
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from bot.chess.game import Game
+from bot.chess.player import Player
+
+IndexKeys = Tuple[Optional[int], Optional[frozenset], Optional[str]]
+
+
+class GameRegistry():
+    """
+    In-memory registry of ongoing chess games
+
+    Games are indexed by their current player id, by their unordered pair of
+    player ids and by their game id, so looking games up, adding and removing
+    them does not depend on how many games are being played. Registry behaves
+    like the list it replaces: it keeps insertion order, can be iterated,
+    sliced and compared to lists, and both `in` and `remove` match either the
+    given game itself or else an equal one.
+
+    Indexes are not aware of changes made directly to a game's attributes, so
+    registered games' current player must be set with `set_current_player`
+    and games must be saved with `save`, which may set their id.
+
+    :param games: Initial games
+    :type games: Iterable[Game]
+    """
+
+    def __init__(self, games: Iterable[Game]=()):
+        self._entry_counter = count()
+        self._entries: Dict[int, Game] = {}
+        self._entries_by_game: Dict[int, List[int]] = {}
+        self._index_keys: Dict[int, IndexKeys] = {}
+        self._by_current_player: Dict[int, Dict[int, Game]] = {}
+        self._by_players: Dict[frozenset, Dict[int, Game]] = {}
+        self._by_id: Dict[str, Dict[int, Game]] = {}
+        for game in games:
+            self.append(game)
+
+    def append(self, game: Game):
+        """
+        Registers given game
+
+        :param game: Game to be registered
+        :type game: Game
+        """
+        entry = next(self._entry_counter)
+        self._entries[entry] = game
+        self._entries_by_game.setdefault(id(game), []).append(entry)
+        self._index(entry, game)
+
+    def remove(self, game: Game):
+        """
+        Unregisters given game
+
+        :param game: Game to be unregistered
+        :type game: Game
+        :raises ValueError: Game is not registered
+        """
+        entry = self._find_entry(game)
+        if entry is None:
+            raise ValueError('Game is not registered')
+        registered_game = self._entries.pop(entry)
+        entries = self._entries_by_game[id(registered_game)]
+        entries.remove(entry)
+        if not entries:
+            del self._entries_by_game[id(registered_game)]
+        self._unindex(entry)
+
+    def set_current_player(self, game: Game, player: Player):
+        """
+        Sets given game's current player, updating indexes if game is registered
+
+        :param game: Game whose turn has changed
+        :type game: Game
+        :param player: Player next to move
+        :type player: Player
+        """
+        game.current_player = player
+        self._reindex(game)
+
+    async def save(self, game: Game, force: bool=False):
+        """
+        Saves given game, updating indexes if game is registered,
+        as its id is set once it is first stored
+
+        :param game: Game to be saved
+        :type game: Game
+        :param force: Write pending moves even if there are fewer than a batch
+        :type force: bool
+        """
+        await game.save(force=force)
+        self._reindex(game)
+
+    def get(self, game_id: str) -> Optional[Game]:
+        """
+        Gets game by its id
+
+        :param game_id: Chess game's UUID
+        :type game_id: str
+        :return: Game or None if there is no ongoing game with given id
+        :rtype: Optional[Game]
+        """
+        return next(iter(self._by_id.get(str(game_id), {}).values()), None)
+
+    def find_by_current_player(self, player_id: int) -> List[Game]:
+        """
+        Gets games in which given player is next to move
+
+        :param player_id: Player's id
+        :type player_id: int
+        :rtype: List[Game]
+        """
+        return self._sorted_games(self._by_current_player.get(player_id, {}))
+
+    def find_by_players(self, player_id: int, other_player_id: int) -> List[Game]:
+        """
+        Gets games between given players, regardless of their colors
+
+        :param player_id: A player's id
+        :type player_id: int
+        :param other_player_id: Their opponent's id
+        :type other_player_id: int
+        :rtype: List[Game]
+        """
+        return self._sorted_games(self._by_players.get(frozenset([player_id, other_player_id]), {}))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Game]:
+        return iter(list(self._entries.values()))
+
+    def __getitem__(self, index):
+        return list(self._entries.values())[index]
+
+    def __contains__(self, game: Game) -> bool:
+        return self._find_entry(game) is not None
+
+    def __eq__(self, value) -> bool:
+        if isinstance(value, (GameRegistry, list)):
+            return list(self) == list(value)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'GameRegistry({list(self)!r})'
+
+    def _find_entry(self, game: Game) -> Optional[int]:
+        entries = self._entries_by_game.get(id(game))
+        if entries:
+            return entries[0]
+        return next((entry for entry, registered_game in self._entries.items() if registered_game == game), None)
+
+    def _reindex(self, game: Game):
+        for entry in self._entries_by_game.get(id(game), []):
+            self._unindex(entry)
+            self._index(entry, game)
+
+    def _index(self, entry: int, game: Game):
+        index_keys = self._game_index_keys(game)
+        current_player_id, players, game_id = index_keys
+        self._index_keys[entry] = index_keys
+        if current_player_id is not None:
+            self._by_current_player.setdefault(current_player_id, {})[entry] = game
+        if players is not None:
+            self._by_players.setdefault(players, {})[entry] = game
+        if game_id is not None:
+            self._by_id.setdefault(game_id, {})[entry] = game
+
+    def _unindex(self, entry: int):
+        current_player_id, players, game_id = self._index_keys.pop(entry)
+        self._discard(self._by_current_player, current_player_id, entry)
+        self._discard(self._by_players, players, entry)
+        self._discard(self._by_id, game_id, entry)
+
+    @staticmethod
+    def _discard(index: Dict[Hashable, Dict[int, Game]], key: Hashable, entry: int):
+        if key is None:
+            return
+        games = index.get(key)
+        if games is None:
+            return
+        games.pop(entry, None)
+        if not games:
+            del index[key]
+
+    @staticmethod
+    def _sorted_games(games: Dict[int, Game]) -> List[Game]:
+        # Reindexed games are moved to the end, so restore registration order
+        return [game for _, game in sorted(games.items())]
+
+    @staticmethod
+    def _game_index_keys(game: Game) -> IndexKeys:
+        current_player_id = game.current_player.id if game.current_player else None
+        players = None
+        if game.player1 and game.player2:
+            players = frozenset([game.player1.id, game.player2.id])
+        game_id = str(game.id) if game.id else None
+        return current_player_id, players, game_id
@@ -0,0 +1,100 @@
+from typing import BinaryIO, Iterable, Optional
+
+from PIL import GifImagePlugin, Image, ImageChops, ImageColor
+
+from bot.chess.exceptions import GifTooLarge
+
+
+class GifSequenceWriter():
+    """
+    Writes an animated GIF one frame at a time
+
+    Frames are written to given file as soon as they are added, so only the
+    last frame is kept in memory. Every frame shares a single reduced palette,
+    made of `reserved_colors` plus the first frame's main colors, and is
+    quantized without dithering, which keeps unchanged pixels identical
+    between frames. This way, frames after the first one only carry the
+    region that changed since the previous frame. Colors missing from the
+    first frame are only kept exactly if they are reserved.
+
+    :param fp: Binary file to which the GIF is written
+    :type fp: BinaryIO
+    :param colors: Max number of colors in the palette
+    :type colors: int
+    :param duration: Time each frame is displayed, in milliseconds
+    :type duration: int
+    :param loop: Number of times the animation is played. 0 means forever
+    :type loop: int
+    :param max_bytes: Max GIF size. Unbounded if not given
+    :type max_bytes: Optional[int]
+    :param reserved_colors: Colors always in the palette, such as colors shown only on later frames
+    :type reserved_colors: Iterable[str]
+    """
+
+    def __init__(self, fp: BinaryIO, colors: int=64, duration: int=1000, loop: int=0,
+                 max_bytes: Optional[int]=None, reserved_colors: Iterable[str]=()):
+        self.fp = fp
+        self.colors = colors
+        self.duration = duration
+        self.loop = loop
+        self.max_bytes = max_bytes
+        self.reserved_colors = list(dict.fromkeys(ImageColor.getrgb(color)[:3] for color in reserved_colors))
+        self.frames = 0
+        self._palette_image: Image.Image = None
+        self._previous_frame: Image.Image = None
+        self._start = fp.tell()
+
+    def add_frame(self, image: Image.Image):
+        """
+        Appends given image to the animation
+
+        :param image: Frame, which must be as large as the first one
+        :type image: Image.Image
+        :raises GifTooLarge: GIF has grown past `max_bytes`
+        :raises ValueError: Frame's size differs from first frame's
+        """
+        image = image.convert('RGB')
+        if self._palette_image is None:
+            palette_bytes = self._build_palette(image)
+            self._palette_image = Image.new('P', (1, 1))
+            self._palette_image.putpalette(palette_bytes + bytes(768 - len(palette_bytes)))
+            frame = image.quantize(palette=self._palette_image, dither=0)
+            header, _ = GifImagePlugin.getheader(
+                frame, palette=palette_bytes, info={"duration": self.duration, "loop": self.loop})
+            self._write(header)
+            self._write(GifImagePlugin.getdata(frame, (0, 0), duration=self.duration, loop=self.loop))
+        else:
+            if image.size != self._previous_frame.size:
+                raise ValueError('Every frame must be as large as the first one')
+            frame = image.quantize(palette=self._palette_image, dither=0)
+            bbox = ImageChops.subtract_modulo(frame, self._previous_frame).getbbox()
+            if not bbox:
+                # Nothing changed, but a frame is still needed to hold previous one on screen
+                bbox = (0, 0, 1, 1)
+            self._write(GifImagePlugin.getdata(frame.crop(bbox), bbox[:2], duration=self.duration))
+        self._previous_frame = frame
+        self.frames += 1
+
+    def close(self):
+        """
+        Ends the animation. No frames can be added afterwards.
+
+        :raises ValueError: No frame has been added
+        """
+        if not self.frames:
+            raise ValueError('GIF has no frames')
+        self._write([b';'])
+        self._previous_frame = None
+
+    def _build_palette(self, image: Image.Image) -> bytes:
+        palette = [channel for color in self.reserved_colors[:self.colors] for channel in color]
+        image_colors = self.colors - len(self.reserved_colors)
+        if image_colors > 0:
+            palette += list(image.quantize(colors=image_colors).palette.palette[:3 * image_colors])
+        return bytes(palette + [0] * (3 * self.colors - len(palette)))
+
+    def _write(self, chunks):
+        for chunk in chunks:
+            self.fp.write(chunk)
+        if self.max_bytes and self.fp.tell() - self._start > self.max_bytes:
+            raise GifTooLarge()
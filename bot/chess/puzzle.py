@@ -1,45 +1,136 @@
-import json
-from json.decoder import JSONDecodeError
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from typing import Deque, Iterator, Optional
 
-import urllib.request
 from chess import Board
-from urllib.request import Request
-from urllib.error import HTTPError
 
 from bot.chess.game import Game
 from bot.chess.exceptions import PuzzleNotFound
-from bot.utils import run_cpu_bound_task
+from bot.models.chess_puzzle import ChessPuzzle
+
+
+class ActivePuzzles(MutableMapping):
+    """
+    Puzzles being solved, by id
+
+    Puzzles not accessed for `ttl` seconds are dropped, as well as least
+    recently used ones once there are more than `max_entries` of them.
+
+    :param ttl: Seconds after which an untouched puzzle is dropped
+    :type ttl: float
+    :param max_entries: Max number of puzzles kept
+    :type max_entries: int
+    """
+
+    def __init__(self, ttl: float=3600, max_entries: int=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._accessed_at: dict = {}
+
+    def __getitem__(self, puzzle_id: str) -> dict:
+        self._evict_expired()
+        puzzle = self._entries[puzzle_id]
+        self._entries.move_to_end(puzzle_id)
+        self._accessed_at[puzzle_id] = time.monotonic()
+        return puzzle
+
+    def __setitem__(self, puzzle_id: str, puzzle: dict):
+        self._evict_expired()
+        self._entries[puzzle_id] = puzzle
+        self._entries.move_to_end(puzzle_id)
+        self._accessed_at[puzzle_id] = time.monotonic()
+        while len(self._entries) > self.max_entries:
+            oldest_puzzle_id, _ = self._entries.popitem(last=False)
+            del self._accessed_at[oldest_puzzle_id]
+
+    def __delitem__(self, puzzle_id: str):
+        del self._entries[puzzle_id]
+        del self._accessed_at[puzzle_id]
+
+    def __iter__(self) -> Iterator[str]:
+        self._evict_expired()
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        self._evict_expired()
+        return len(self._entries)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        # Entries are ordered by last access, so expired ones are at the start
+        while self._entries:
+            puzzle_id = next(iter(self._entries))
+            if now - self._accessed_at[puzzle_id] < self.ttl:
+                break
+            del self[puzzle_id]
 
 
 class Puzzle():
 
     def __init__(self):
+        self.prefetch_size = int(os.environ.get("CHESS_PUZZLE_PREFETCH_SIZE", '10'))
+        self.prefetched_puzzles: Deque[dict] = deque()
+        self._prefetch_task: Optional[asyncio.Task] = None
         self.puzzles = {}
-    
-    @run_cpu_bound_task
-    def get_random_puzzle(self):
-        # aiohttp doesn't support HTTP2, which ChessBlunders' API uses 😓
-        # https://github.com/aio-libs/aiohttp/issues/4426#issuecomment-564236480
-        params = json.dumps({"type": "explore"}).encode('utf-8')
-        request = Request("https://chessblunders.org/api/blunder/get", data=params)
-        request.add_header("Content-Type", "application/json")
-        request.add_header("User-Agent", "HTTPie/1.0.3")
-        try:
-            response = urllib.request.urlopen(request)
-            response_str = response.read().decode('utf-8')
 
-            return json.loads(response_str)
-        except JSONDecodeError:
-            return {"error": "Invalid JSON", "body": response_str}
-        except HTTPError as e:
-            return {"error": e.msg, "http_code": e.code}
+    @property
+    def puzzles(self) -> ActivePuzzles:
+        return self._puzzles
+
+    @puzzles.setter
+    def puzzles(self, value):
+        if not isinstance(value, ActivePuzzles):
+            active_puzzles = ActivePuzzles(
+                ttl=int(os.environ.get("CHESS_PUZZLE_TTL", '3600')),
+                max_entries=int(os.environ.get("CHESS_PUZZLE_MAX_ACTIVE", '1000'))
+            )
+            active_puzzles.update(value)
+            value = active_puzzles
+        self._puzzles = value
+
+    async def get_random_puzzle(self):
+        """
+        Gets a random puzzle from local puzzle database. Puzzles are served
+        from a queue, which is refilled in background after each call.
+
+        :return: Puzzle dict, as expected by `build_puzzle`, or dict with an error
+        :rtype: dict
+        """
+        if self.prefetched_puzzles:
+            puzzle_dict = self.prefetched_puzzles.popleft()
+        else:
+            chess_puzzle = await ChessPuzzle.get_random()
+            if not chess_puzzle:
+                return {"error": "No puzzles available"}
+            puzzle_dict = chess_puzzle.to_dict()
+        self._schedule_prefetch()
+        return puzzle_dict
+
+    def _schedule_prefetch(self):
+        if self._prefetch_task is None or self._prefetch_task.done():
+            self._prefetch_task = asyncio.create_task(self._prefetch_puzzles())
+
+    async def _prefetch_puzzles(self):
+        try:
+            while len(self.prefetched_puzzles) < self.prefetch_size:
+                chess_puzzle = await ChessPuzzle.get_random()
+                if not chess_puzzle:
+                    return
+                self.prefetched_puzzles.append(chess_puzzle.to_dict())
+        except Exception as e:
+            logging.warning(f'Could not prefetch puzzles: {e}', exc_info=True)
 
     def build_puzzle(self, puzzle_dict):
         try:
             puzzle_id = puzzle_dict["data"]["id"]
             first_move = puzzle_dict["data"]["blunderMove"]
             fen = puzzle_dict["data"]["fenBefore"]
-            correct_sequence = puzzle_dict["data"]["forcedLine"]
+            correct_sequence = list(puzzle_dict["data"]["forcedLine"])
 
             board = Board(fen)
             board.push_san(first_move)
@@ -72,7 +163,7 @@ class Puzzle():
                 puzzle["game"].board.push_san(puzzle["correct_sequence"].pop(0))
             if result and len(puzzle["correct_sequence"]) > 1:
                 puzzle["game"].board.push_san(puzzle["correct_sequence"].pop(0))
-            
+
             return result
         except ValueError:
             return False
@@ -0,0 +1,105 @@
+import csv
+import logging
+import sys
+from typing import Iterator, List
+
+from chess import Board, Move
+
+from bot.models.chess_puzzle import ChessPuzzle
+
+LICHESS_CSV_HEADER = 'PuzzleId'
+
+
+def parse_lichess_row(row: List[str]) -> ChessPuzzle:
+    """
+    Builds a puzzle from a row of Lichess' puzzle database CSV dump
+    (https://database.lichess.org/#puzzles).
+
+    Lichess lists every move in UCI notation, starting with the opponent's
+    blunder, whereas puzzles are stored in SAN notation, with the blunder
+    apart from the forced line.
+
+    :param row: PuzzleId, FEN, Moves, Rating, RatingDeviation, Popularity, NbPlays and Themes columns
+    :type row: List[str]
+    :return: Puzzle, not yet stored
+    :rtype: ChessPuzzle
+    :raises ValueError: Row has an invalid FEN or move
+    """
+    puzzle_id, fen, moves, rating = row[:4]
+    themes = row[7].split() if len(row) > 7 else []
+
+    board = Board(fen)
+    san_moves = []
+    for uci_move in moves.split():
+        move = Move.from_uci(uci_move)
+        if not board.is_legal(move):
+            raise ValueError(f'Illegal move {uci_move} in puzzle {puzzle_id}')
+        san_moves.append(board.san(move))
+        board.push(move)
+    if len(san_moves) < 2:
+        raise ValueError(f'Puzzle {puzzle_id} has no forced line')
+
+    return ChessPuzzle(
+        id=puzzle_id,
+        fen=fen,
+        blunder_move=san_moves[0],
+        forced_line=' '.join(san_moves[1:]),
+        rating=int(rating) if rating else None,
+        themes=themes
+    )
+
+
+def read_lichess_csv(path: str) -> Iterator[ChessPuzzle]:
+    """
+    Reads puzzles from a Lichess' puzzle database CSV dump.
+    Invalid rows are logged and skipped.
+
+    :param path: CSV file's path
+    :type path: str
+    :return: Puzzles, not yet stored
+    :rtype: Iterator[ChessPuzzle]
+    """
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0] == LICHESS_CSV_HEADER:
+                continue
+            try:
+                yield parse_lichess_row(row)
+            except ValueError as e:
+                logging.warning(f'Skipping puzzle: {e}')
+
+
+async def import_puzzles(path: str, batch_size: int=1000) -> int:
+    """
+    Stores puzzles from a Lichess' puzzle database CSV dump in batches.
+    Puzzles already stored are skipped, so a dump can be imported again
+    to add new puzzles.
+
+    :param path: CSV file's path
+    :type path: str
+    :param batch_size: Number of puzzles stored at once
+    :type batch_size: int
+    :return: Number of stored puzzles
+    :rtype: int
+    """
+    stored_puzzles = 0
+    batch = []
+    for chess_puzzle in read_lichess_csv(path):
+        batch.append(chess_puzzle)
+        if len(batch) >= batch_size:
+            stored_puzzles += await ChessPuzzle.save_many(batch)
+            batch = []
+    if batch:
+        stored_puzzles += await ChessPuzzle.save_many(batch)
+    return stored_puzzles
+
+
+if __name__ == "__main__":
+    from asyncio import run
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    logging.info(f'{run(import_puzzles(sys.argv[1]))} puzzles imported')
@@ -0,0 +1,117 @@
+from io import BytesIO
+from math import floor, pow, sqrt
+from typing import Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+import chess
+
+from bot.chess.board_cache import board_cache
+from bot.chess.board_renderer import BoardColors, get_board_renderer
+from bot.chess.gif_writer import GifSequenceWriter
+
+BoardPosition = Tuple[str, Optional[str]]
+
+MOSAIC_WIDTH = 1200
+MAX_BOARDS_PER_MOSAIC = 9
+PIECE_COLORS = ('#ffffff', '#000000')
+
+
+def render_board(board_fen: str, lastmove_uci: Optional[str], colors: BoardColors,
+                 size: Optional[int]=None, renderer_name: Optional[str]=None) -> bytes:
+    """
+    Renders a board position as a PNG image.
+    Rendered images are cached by position, last move, colors, size and renderer.
+
+    :param board_fen: Board part of the position's FEN
+    :type board_fen: str
+    :param lastmove_uci: Move to be highlighted, in UCI notation
+    :type lastmove_uci: Optional[str]
+    :param colors: Square colors, as returned by `Chess._board_colors`
+    :type colors: BoardColors
+    :param size: Image width and height in pixels. Defaults to the SVG's own size
+    :type size: Optional[int]
+    :param renderer_name: Board renderer's name. Defaults to `CHESS_BOARD_RENDERER`
+    :type renderer_name: Optional[str]
+    :return: PNG image's bytes
+    :rtype: bytes
+    """
+    board_renderer = get_board_renderer(renderer_name)
+    cache_key = (board_fen, lastmove_uci, colors, size, board_renderer.name)
+    png_bytes = board_cache.get(cache_key)
+    if png_bytes is None:
+        png_bytes = board_renderer.render(
+            chess.BaseBoard(board_fen), lastmove_uci and chess.Move.from_uci(lastmove_uci), colors, size)
+        board_cache.put(cache_key, png_bytes)
+    return png_bytes
+
+
+def mosaic_layout(number_of_games: int) -> Tuple[int, int]:
+    """
+    Gets how boards are laid out on `render_boards_mosaic` pages
+
+    :param number_of_games: Number of games across every page
+    :type number_of_games: int
+    :return: Number of boards per row and boards' width and height in pixels
+    :rtype: Tuple[int, int]
+    """
+    next_perfect_sqr = lambda n: int(pow(floor(sqrt(n)) + 1, 2)) if n%n**0.5 != 0 else n
+    number_of_boards_sqrt = int(sqrt(min(next_perfect_sqr(number_of_games), MAX_BOARDS_PER_MOSAIC)))
+    return number_of_boards_sqrt, int(MOSAIC_WIDTH / number_of_boards_sqrt)
+
+
+def render_boards_mosaic(tiles: List[bytes], number_of_columns: int, tile_size: int) -> bytes:
+    """
+    Composes a page of boards side by side
+
+    :param tiles: Boards' PNG images, already rendered at `tile_size`
+    :type tiles: List[bytes]
+    :param number_of_columns: Number of boards per row
+    :type number_of_columns: int
+    :param tile_size: Boards' width and height in pixels
+    :type tile_size: int
+    :return: PNG image's bytes
+    :rtype: bytes
+    """
+    final_image = Image.new('RGB', (MOSAIC_WIDTH, MOSAIC_WIDTH))
+    for index, tile in enumerate(tiles):
+        board_position = (tile_size * (index % number_of_columns), tile_size * (index // number_of_columns))
+        final_image.paste(Image.open(BytesIO(tile)), board_position)
+
+    bytesio = BytesIO()
+    final_image.save(bytesio, format="png")
+    return bytesio.getvalue()
+
+
+def render_sequence_gif(positions: Iterable[BoardPosition], colors: BoardColors,
+                        renderer_name: Optional[str]=None, gif_colors: int=64,
+                        max_bytes: Optional[int]=None) -> BytesIO:
+    """
+    Renders an animated GIF showing given positions one after another.
+    Frames are rendered and written one at a time, each one only carrying
+    the squares changed since previous position. Square and piece colors are
+    reserved in the GIF's palette, so last move highlights keep their colors
+    even if first position has none.
+
+    :param positions: Positions' board FEN and last move, in UCI notation
+    :type positions: Iterable[BoardPosition]
+    :param colors: Square colors
+    :type colors: BoardColors
+    :param renderer_name: Board renderer's name
+    :type renderer_name: Optional[str]
+    :param gif_colors: Max number of colors in the GIF's palette
+    :type gif_colors: int
+    :param max_bytes: Max GIF size. Unbounded if not given
+    :type max_bytes: Optional[int]
+    :return: Animated gif's bytesIO
+    :rtype: BytesIO
+    :raises GifTooLarge: GIF has grown past `max_bytes`
+    """
+    bytesio = BytesIO()
+    gif_writer = GifSequenceWriter(bytesio, colors=gif_colors, duration=1000, loop=0, max_bytes=max_bytes,
+                                   reserved_colors=colors + PIECE_COLORS)
+    for board_fen, lastmove_uci in positions:
+        gif_writer.add_frame(Image.open(BytesIO(render_board(board_fen, lastmove_uci, colors, renderer_name=renderer_name))))
+    gif_writer.close()
+    bytesio.seek(0)
+    return bytesio
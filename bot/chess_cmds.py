@@ -6,7 +6,7 @@ import discord
 from discord import app_commands
 
 from bot.chess.chess import Chess
-from bot.chess.exceptions import ChessException, MultipleGamesAtOnce
+from bot.chess.exceptions import ChessException, MultipleGamesAtOnce, SequenceTooLong
 from bot.chess.puzzle import Puzzle
 from bot.discord_helpers import i
 
@@ -82,6 +82,7 @@ class ChessCmds(app_commands.Group):
         self.client.add_listener(self.on_connect)
         self.chess_bot = Chess()
         self.puzzle_bot = Puzzle()
+        self.client.shutdown_callbacks.append(self.chess_bot.close)
         super().__init__(name='xadrez')
 
     async def on_connect(self):
@@ -272,8 +273,13 @@ class ChessCmds(app_commands.Group):
             if not chess_game:
                 return await interaction.followup.send(i(interaction, "Game not found"))
             
-            gif_bytes = await self.chess_bot.build_animated_sequence_gif(
-                chess_game, move_number, moves.split(" "))
+            try:
+                gif_bytes = await self.chess_bot.build_animated_sequence_gif(
+                    chess_game, move_number, moves.split(" "))
+            except SequenceTooLong as e:
+                return await interaction.followup.send(i(interaction, e.message).format(max_length=e.max_length))
+            except ChessException as e:
+                return await interaction.followup.send(i(interaction, e.message))
             if not gif_bytes:
                 return await interaction.followup.send(i(interaction, "Invalid move for the given sequence"))
             return await interaction.followup.send(file=discord.File(gif_bytes, 'variation.gif'))
@@ -1,6 +1,6 @@
 import logging
 import os
-from typing import Any, Callable, List
+from typing import Any, Awaitable, Callable, List
 
 import discord
 import discordhealthcheck
@@ -13,7 +13,9 @@ from bot.anime_cmds import AnimeCmds
 from bot.card_jitsu_cmds import CardJitsuCmds
 from bot.chess_cmds import ChessCmds
 from bot.general_cmds import GeneralCmds
+from bot.i18n import preload as preload_translations
 from bot.level_cmds import LevelCmds
+from bot.misc.executors import shutdown_executors
 from bot.misc.scheduler import Scheduler
 from bot.palplatina_cmds import PalplatinaCmds
 from bot.servers import cache
@@ -33,8 +35,10 @@ class BotClient(commands.Bot):
     
     scheduler_bot: Scheduler
     scheduler_callbacks: List[Callable[[Scheduler], Any]] = []
+    shutdown_callbacks: List[Callable[[], Awaitable[Any]]] = []
     
     async def setup_hook(self) -> None:
+        preload_translations()
         testing_guild_id = int(os.environ.get("TESTING_GUILD_ID", 0) or 0)
         if testing_guild_id:
             guild = discord.Object(id=testing_guild_id)
@@ -53,13 +57,35 @@ class BotClient(commands.Bot):
             activity=discord.Game(f'Planejando uma ordem surpresa')
         )
         await cache.load_configs()
-        cache.all_servers = self.guilds
+        cache.set_servers(self.guilds)
         self.scheduler_bot = Scheduler(event_loop=self.loop)
         self.scheduler_bot.start()
         for callback in self.scheduler_callbacks:
             callback(self.scheduler_bot)
         logging.info('Bot is ready')
         
+    async def on_guild_join(self, guild: discord.Guild):
+        cache.add_server(guild)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        cache.remove_server(guild)
+
+    async def on_member_join(self, member: discord.Member):
+        cache.add_member(member.id, member.guild.id)
+
+    async def on_member_remove(self, member: discord.Member):
+        cache.remove_member(member.id, member.guild.id)
+
+    async def close(self) -> None:
+        for callback in self.shutdown_callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logging.warning(e, exc_info=True)
+        # Shutdown callbacks may still rely on executors, so they go last
+        await self.loop.run_in_executor(None, shutdown_executors)
+        await super().close()
+        
     async def on_interaction(self, interaction: discord.Interaction):
         if interaction.command:
             interaction_name = interaction.command.qualified_name
@@ -1,5 +1,5 @@
 import logging
-from typing import Awaitable, Callable, List, Optional
+from typing import Awaitable, Callable, Optional
 
 import discord
 from discord.ui import button, View
@@ -27,11 +27,7 @@ def get_server_lang(server_id: int) -> str:
     return server_config.language
 
 def get_lang_from_user(user_id: int) -> str:
-    server_user_is_in: List[discord.Guild] = [guild for guild in cache.all_servers if guild.get_member(user_id)]
-    if not server_user_is_in:
-        return 'en'
-    server_langs = [get_server_lang(server.id) for server in server_user_is_in]
-    return max(set(server_langs), key=server_langs.count)
+    return cache.get_user_language(user_id)
 
 
 class PersonalView(View):
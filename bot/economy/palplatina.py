@@ -4,6 +4,7 @@ from bot.economy.exceptions import AlreadyOwnsItem, ItemNotFound, NotEnoughCredi
 from bot.models.profile_item import ProfileItem
 from bot.models.user import User
 from bot.models.user_profile_item import UserProfileItem
+from bot.social.profile_cache import profile_cache
 
 class Palplatina():
     
@@ -65,12 +66,14 @@ class Palplatina():
         user_profile_item = await self._get_user_item_from_name(user_id, item_name)
         user_profile_item.equipped = True
         await UserProfileItem.save(user_profile_item)
+        profile_cache.invalidate(user_id)
         return user_profile_item
 
     async def unequip_item(self, user_id, item_name):
         user_profile_item = await self._get_user_item_from_name(user_id, item_name)
         user_profile_item.equipped = False
         await UserProfileItem.save(user_profile_item)
+        profile_cache.invalidate(user_id)
         return user_profile_item
 
     async def _get_user_item_from_name(self, user_id, item_name):
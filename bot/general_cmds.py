@@ -10,6 +10,7 @@ from discord.ext import commands
 
 from bot.aurebesh import text_to_aurebesh_img
 from bot.discord_helpers import PaginatedEmbedManager, get_server_lang, i, server_language_to_tz
+from bot.i18n import reload as reload_translation_catalogs
 from bot.meme import meme_saimaluco_image, random_cat
 from bot.misc.scheduler import Scheduler
 from bot.servers import cache
@@ -265,6 +266,18 @@ class GeneralCmds(app_commands.Group):
         await interaction.channel.purge(limit=amount)
         return await interaction.response.send_message('Done')
 
+    @app_commands.command(
+        name="reload_translations",
+        description="Recarrega as traduções do bot a partir dos arquivos compilados",
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reload_translations(self, interaction: discord.Interaction):
+        """
+        Recarrega as traduções do bot a partir dos arquivos compilados
+        """
+        reload_translation_catalogs()
+        return await interaction.response.send_message('Done')
+
     @app_commands.command(
         name="vision",
         description="Faça uma pergunta ao Chanceler e ele irá lhe responder"
@@ -1,10 +1,52 @@
+import errno
 import gettext
+import logging
 import os
+from typing import Dict, List
+
+LOCALE_DIR = os.path.join('bot', 'i18n')
+DOMAIN = 'base'
+
+_catalogs: Dict[str, gettext.GNUTranslations] = {}
 
 def i18n(text, language_code):
-    language_translation = gettext.translation(
-        'base',
-        localedir=os.path.join('bot', 'i18n'),
-        languages=[language_code]
-    )
+    language_translation = _catalogs.get(language_code)
+    if language_translation is None:
+        language_translation = _load_catalog(language_code)
     return language_translation.gettext(text)
+
+def preload(language_codes: List[str]=None):
+    """
+    Loads translation catalogs ahead of their first use.
+    Loads every compiled language if none is given.
+
+    :param language_codes: Languages to be loaded
+    :type language_codes: List[str]
+    """
+    if language_codes is None:
+        language_codes = [
+            language_code for language_code in sorted(os.listdir(LOCALE_DIR))
+            if os.path.isfile(os.path.join(LOCALE_DIR, language_code, 'LC_MESSAGES', f'{DOMAIN}.mo'))
+        ]
+    for language_code in language_codes:
+        _load_catalog(language_code)
+    logging.info(f'Loaded translations for {", ".join(language_codes)}')
+
+def reload():
+    """
+    Reads compiled translations of every loaded language again from disk
+    right away, replacing their loaded translation catalogs
+    """
+    language_codes = list(_catalogs.keys())
+    _catalogs.clear()
+    preload(language_codes)
+
+def _load_catalog(language_code) -> gettext.GNUTranslations:
+    mo_file_path = gettext.find(DOMAIN, localedir=LOCALE_DIR, languages=[language_code])
+    if not mo_file_path:
+        raise FileNotFoundError(errno.ENOENT, 'No translation file found for domain', DOMAIN)
+    # Read file ourselves since gettext's own cache is never invalidated
+    with open(mo_file_path, 'rb') as f:
+        language_translation = gettext.GNUTranslations(f)
+    _catalogs[language_code] = language_translation
+    return language_translation
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from bot.models.xp_point import XpPoint
+from bot.social.profile_cache import profile_cache
+
+XpPointKey = Tuple[int, int]
+
+
+class XpBuffer():
+    """
+    Write-behind cache of users' XP points
+
+    XP points are fetched from database the first time a user is seen on a
+    server and are kept in memory afterwards, so cooldown checks, XP gain and
+    level ups are handled without hitting the database. Changes are written in
+    batches by `flush`, which is expected to be called periodically and on
+    shutdown. Only XP points and user names that have changed are written. Buffer is also flushed once `max_pending` XP points have changed,
+    which bounds how many updates can be lost if the bot dies.
+
+    At most `max_entries` XP points are kept, least recently used ones being
+    dropped once written. XP points not changed for `ttl` seconds are read again
+    from database, so changes made by other processes are eventually seen.
+    Changes made by other processes in the meantime are detected through
+    XP points' version and merged when flushing.
+
+    :param max_pending: Max number of changed XP points kept before flushing
+    :type max_pending: int
+    :param max_entries: Max number of XP points kept in memory
+    :type max_entries: int
+    :param ttl: Seconds after which unchanged XP points are read again
+    :type ttl: float
+    """
+
+    def __init__(self, max_pending: int=500, max_entries: int=10000, ttl: float=300):
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._xp_points: OrderedDict[XpPointKey, XpPoint] = OrderedDict()
+        self._loaded_at: Dict[XpPointKey, float] = {}
+        self._base_points: Dict[XpPointKey, int] = {}
+        self._pending: Set[XpPointKey] = set()
+        self._flushing: Set[XpPointKey] = set()
+        self._pending_user_names: Dict[int, str] = {}
+        self._user_names: Dict[int, str] = {}
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of XP points changed since last flush
+        """
+        return len(self._pending)
+
+    def get_cached(self, user_id: int, server_id: int) -> Optional[XpPoint]:
+        """
+        Gets XP points from memory only
+
+        :param user_id: User id
+        :type user_id: int
+        :param server_id: Server id
+        :type server_id: int
+        :rtype: Optional[XpPoint]
+        """
+        xp_points = self._xp_points.get((user_id, server_id))
+        if xp_points and self._is_fresh((user_id, server_id)):
+            return xp_points
+        return None
+
+    async def get(self, user_id: int, server_id: int) -> XpPoint:
+        """
+        Gets user's XP points on given server, loading them from database
+        or creating new ones if they are not in memory yet
+
+        :param user_id: User id
+        :type user_id: int
+        :param server_id: Server id
+        :type server_id: int
+        :rtype: XpPoint
+        """
+        key = (user_id, server_id)
+        xp_points = self._xp_points.get(key)
+        if xp_points and (self._is_unsaved(key) or self._is_fresh(key)):
+            self._xp_points.move_to_end(key)
+            return xp_points
+
+        xp_points = await XpPoint.get_by_user_and_server(user_id, server_id)
+        if not xp_points:
+            xp_points = XpPoint()
+            xp_points.user_id = user_id
+            xp_points.server_id = server_id
+            xp_points.points = 0
+            xp_points.level = 1
+            xp_points.version = 0
+            xp_points.updated_at = datetime.utcnow()
+        elif xp_points.user:
+            self._user_names[user_id] = xp_points.user.name
+
+        cached_xp_points = self._xp_points.get(key)
+        if cached_xp_points and (self._is_unsaved(key) or self._is_fresh(key)):
+            # Someone else loaded it while we were waiting on database
+            return cached_xp_points
+        self._xp_points[key] = xp_points
+        self._xp_points.move_to_end(key)
+        self._loaded_at[key] = time.monotonic()
+        self._base_points[key] = xp_points.points
+        self._evict()
+        return xp_points
+
+    def mark_pending(self, xp_points: XpPoint, user_name: str):
+        """
+        Schedules XP points and their user's name to be written on next flush.
+        Pending XP points are never read again from database, so this must be
+        called before awaiting anything once they are changed, or they may
+        be replaced in the meantime and the change lost.
+
+        :param xp_points: Changed XP points
+        :type xp_points: XpPoint
+        :param user_name: User's current name
+        :type user_name: str
+        """
+        self._pending.add((xp_points.user_id, xp_points.server_id))
+        self.update_user_name(xp_points.user_id, user_name)
+
+    def update_user_name(self, user_id: int, user_name: str):
+        """
+        Schedules user's name to be written on next flush, unless it is
+        the name already stored
+
+        :param user_id: User id
+        :type user_id: int
+        :param user_name: User's current name
+        :type user_name: str
+        """
+        if self._pending_user_names.get(user_id, self._user_names.get(user_id)) != user_name:
+            self._pending_user_names[user_id] = user_name
+
+    async def mark_changed(self, xp_points: XpPoint, user_name: str):
+        """
+        Schedules XP points and their user's name to be written on next flush,
+        as `mark_pending` does. Flushes right away if too many changes are pending.
+
+        :param xp_points: Changed XP points
+        :type xp_points: XpPoint
+        :param user_name: User's current name
+        :type user_name: str
+        """
+        self.mark_pending(xp_points, user_name)
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+
+    async def flush(self):
+        """
+        Writes every pending change to database in a single transaction.
+        Changes are kept pending if writing fails.
+        """
+        async with self._flush_lock:
+            if not self._pending and not self._pending_user_names:
+                return
+            pending, self._pending = self._pending, set()
+            user_names, self._pending_user_names = self._pending_user_names, {}
+            xp_points = [self._snapshot(self._xp_points[key]) for key in pending]
+            self._flushing = pending
+            try:
+                saved_values = await XpPoint.save_all(
+                    xp_points, user_names, {key: self._base_points[key] for key in pending})
+            except Exception:
+                self._pending |= pending
+                self._pending_user_names = {**user_names, **self._pending_user_names}
+                raise
+            finally:
+                self._flushing = set()
+            self._user_names.update(user_names)
+
+            for xp_point in xp_points:
+                key = (xp_point.user_id, xp_point.server_id)
+                points, level, version = saved_values[key]
+                cached_xp_points = self._xp_points[key]
+                # Keep points gained while flushing on top of saved ones
+                cached_xp_points.points = points + cached_xp_points.points - xp_point.points
+                cached_xp_points.level = max(level, cached_xp_points.level)
+                cached_xp_points.version = version
+                self._base_points[key] = points
+                self._loaded_at[key] = time.monotonic()
+            profile_cache.invalidate(*{user_id for user_id, _ in pending} | set(user_names))
+            self._evict()
+            logging.debug(f'Flushed {len(xp_points)} XP points')
+
+    def _is_unsaved(self, key: XpPointKey) -> bool:
+        return key in self._pending or key in self._flushing
+
+    def _is_fresh(self, key: XpPointKey) -> bool:
+        return time.monotonic() - self._loaded_at[key] < self.ttl
+
+    def _evict(self):
+        evictable_keys = (key for key in list(self._xp_points) if not self._is_unsaved(key))
+        while len(self._xp_points) > self.max_entries:
+            key = next(evictable_keys, None)
+            if key is None:
+                return
+            del self._xp_points[key]
+            del self._loaded_at[key]
+            del self._base_points[key]
+
+    @staticmethod
+    def _snapshot(xp_points: XpPoint) -> XpPoint:
+        return XpPoint(
+            user_id=xp_points.user_id,
+            server_id=xp_points.server_id,
+            points=xp_points.points,
+            level=xp_points.level,
+            version=xp_points.version,
+            updated_at=xp_points.updated_at
+        )
@@ -7,7 +7,8 @@ from datetime import datetime, timedelta
 import discord
 from discord import app_commands
 
-from bot.models.user import User
+from bot.level.xp_buffer import XpBuffer
+from bot.misc.scheduler import Scheduler
 from bot.models.xp_point import XpPoint
 from bot.servers import cache
 from bot.utils import paginate
@@ -21,7 +22,19 @@ class LevelCmds(app_commands.Group):
     def __init__(self, client):
         self.client = client
         self.client.add_listener(self.on_message)
+        self.xp_buffer = XpBuffer(
+            max_pending=int(os.environ.get("XP_MAX_PENDING_UPDATES", '500')),
+            max_entries=int(os.environ.get("XP_CACHE_SIZE", '10000')),
+            ttl=int(os.environ.get("XP_CACHE_TTL", '300'))
+        )
+        self.client.scheduler_callbacks.append(self._schedule_xp_flush)
+        self.client.shutdown_callbacks.append(self.xp_buffer.flush)
         super().__init__(name='nível')
+
+    def _schedule_xp_flush(self, scheduler_bot: Scheduler):
+        scheduler_bot.register_function('flush_xp_points', self.xp_buffer.flush)
+        scheduler_bot.add_periodical_job('interval', {'seconds': int(os.environ.get("XP_FLUSH_INTERVAL", '30'))},
+                                         'flush_xp_points', job_id='flush_xp_points_scheduled_job')
     
     async def on_message(self, message):
         if message.author.bot or not message.guild:
@@ -30,11 +43,16 @@ class LevelCmds(app_commands.Group):
         await self._send_autoreply(message)
         
         xp_points = await self.update_data(message.author, message.guild.id)
+        points, level = xp_points.points, xp_points.level
         exp = random.randint(5, 15)
         await self.add_xp(xp_points, exp)
+        self.xp_buffer.update_user_name(message.author.id, message.author.name)
+        if xp_points.points == points:
+            return
+        # Kept pending while level up is announced, so XP points are not read again meanwhile
+        self.xp_buffer.mark_pending(xp_points, message.author.name)
         await self.level_up(xp_points, message)
-        await XpPoint.save(xp_points)
-        await self._update_user_name(message.author)
+        await self.xp_buffer.mark_changed(xp_points, message.author.name)
 
     async def _send_autoreply(self, message):
         autoreply_config = cache.get_autoreply_to_message(
@@ -53,15 +71,7 @@ class LevelCmds(app_commands.Group):
             await message.channel.send(autoreply_config.image_url)
 
     async def update_data(self, user, server_id):
-        xp_points = await XpPoint.get_by_user_and_server(user.id, server_id)
-        if not xp_points:
-            xp_points = XpPoint()
-            xp_points.user = await User.get(user.id) or User(id=user.id, name=user.name)
-            xp_points.server_id = server_id
-            xp_points.points = 0
-            xp_points.level = 1
-            xp_points.updated_at = datetime.utcnow()
-        return xp_points
+        return await self.xp_buffer.get(user.id, server_id)
 
     async def add_xp(self, xp_points, xp):
         if (xp_points.updated_at - datetime.utcnow()).seconds > 40:
@@ -75,18 +85,12 @@ class LevelCmds(app_commands.Group):
         bot_env = os.environ.get("ENV", 'dev')
 
         if level_start < level_end:
+            # Level is updated before announcing it, so it is announced only once
+            xp_points.level = level_end
             if bot_env == 'prod':
                 await message.channel.send(
                     '{} subiu ao nível {}! Assistiremos sua carreira com grande interesse.'.format(
                         message.author.mention, level_end))
-            xp_points.level = level_end
-
-    async def _update_user_name(self, author):
-        user = await User.get(author.id) or User(id=author.id, name=author.name)
-        if user.name != author.name:
-            user.name = author.name
-            await User.save(user)
-        return user
 
     @app_commands.command(
         name="level",
@@ -101,7 +105,8 @@ class LevelCmds(app_commands.Group):
             o seu nível de usuário será retornado.
         """
         selected_user = user if user else interaction.user
-        xp_point = await XpPoint.get_by_user_and_server(selected_user.id, interaction.guild_id)
+        xp_point = (self.xp_buffer.get_cached(selected_user.id, interaction.guild_id) or
+            await XpPoint.get_by_user_and_server(selected_user.id, interaction.guild_id))
         if not xp_point:
             xp_point = XpPoint(level=0, points=0)
 
@@ -123,6 +128,7 @@ class LevelCmds(app_commands.Group):
         Mostra a tabela de niveis de usuários em ordem de maior pra menor
         """
         page_size = 5
+        await self.xp_buffer.flush()
         xp_points = await XpPoint.list_by_server(interaction.guild_id)
 
         rank, last_page = paginate(xp_points, page_number, page_size)
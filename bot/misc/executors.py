@@ -0,0 +1,187 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from bot.misc.rendering import warm_up_worker
+
+IMAGE_RENDERING = 'image_rendering'
+RENDERING_PROCESSES = 'rendering_processes'
+BLOCKING_IO = 'blocking_io'
+WIKI_BOT = 'wiki_bot'
+
+EXECUTORS_CONFIG = {
+    IMAGE_RENDERING: ("IMAGE_RENDERING_MAX_WORKERS", str(min(4, os.cpu_count() or 1))),
+    RENDERING_PROCESSES: ("RENDERING_PROCESSES_MAX_WORKERS", str(min(4, os.cpu_count() or 1))),
+    BLOCKING_IO: ("BLOCKING_IO_MAX_WORKERS", '8'),
+    WIKI_BOT: ("WIKI_BOT_MAX_WORKERS", '2'),
+}
+
+PROCESS_EXECUTORS_INITIALIZERS = {
+    RENDERING_PROCESSES: warm_up_worker,
+}
+
+
+class NamedExecutor(Executor):
+    """
+    Long-lived pool shared by every task of a kind
+
+    Pool is created on first use and limits how many tasks run at once.
+    Tasks submitted while every worker is busy wait in line and are
+    counted as pending.
+
+    Pool may be made of worker processes instead of threads, in which case
+    submitted functions and their arguments must be picklable. Tasks handed
+    to worker processes are counted as pending until they finish, as the
+    parent process can't tell when they start running.
+
+    :param name: Executor's name, used as its threads' name prefix
+    :type name: str
+    :param max_workers: Max number of tasks running at once
+    :type max_workers: int
+    :param processes: Whether to run tasks on worker processes
+    :type processes: bool
+    :param initializer: Function called by each worker process on start
+    :type initializer: Optional[Callable]
+    """
+
+    def __init__(self, name: str, max_workers: int, processes: bool=False,
+                 initializer: Optional[Callable]=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.processes = processes
+        self.initializer = initializer
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self._executor: Executor = None
+        self._lock = Lock()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._lock:
+            if not self._executor:
+                self._executor = self._build_executor()
+            self.pending += 1
+            if not self.processes:
+                return self._executor.submit(self._run, fn, *args, **kwargs)
+            try:
+                future = self._executor.submit(fn, *args, **kwargs)
+            except Exception:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._process_task_done)
+        return future
+
+    def shutdown(self, wait: bool=True, *, cancel_futures: bool=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Executor's size and number of pending, running and completed tasks
+
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "pending": self.pending,
+                "active": self.active,
+                "completed": self.completed
+            }
+
+    def _build_executor(self) -> Executor:
+        if self.processes:
+            # Forking a process running an event loop and threads is unsafe
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=self.initializer
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+
+    def _process_task_done(self, _: Future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self.pending -= 1
+            self.active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+
+_executors: Dict[str, NamedExecutor] = {}
+_executors_lock = Lock()
+
+def get_executor(name: str) -> NamedExecutor:
+    """
+    Gets executor by its name. Its size is read from the environment
+    variable set for it in `EXECUTORS_CONFIG`
+
+    :param name: Executor's name
+    :type name: str
+    :rtype: NamedExecutor
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if not executor:
+            max_workers_env, default_max_workers = EXECUTORS_CONFIG[name]
+            executor = NamedExecutor(
+                name,
+                int(os.environ.get(max_workers_env, default_max_workers)),
+                processes=name in PROCESS_EXECUTORS_INITIALIZERS,
+                initializer=PROCESS_EXECUTORS_INITIALIZERS.get(name)
+            )
+            _executors[name] = executor
+        return executor
+
+def get_rendering_executor() -> NamedExecutor:
+    """
+    Gets executor for image rendering tasks. Tasks run on `image_rendering`
+    threads, unless `RENDERING_EXECUTOR` is set to `processes`, in which
+    case they run on `rendering_processes` worker processes.
+
+    :rtype: NamedExecutor
+    :raises ValueError: Unknown rendering executor kind
+    """
+    kind = os.environ.get("RENDERING_EXECUTOR", 'threads')
+    if kind == 'threads':
+        return get_executor(IMAGE_RENDERING)
+    if kind == 'processes':
+        return get_executor(RENDERING_PROCESSES)
+    raise ValueError(f'Unknown rendering executor: {kind}')
+
+def executors_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Stats of every executor in use
+
+    :rtype: Dict[str, Dict[str, int]]
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+    return {executor.name: executor.stats() for executor in executors}
+
+def shutdown_executors(wait: bool=True):
+    """
+    Shuts down every executor, waiting for running and pending tasks
+    to finish unless told otherwise
+
+    :param wait: Whether to wait for tasks to finish
+    :type wait: bool
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+    for executor in executors:
+        logging.info(f'Shutting down {executor.name} executor: {executor.stats()}')
+        executor.shutdown(wait=wait)
@@ -0,0 +1,87 @@
+import logging
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageFont
+
+PRELOADED_FONTS = {
+    "TRUETYPE_FONT_FOR_PROFILE": [24, 32, 48, 72],
+    "TRUETYPE_FONT_FOR_USERS_PATH": [18],
+    "TRUETYPE_FONT_FOR_POINTS_PATH": [20],
+}
+
+PRELOADED_IMAGES = [
+    os.path.join('bot', 'images', 'profile_frame.png'),
+    os.path.join('bot', 'images', 'profile_default_background.jpg'),
+]
+
+
+@lru_cache(maxsize=64)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    Loads TrueType font, reusing it on later calls
+
+    :param path: Font file path
+    :type path: str
+    :param size: Font size
+    :type size: int
+    :rtype: ImageFont.FreeTypeFont
+    """
+    return ImageFont.truetype(path, size=size)
+
+
+@lru_cache(maxsize=64)
+def load_image(path: str) -> Image.Image:
+    """
+    Loads image file, reusing it on later calls.
+    Returned image is shared, so copy it before drawing on it.
+
+    :param path: Image file path
+    :type path: str
+    :rtype: Image.Image
+    """
+    with open(path, 'rb') as f:
+        image = Image.open(f)
+        image.load()
+    return image
+
+
+def warm_up_worker():
+    """
+    Preloads fonts and sprites used by image renderers, so rendering
+    worker processes are ready before they get their first task
+    """
+    for font_path_env, sizes in PRELOADED_FONTS.items():
+        font_path = os.environ.get(font_path_env)
+        if not font_path:
+            continue
+        for size in sizes:
+            try:
+                load_font(font_path, size)
+            except OSError as e:
+                logging.warning(f'Could not preload font {font_path}: {e}')
+                break
+    for image_path in PRELOADED_IMAGES:
+        try:
+            load_image(image_path)
+        except OSError as e:
+            logging.warning(f'Could not preload image {image_path}: {e}')
+
+    try:
+        from bot.chess.rendering import render_board
+        # Rasterises the default board and, for the Pillow renderer, every piece sprite
+        render_board(
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR', None,
+            ("#ffffdd", "#86a666", "#96d6d4", "#4fa28e")
+        )
+    except Exception as e:
+        logging.warning(f'Could not preload chess board sprites: {e}')
+
+    try:
+        from bot.card_jitsu.bot import Bot
+        from bot.card_jitsu.rendering import card_sprites
+        card_jitsu_bot = Bot()
+        card_sprites.load(
+            ((card.id, card.value) for card in card_jitsu_bot.starter_deck.cards), scale=card_jitsu_bot.image_scale)
+    except Exception as e:
+        logging.warning(f'Could not preload card jitsu sprites: {e}')
@@ -1,13 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from sqlalchemy import (BigInteger, Column, ForeignKey, SmallInteger, String,
-                        and_, func, or_, select)
+from sqlalchemy import (BigInteger, Column, ForeignKey, Index, SmallInteger,
+                        String, and_, func, or_, select, update)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship, subqueryload
 
 from bot.models import Base, engine
 from bot.models.guid import GUID
+from bot.models.user import User
 
 
 class ChessGame(Base):
@@ -18,9 +19,14 @@ class ChessGame(Base):
     player1 = relationship('User', foreign_keys=[player1_id])
     player2 = relationship('User', foreign_keys=[player2_id])
     pgn = Column(String)
+    moves = Column(String, nullable=True)
     result = Column(SmallInteger, nullable=True)
     color_schema = Column(String, nullable=True)
     cpu_level = Column(SmallInteger, nullable=True)
+    __table_args__ = (
+        Index('ix_chess_game_player1_id_result', player1_id, result),
+        Index('ix_chess_game_player2_id_result', player2_id, result),
+    )
 
     @classmethod
     async def get(cls, chess_game_id: str, preload_players: bool=False) -> Optional['ChessGame']:
@@ -61,3 +67,59 @@ class ChessGame(Base):
             session.add(chess_game)
             await session.commit()
             return chess_game.id
+
+    @classmethod
+    async def save_with_players(cls, chess_game_id: Optional[str], players: List[Tuple[int, str]],
+                                **values) -> str:
+        """
+        Creates or updates a chess game in a single transaction. Players are
+        only looked up, and created if missing, when the game is new.
+
+        :param chess_game_id: Chess game's UUID or None for a new game
+        :type chess_game_id: Optional[str]
+        :param players: Id and name of player 1 and player 2
+        :type players: List[Tuple[int, str]]
+        :return: Chess game's UUID
+        :rtype: str
+        """
+        async with AsyncSession(engine) as session:
+            chess_game = None
+            if chess_game_id:
+                chess_game = (await session.execute(
+                    select(ChessGame).where(ChessGame.id == chess_game_id)
+                )).scalars().first()
+            if not chess_game:
+                chess_game = ChessGame()
+                players_ids = set(player_id for player_id, _ in players)
+                existing_users_ids = set((await session.execute(
+                    select(User.id).where(User.id.in_(players_ids))
+                )).scalars().fetchall())
+                for player_id, player_name in dict(players).items():
+                    if player_id not in existing_users_ids:
+                        session.add(User(id=player_id, name=player_name))
+                chess_game.player1_id, chess_game.player2_id = [player_id for player_id, _ in players]
+                session.add(chess_game)
+            for attribute, value in values.items():
+                setattr(chess_game, attribute, value)
+            await session.flush()
+            chess_game_id = chess_game.id
+            await session.commit()
+            return chess_game_id
+
+    @classmethod
+    async def append_moves(cls, chess_game_id: str, moves: List[str]):
+        """
+        Appends moves to chess game's move list without rewriting its PGN
+
+        :param chess_game_id: Chess game's UUID
+        :type chess_game_id: str
+        :param moves: Moves in UCI notation
+        :type moves: List[str]
+        """
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                update(ChessGame).where(ChessGame.id == chess_game_id).values(
+                    moves=func.concat_ws(' ', ChessGame.moves, ' '.join(moves))
+                )
+            )
+            await session.commit()
@@ -0,0 +1,109 @@
+import random
+from typing import List, Optional
+
+from sqlalchemy import Column, Integer, String, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.models import Base, engine
+
+
+class ChessPuzzle(Base):
+    __tablename__ = 'chess_puzzle'
+    id = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False, unique=True)
+    fen = Column(String, nullable=False)
+    blunder_move = Column(String, nullable=False)
+    forced_line = Column(String, nullable=False)
+    rating = Column(Integer, nullable=True, index=True)
+    themes = Column(ARRAY(String), nullable=True)
+
+    def to_dict(self) -> dict:
+        """
+        Puzzle in the format `Puzzle.build_puzzle` expects
+
+        :rtype: dict
+        """
+        return {
+            "data": {
+                "id": self.id,
+                "fenBefore": self.fen,
+                "blunderMove": self.blunder_move,
+                "forcedLine": self.forced_line.split(' '),
+                "rating": self.rating,
+                "themes": self.themes or []
+            }
+        }
+
+    @classmethod
+    async def get_random(cls, min_rating: Optional[int]=None, max_rating: Optional[int]=None,
+                         theme: Optional[str]=None) -> Optional['ChessPuzzle']:
+        """
+        Gets a random puzzle, optionally within a rating range and with a theme.
+
+        Puzzles are numbered by a dense, indexed position, so a random one is
+        picked by looking up the first puzzle at or after a random position,
+        without counting or sorting the table. That is a single index lookup
+        only without filters: filters are checked on puzzles scanned in
+        position order from there, so rare ratings or themes take a longer scan,
+        and puzzles right after a long run of non matching ones are picked more often.
+
+        :param min_rating: Min puzzle rating
+        :type min_rating: Optional[int]
+        :param max_rating: Max puzzle rating
+        :type max_rating: Optional[int]
+        :param theme: Theme the puzzle must have
+        :type theme: Optional[str]
+        :return: Puzzle or None if there is no matching puzzle
+        :rtype: Optional[ChessPuzzle]
+        """
+        filters = []
+        if min_rating is not None:
+            filters.append(ChessPuzzle.rating >= min_rating)
+        if max_rating is not None:
+            filters.append(ChessPuzzle.rating <= max_rating)
+        if theme:
+            filters.append(ChessPuzzle.themes.contains([theme]))
+
+        async with AsyncSession(engine) as session:
+            max_position = (await session.execute(select(func.max(ChessPuzzle.position)))).scalar()
+            if not max_position:
+                return None
+            start_position = random.randint(1, max_position)
+            # Wrap around to the beginning if no puzzle matches after start position
+            for position_filter in [ChessPuzzle.position >= start_position, ChessPuzzle.position < start_position]:
+                chess_puzzle = (await session.execute(
+                    select(ChessPuzzle)
+                        .where(position_filter, *filters)
+                        .order_by(ChessPuzzle.position)
+                        .limit(1)
+                )).scalars().first()
+                if chess_puzzle:
+                    return chess_puzzle
+            return None
+
+    @classmethod
+    async def save_many(cls, chess_puzzles: List['ChessPuzzle']) -> int:
+        """
+        Stores puzzles which are not stored yet, numbering them after
+        existing ones. Puzzles already stored are skipped.
+
+        :param chess_puzzles: Puzzles to be stored, without position
+        :type chess_puzzles: List[ChessPuzzle]
+        :return: Number of stored puzzles
+        :rtype: int
+        """
+        chess_puzzles = list({chess_puzzle.id: chess_puzzle for chess_puzzle in chess_puzzles}.values())
+        async with AsyncSession(engine) as session:
+            # Keeps positions dense if puzzles are imported concurrently
+            await session.execute(text('LOCK TABLE chess_puzzle IN SHARE ROW EXCLUSIVE MODE'))
+            existing_ids = set((await session.execute(
+                select(ChessPuzzle.id).where(ChessPuzzle.id.in_([p.id for p in chess_puzzles]))
+            )).scalars().fetchall())
+            last_position = (await session.execute(select(func.max(ChessPuzzle.position)))).scalar() or 0
+            new_chess_puzzles = [p for p in chess_puzzles if p.id not in existing_ids]
+            for position, chess_puzzle in enumerate(new_chess_puzzles, start=last_position + 1):
+                chess_puzzle.position = position
+            session.add_all(new_chess_puzzles)
+            await session.commit()
+            return len(new_chess_puzzles)
@@ -0,0 +1,26 @@
+"""add_version_to_xp_point
+
+Revision ID: 9e7d2c4a6b15
+Revises: f4c1b8e2a9d3
+Create Date: 2026-10-18 11:47:05.218390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e7d2c4a6b15'
+down_revision = 'f4c1b8e2a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('xp_point',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade():
+    op.drop_column('xp_point', 'version')
@@ -0,0 +1,38 @@
+"""create_chess_puzzle_table
+
+Revision ID: b8f3a1d9c742
+Revises: 9e7d2c4a6b15
+Create Date: 2026-10-18 15:02:41.530276
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f3a1d9c742'
+down_revision = '9e7d2c4a6b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'chess_puzzle',
+        sa.Column('id', sa.String, primary_key=True),
+        sa.Column('position', sa.Integer, nullable=False, unique=True),
+        sa.Column('fen', sa.String, nullable=False),
+        sa.Column('blunder_move', sa.String, nullable=False),
+        sa.Column('forced_line', sa.String, nullable=False),
+        sa.Column('rating', sa.Integer, nullable=True),
+        sa.Column('themes', postgresql.ARRAY(sa.String), nullable=True),
+    )
+    op.create_index('ix_chess_puzzle_rating', 'chess_puzzle', ['rating'])
+    op.create_index('ix_chess_puzzle_themes', 'chess_puzzle', ['themes'], postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_chess_puzzle_themes', 'chess_puzzle')
+    op.drop_index('ix_chess_puzzle_rating', 'chess_puzzle')
+    op.drop_table('chess_puzzle')
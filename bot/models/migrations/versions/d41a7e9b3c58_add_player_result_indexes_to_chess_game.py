@@ -0,0 +1,26 @@
+"""add_player_result_indexes_to_chess_game
+
+Revision ID: d41a7e9b3c58
+Revises: b8f3a1d9c742
+Create Date: 2026-10-18 15:40:12.804113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a7e9b3c58'
+down_revision = 'b8f3a1d9c742'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_chess_game_player1_id_result', 'chess_game', ['player1_id', 'result'])
+    op.create_index('ix_chess_game_player2_id_result', 'chess_game', ['player2_id', 'result'])
+
+
+def downgrade():
+    op.drop_index('ix_chess_game_player2_id_result', 'chess_game')
+    op.drop_index('ix_chess_game_player1_id_result', 'chess_game')
@@ -0,0 +1,26 @@
+"""add_moves_to_chess_game
+
+Revision ID: f4c1b8e2a9d3
+Revises: cd357e720fae
+Create Date: 2026-10-18 10:12:31.402815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c1b8e2a9d3'
+down_revision = 'cd357e720fae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('chess_game',
+        sa.Column('moves', sa.String(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('chess_game', 'moves')
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import subqueryload
+
+from bot.models import engine
+from bot.models.astrology_chart import AstrologyChart
+from bot.models.chess_game import ChessGame
+from bot.models.user import User
+from bot.models.user_profile_item import UserProfileItem
+from bot.models.xp_point import XpPoint
+
+
+@dataclass
+class ProfileData:
+    """
+    Everything shown on an user's profile banner
+    """
+    user: User
+    astrology_chart: Optional[AstrologyChart]
+    chess_victories: int
+    total_points: int
+
+    @classmethod
+    async def get(cls, user_id: int) -> Optional['ProfileData']:
+        """
+        Loads user with equipped profile items, astrology chart, number of
+        chess victories and total XP points in a single query, besides
+        profile items' preloading, over one connection
+
+        :param user_id: User id
+        :type user_id: int
+        :return: Profile data or None if user does not exist
+        :rtype: Optional[ProfileData]
+        """
+        chess_victories = select(func.count()).select_from(ChessGame).where(
+            or_(
+                and_(ChessGame.result == 1, ChessGame.player1_id == User.id),
+                and_(ChessGame.result == -1, ChessGame.player2_id == User.id)
+            )
+        ).scalar_subquery()
+        total_points = select(func.coalesce(func.sum(XpPoint.points), 0)).where(
+            XpPoint.user_id == User.id
+        ).scalar_subquery()
+
+        async with AsyncSession(engine) as session:
+            row = (await session.execute(
+                select(User, AstrologyChart, chess_victories, total_points)
+                    .outerjoin(AstrologyChart, AstrologyChart.user_id == User.id)
+                    .where(User.id == user_id)
+                    .limit(1)
+                    .options(subqueryload(User.profile_items).subqueryload(UserProfileItem.profile_item))
+            )).first()
+            if not row:
+                return None
+            return ProfileData(*row)
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from uuid import uuid4
 
 from sqlalchemy import BigInteger, Column, ForeignKey, String
@@ -18,5 +19,9 @@ class ServerConfigAutoreply(Base):
     image_url = Column(String, nullable=True)
 
     def get_reply(self, message):
-        case_insensitive_pattern = re.compile(self.message_regex, re.I | re.DOTALL)
-        return re.sub(case_insensitive_pattern, self.reply, message)
+        return _compile_case_insensitive(self.message_regex).sub(self.reply, message)
+
+
+@lru_cache(maxsize=1024)
+def _compile_case_insensitive(regex):
+    return re.compile(regex, re.I | re.DOTALL)
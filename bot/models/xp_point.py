@@ -1,11 +1,14 @@
 from datetime import datetime
+from typing import Dict, List, Tuple
 
 from sqlalchemy import (BigInteger, Column, DateTime, ForeignKey, Integer,
-                        func, select)
+                        func, select, tuple_)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, relationship
 
 from bot.models import Base, engine
+from bot.models.user import User
 
 
 class XpPoint(Base):
@@ -16,6 +19,7 @@ class XpPoint(Base):
     updated_at = Column(DateTime, default=datetime.utcnow(), nullable=False)
     points = Column(Integer, default=0, nullable=False)
     level = Column(Integer, default=1, nullable=False)
+    version = Column(Integer, default=0, nullable=False)
 
     @classmethod
     async def get_by_user_and_server(cls, user_id, server_id):
@@ -24,6 +28,7 @@ class XpPoint(Base):
                 select(XpPoint)
                     .where(XpPoint.user_id == user_id)
                     .where(XpPoint.server_id == server_id)
+                    .options(joinedload(XpPoint.user))
             )).scalars().first()
 
     @classmethod
@@ -50,3 +55,90 @@ class XpPoint(Base):
             session.add(xp_point)
             await session.commit()
             return xp_point
+
+    @classmethod
+    async def save_all(cls, xp_points: List['XpPoint'], user_names: Dict[int, str],
+                       base_points: Dict[Tuple[int, int], int]=None) -> Dict[Tuple[int, int], Tuple[int, int, int]]:
+        """
+        Creates or updates many XP points in a single transaction.
+        Given XP points are not attached to the session, their values are copied.
+        Users are created if missing and renamed if their name has changed.
+
+        Rows are locked while being updated. If a row's version differs from the
+        given XP point's version, it was changed by someone else since it was read,
+        so only the points gained since then are added to it. The same goes for
+        rows inserted by someone else after they were found missing.
+
+        :param xp_points: XP points to be saved
+        :type xp_points: List[XpPoint]
+        :param user_names: Latest known name of each user id
+        :type user_names: Dict[int, str]
+        :param base_points: Points each XP point had when it was read. Defaults to zero
+        :type base_points: Dict[Tuple[int, int], int]
+        :return: Saved points, level and version of each XP point
+        :rtype: Dict[Tuple[int, int], Tuple[int, int, int]]
+        """
+        base_points = base_points or {}
+        saved_values = {}
+        async with AsyncSession(engine) as session:
+            if user_names:
+                users = {user.id: user for user in (await session.execute(
+                    select(User).where(User.id.in_(user_names.keys()))
+                )).scalars().fetchall()}
+                for user_id, user_name in user_names.items():
+                    user = users.get(user_id)
+                    if not user:
+                        insert_user = insert(User).values(id=user_id, name=user_name)
+                        await session.execute(insert_user.on_conflict_do_update(
+                            index_elements=[User.id], set_={'name': insert_user.excluded.name}))
+                    elif user.name != user_name:
+                        user.name = user_name
+
+            if xp_points:
+                existing_xp_points = {(x.user_id, x.server_id): x for x in (await session.execute(
+                    select(XpPoint).where(tuple_(XpPoint.user_id, XpPoint.server_id).in_(
+                        [(x.user_id, x.server_id) for x in xp_points])).with_for_update()
+                )).scalars().fetchall()}
+                for xp_point in xp_points:
+                    key = (xp_point.user_id, xp_point.server_id)
+                    saved_xp_point = existing_xp_points.get(key)
+                    if not saved_xp_point:
+                        saved_values[key] = await cls._insert_or_merge(
+                            session, xp_point, xp_point.points - base_points.get(key, 0))
+                        continue
+                    if saved_xp_point.version == (xp_point.version or 0):
+                        saved_xp_point.points = xp_point.points
+                        saved_xp_point.level = xp_point.level
+                    else:
+                        saved_xp_point.points += xp_point.points - base_points.get(key, 0)
+                        saved_xp_point.level = max(saved_xp_point.level, xp_point.level)
+                    saved_xp_point.updated_at = max(
+                        filter(None, [saved_xp_point.updated_at, xp_point.updated_at]))
+                    saved_xp_point.version = (saved_xp_point.version or 0) + 1
+                    saved_values[key] = (saved_xp_point.points, saved_xp_point.level,
+                                         saved_xp_point.version)
+
+            await session.commit()
+        return saved_values
+
+    @classmethod
+    async def _insert_or_merge(cls, session: AsyncSession, xp_point: 'XpPoint',
+                               gained_points: int) -> Tuple[int, int, int]:
+        insert_xp_point = insert(XpPoint).values(
+            user_id=xp_point.user_id,
+            server_id=xp_point.server_id,
+            points=xp_point.points,
+            level=xp_point.level,
+            updated_at=xp_point.updated_at or datetime.utcnow(),
+            version=1
+        )
+        # Row inserted by someone else meanwhile only gets the points gained here
+        return tuple((await session.execute(insert_xp_point.on_conflict_do_update(
+            index_elements=[XpPoint.user_id, XpPoint.server_id],
+            set_={
+                'points': XpPoint.points + gained_points,
+                'level': func.greatest(XpPoint.level, insert_xp_point.excluded.level),
+                'updated_at': func.greatest(XpPoint.updated_at, insert_xp_point.excluded.updated_at),
+                'version': XpPoint.version + 1
+            }
+        ).returning(XpPoint.points, XpPoint.level, XpPoint.version))).first())
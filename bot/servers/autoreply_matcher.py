@@ -0,0 +1,81 @@
+import logging
+import re
+from typing import List, Optional, Pattern, Tuple
+
+from bot.models.server_config_autoreply import ServerConfigAutoreply
+
+
+class AutoreplyMatcher():
+    """
+    Finds the first autoreply config whose regex matches a message
+
+    Consecutive regexes without groups are combined into a single alternation,
+    so a message is checked against many autoreplies in one pass. Since
+    alternatives are tried in order, the first matching autoreply is still the
+    one picked. Regexes with groups are kept on their own, as combining them
+    would renumber their groups. Invalid regexes are ignored.
+
+    :param autoreply_configs: Server's autoreply configs, in priority order
+    :type autoreply_configs: List[ServerConfigAutoreply]
+    :param max_patterns_per_chunk: Max number of regexes combined together
+    :type max_patterns_per_chunk: int
+    """
+
+    def __init__(self, autoreply_configs: List[ServerConfigAutoreply], max_patterns_per_chunk: int=50):
+        self.max_patterns_per_chunk = max_patterns_per_chunk
+        self._size = len(autoreply_configs)
+        self._chunks: List[Tuple[Pattern, List[ServerConfigAutoreply]]] = []
+
+        chunk_configs = []
+        for autoreply_config in autoreply_configs:
+            try:
+                pattern = re.compile(autoreply_config.message_regex)
+            except (re.error, TypeError) as e:
+                logging.warning(f'Ignoring invalid autoreply regex {autoreply_config.message_regex!r}: {e}')
+                continue
+            if pattern.groups:
+                self._add_chunk(chunk_configs)
+                chunk_configs = []
+                self._chunks.append((pattern, [autoreply_config]))
+                continue
+            chunk_configs.append(autoreply_config)
+            if len(chunk_configs) >= self.max_patterns_per_chunk:
+                self._add_chunk(chunk_configs)
+                chunk_configs = []
+        self._add_chunk(chunk_configs)
+
+    def match(self, message: str) -> Optional[ServerConfigAutoreply]:
+        """
+        Gets first autoreply config whose regex matches the beginning of given message
+
+        :param message: Message content
+        :type message: str
+        :return: Matching autoreply config or None
+        :rtype: Optional[ServerConfigAutoreply]
+        """
+        for pattern, autoreply_configs in self._chunks:
+            match = pattern.match(message)
+            if not match:
+                continue
+            if len(autoreply_configs) == 1:
+                return autoreply_configs[0]
+            return autoreply_configs[match.lastindex - 1]
+        return None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add_chunk(self, autoreply_configs: List[ServerConfigAutoreply]):
+        if not autoreply_configs:
+            return
+        if len(autoreply_configs) == 1:
+            self._chunks.append((re.compile(autoreply_configs[0].message_regex), autoreply_configs))
+            return
+        try:
+            pattern = re.compile('|'.join(f'({c.message_regex})' for c in autoreply_configs))
+        except re.error:
+            # Global inline flags, for instance, can't be combined with other regexes
+            for autoreply_config in autoreply_configs:
+                self._add_chunk([autoreply_config])
+            return
+        self._chunks.append((pattern, autoreply_configs))
@@ -1,7 +1,8 @@
-import re
-from typing import Dict, Optional
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 from bot.models.server_config import ServerConfig
+from bot.servers.autoreply_matcher import AutoreplyMatcher
 
 
 class Servers():
@@ -10,10 +11,18 @@ class Servers():
         self.server_configs: Dict[int, ServerConfig] = {}
         self.all_servers = []
         self.scheduler_functions = {}
+        self._autoreply_matchers: Dict[int, Tuple[ServerConfig, list, AutoreplyMatcher]] = {}
+        self._servers_by_user: Dict[int, Set[int]] = {}
+        self._users_by_server: Dict[int, Set[int]] = {}
+        self._user_languages: Dict[int, str] = {}
 
     async def load_configs(self):
         all_server_configs = await ServerConfig.all()
         self.server_configs = {sc.id: sc for sc in all_server_configs}
+        self._autoreply_matchers = {}
+        for server_config in all_server_configs:
+            self._get_autoreply_matcher(server_config)
+        self._user_languages = {}
 
     def get_config(self, server_id: int) -> ServerConfig:
         return self.server_configs.get(server_id)
@@ -24,12 +33,138 @@ class Servers():
             setattr(server_config, key, value)
         await ServerConfig.save(server_config)
         self.server_configs[server_id] = server_config
+        self._get_autoreply_matcher(server_config)
+        if 'language' in kwargs:
+            for user_id in self._users_by_server.get(server_id, ()):
+                self._user_languages.pop(user_id, None)
         return server_config
 
+    def set_servers(self, servers: list):
+        """
+        Sets servers the bot is in and indexes their members
+
+        :param servers: Bot's guilds
+        :type servers: List[discord.Guild]
+        """
+        self.all_servers = list(servers)
+        self._servers_by_user = {}
+        self._users_by_server = {}
+        self._user_languages = {}
+        for server in self.all_servers:
+            self._index_server_members(server.id, (member.id for member in server.members))
+
+    def add_server(self, server):
+        """
+        Adds a server the bot has joined and indexes its members
+
+        :param server: Joined guild
+        :type server: discord.Guild
+        """
+        self.remove_server(server)
+        self.all_servers.append(server)
+        self._index_server_members(server.id, (member.id for member in server.members))
+
+    def remove_server(self, server):
+        """
+        Removes a server the bot has left
+
+        :param server: Left guild
+        :type server: discord.Guild
+        """
+        self.all_servers = [s for s in self.all_servers if s.id != server.id]
+        for user_id in self._users_by_server.pop(server.id, set()):
+            self._remove_user_server(user_id, server.id)
+
+    def add_member(self, user_id: int, server_id: int):
+        """
+        Indexes a user who has joined a server
+
+        :param user_id: User id
+        :type user_id: int
+        :param server_id: Server id
+        :type server_id: int
+        """
+        self._index_server_members(server_id, [user_id])
+
+    def remove_member(self, user_id: int, server_id: int):
+        """
+        Unindexes a user who has left a server
+
+        :param user_id: User id
+        :type user_id: int
+        :param server_id: Server id
+        :type server_id: int
+        """
+        self._users_by_server.get(server_id, set()).discard(user_id)
+        self._remove_user_server(user_id, server_id)
+
+    def get_user_servers_ids(self, user_id: int) -> Set[int]:
+        """
+        Gets ids of servers both the bot and given user are in
+
+        :param user_id: User id
+        :type user_id: int
+        :rtype: Set[int]
+        """
+        return self._servers_by_user.get(user_id, set())
+
+    def get_user_language(self, user_id: int, default: str='en') -> str:
+        """
+        Gets most common language among servers given user is in
+
+        :param user_id: User id
+        :type user_id: int
+        :param default: Language for users who share no servers with the bot
+        :type default: str
+        :rtype: str
+        """
+        language = self._user_languages.get(user_id)
+        if language:
+            return language
+        servers_ids = self.get_user_servers_ids(user_id)
+        if not servers_ids:
+            return default
+        languages = Counter(self._get_server_language(server_id, default) for server_id in servers_ids)
+        language = languages.most_common(1)[0][0]
+        self._user_languages[user_id] = language
+        return language
+
+    def _get_server_language(self, server_id: int, default: str) -> str:
+        server_config = self.get_config(server_id)
+        if not server_config:
+            return default
+        return server_config.language
+
+    def _index_server_members(self, server_id: int, users_ids: Iterable[int]):
+        server_users_ids = self._users_by_server.setdefault(server_id, set())
+        for user_id in users_ids:
+            server_users_ids.add(user_id)
+            self._servers_by_user.setdefault(user_id, set()).add(server_id)
+            self._user_languages.pop(user_id, None)
+
+    def _remove_user_server(self, user_id: int, server_id: int):
+        user_servers_ids = self._servers_by_user.get(user_id)
+        if user_servers_ids is None:
+            return
+        user_servers_ids.discard(server_id)
+        if not user_servers_ids:
+            del self._servers_by_user[user_id]
+        self._user_languages.pop(user_id, None)
+
     def get_autoreply_to_message(self, server_id: int, message: str) -> Optional[str]:
         server_config = self.get_config(server_id)
         if not server_config or not server_config.autoreply_configs:
             return
-        for autoreply_config in server_config.autoreply_configs:
-            if re.match(autoreply_config.message_regex, message):
-                return autoreply_config
+        return self._get_autoreply_matcher(server_config).match(message)
+
+    def _get_autoreply_matcher(self, server_config: ServerConfig) -> AutoreplyMatcher:
+        cached_server_config, autoreply_configs, matcher = self._autoreply_matchers.get(
+            server_config.id, (None, None, None))
+        # Matchers are rebuilt whenever server's config or its autoreplies are replaced
+        if (cached_server_config is not server_config or
+                autoreply_configs is not server_config.autoreply_configs or
+                len(autoreply_configs) != len(matcher)):
+            matcher = AutoreplyMatcher(server_config.autoreply_configs)
+            self._autoreply_matchers[server_config.id] = (
+                server_config, server_config.autoreply_configs, matcher)
+        return matcher
@@ -2,13 +2,16 @@ import os
 from bot.i18n import i18n
 from io import BytesIO
 
-from PIL import Image, ImageColor, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw
 
 from bot.astrology.astrology_chart import AstrologyChart
-from bot.models.chess_game import ChessGame
+from bot.misc.rendering import load_font, load_image
+from bot.models.profile_data import ProfileData
 from bot.models.profile_item import ProfileItemType
 from bot.models.user import User
-from bot.models.xp_point import XpPoint
+from bot.social.profile_assets import profile_asset_cache
+from bot.social.profile_cache import profile_cache
+from bot.utils import run_rendering_task
 
 
 class Profile():
@@ -35,11 +38,13 @@ class Profile():
             raise
         user.profile_frame_color = color
         await User.save(user)
+        profile_cache.invalidate(user_id)
         return user
     
     async def get_user_profile(self, user_id: int, user_avatar: bytes, lang='en'):
         """
-        Generates an user profile image banner
+        Generates an user profile image banner.
+        Banners are cached until any data shown on them changes.
 
         :param user_id: User id
         :type user_id: int
@@ -53,9 +58,15 @@ class Profile():
         text_max_width = 10
         default_color = '#ca2222'
         
-        user = await User.get(user_id, preload_profile_items=True)
-        if not user:
+        cached_profile = profile_cache.get(user_id, lang, user_avatar)
+        if cached_profile:
+            return BytesIO(cached_profile)
+        generation = profile_cache.generation(user_id)
+
+        profile_data = await ProfileData.get(user_id)
+        if not profile_data:
             return
+        user = profile_data.user
         user_name = user.name if user.name else ''
         user_profile_badges = [item.profile_item
             for item in user.profile_items
@@ -65,70 +76,88 @@ class Profile():
             for item in user.profile_items
             if item.equipped and item.profile_item.type == ProfileItemType.wallpaper
         ), None)
-        user_chart = await self.astrology_bot.get_user_chart(user_id)
         user_sign = None
-        if user_chart:
+        if profile_data.astrology_chart:
+            user_chart = self.astrology_bot.build_user_chart(profile_data.astrology_chart)
             user_sign = self.astrology_bot.get_sun_sign(user_chart)
-        user_chess_victories = await ChessGame.get_number_of_victories(user_id)
-        user_total_points = await XpPoint.get_user_aggregated_points(user_id)
-        if not user_total_points:
-            user_total_points = 0
-
-        with open(os.path.join('bot', 'images', 'profile_frame.png'), 'rb') as f:
-            image_frame = Image.open(f).convert('RGBA')
-            image_frame_draw = ImageDraw.Draw(image_frame)
-            frame_color = ImageColor.getcolor(user.profile_frame_color or default_color, 'RGB')
-            image_frame_draw.bitmap((0, 0), image_frame, fill=frame_color + (175,))
-
-        image_final = self._draw_wallpaper(image_frame, user_profile_wallpaper)
-        
-        image_font_title = ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_PROFILE"), size=48)
-        image_font_subtitle = ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_PROFILE"), size=32)
-        image_font_description = ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_PROFILE"), size=24)
-        image_user_avatar = Image.open(BytesIO(user_avatar))
-
-        image_draw = ImageDraw.Draw(image_final)
-        user_name_width = 390
-        image_frame_draw.rectangle([(0, 0), (user_name_width + 120, 107)], fill=frame_color + (255,))
-        image_final.alpha_composite(image_frame)
-
-        image_draw.text((120, 25), user_name[:15], fill="#FFF", font=image_font_title)
-        image_draw.text((30, 635), f'{i18n("Points", lang)}: {user_total_points}', fill="#FFF", font=image_font_description)
-        image_draw.text((400, 620), f'{i18n("Chess wins", lang)}: {user_chess_victories}', fill="#FFF", font=image_font_subtitle)
-        image_draw.text((400, 580), f'{i18n("Sign", lang)}: {user_sign}', fill="#FFF", font=image_font_subtitle)
-        if image_user_avatar.mode == 'RGBA':
-            user_avatar_mask = image_user_avatar.resize((108, 108))
-        else:
-            user_avatar_mask = None
-        image_final.paste(image_user_avatar.resize((108, 108)), (0, 0), mask=user_avatar_mask)
-        image_final = self._draw_user_badges(image_final, user_profile_badges)
-
-        bytesio = BytesIO()
-        image_final.save(bytesio, format="png")
-        bytesio.seek(0)
-        return bytesio
-
-    def _draw_wallpaper(self, image_frame, profile_item):
-        image_bytes_io = profile_item and profile_item.get_file_contents()
-        if not image_bytes_io:
-            with open(os.path.join('bot', 'images', 'profile_default_background.jpg'), 'rb') as f:
-                image_final = Image.open(f).crop(
-                    (100, 0, image_frame.size[0] + 100, image_frame.size[1])).convert('RGBA')
-        else:
-            image_final = Image.open(image_bytes_io).crop(
-                    (0, 0, image_frame.size[0], image_frame.size[1])).convert('RGBA').convert('RGBA')
-        return image_final
-    
-    def _draw_user_badges(self, image, profile_items):
-        for index, profile_item in enumerate(profile_items):
-            image_bytes_io = profile_item.get_file_contents()
-            if not image_bytes_io:
-                continue
-            image_badge = Image.open(image_bytes_io)
-            image_badge_resized = image_badge.resize((60, 60))
-            x_position = 520 + index * 70
-            if image_badge_resized.mode == 'RGBA':
-                image.paste(image_badge_resized, (x_position, 10), mask=image_badge_resized)
-            else:
-                image.paste(image_badge_resized, (x_position, 10))
+        user_chess_victories = profile_data.chess_victories
+        user_total_points = profile_data.total_points
+
+        image = await run_rendering_task(render_profile, {
+            "user_name": user_name,
+            "frame_color": user.profile_frame_color or default_color,
+            "avatar_bytes": user_avatar,
+            "wallpaper": user_profile_wallpaper and (str(user_profile_wallpaper.id), user_profile_wallpaper.file_path),
+            "badges": [(str(profile_item.id), profile_item.file_path) for profile_item in user_profile_badges],
+            "points_text": f'{i18n("Points", lang)}: {user_total_points}',
+            "chess_victories_text": f'{i18n("Chess wins", lang)}: {user_chess_victories}',
+            "sign_text": f'{i18n("Sign", lang)}: {user_sign}'
+        })
+        profile_cache.put(user_id, lang, user_avatar, image.getvalue(), generation)
         return image
+
+
+def render_profile(profile_info: dict) -> BytesIO:
+    """
+    Renders an user profile image banner
+
+    :param profile_info: User's name, frame color, avatar's bytes, wallpaper and badges'
+        ids and file paths and texts to be displayed, as built by `Profile.get_user_profile`
+    :type profile_info: dict
+    :return: User's profile banner
+    :rtype: BytesIO
+    """
+    image_frame = load_image(os.path.join('bot', 'images', 'profile_frame.png')).convert('RGBA')
+    image_frame_draw = ImageDraw.Draw(image_frame)
+    frame_color = ImageColor.getcolor(profile_info["frame_color"], 'RGB')
+    image_frame_draw.bitmap((0, 0), image_frame, fill=frame_color + (175,))
+
+    image_final = _draw_wallpaper(image_frame, profile_info["wallpaper"])
+
+    font_path = os.environ.get("TRUETYPE_FONT_FOR_PROFILE")
+    image_font_title = load_font(font_path, 48)
+    image_font_subtitle = load_font(font_path, 32)
+    image_font_description = load_font(font_path, 24)
+    image_user_avatar = Image.open(BytesIO(profile_info["avatar_bytes"]))
+
+    image_draw = ImageDraw.Draw(image_final)
+    user_name_width = 390
+    image_frame_draw.rectangle([(0, 0), (user_name_width + 120, 107)], fill=frame_color + (255,))
+    image_final.alpha_composite(image_frame)
+
+    image_draw.text((120, 25), profile_info["user_name"][:15], fill="#FFF", font=image_font_title)
+    image_draw.text((30, 635), profile_info["points_text"], fill="#FFF", font=image_font_description)
+    image_draw.text((400, 620), profile_info["chess_victories_text"], fill="#FFF", font=image_font_subtitle)
+    image_draw.text((400, 580), profile_info["sign_text"], fill="#FFF", font=image_font_subtitle)
+    if image_user_avatar.mode == 'RGBA':
+        user_avatar_mask = image_user_avatar.resize((108, 108))
+    else:
+        user_avatar_mask = None
+    image_final.paste(image_user_avatar.resize((108, 108)), (0, 0), mask=user_avatar_mask)
+    image_final = _draw_user_badges(image_final, profile_info["badges"])
+
+    bytesio = BytesIO()
+    image_final.save(bytesio, format="png")
+    bytesio.seek(0)
+    return bytesio
+
+
+def _draw_wallpaper(image_frame, wallpaper):
+    image_final = wallpaper and profile_asset_cache.get_wallpaper(*wallpaper, image_frame.size)
+    if not image_final:
+        image_final = load_image(os.path.join('bot', 'images', 'profile_default_background.jpg')).crop(
+            (100, 0, image_frame.size[0] + 100, image_frame.size[1])).convert('RGBA')
+    return image_final
+
+
+def _draw_user_badges(image, badges):
+    for index, (item_id, file_path) in enumerate(badges):
+        image_badge_resized = profile_asset_cache.get_badge(item_id, file_path)
+        if not image_badge_resized:
+            continue
+        x_position = 520 + index * 70
+        if image_badge_resized.mode == 'RGBA':
+            image.paste(image_badge_resized, (x_position, 10), mask=image_badge_resized)
+        else:
+            image.paste(image_badge_resized, (x_position, 10))
+    return image
@@ -0,0 +1,147 @@
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+from PIL import Image
+
+BADGE_SIZE = (60, 60)
+
+
+class ProfileAssetCache():
+    """
+    Bounded LRU cache of profile items' images, already prepared to be
+    pasted on a profile banner
+
+    Images are keyed by profile item id and are loaded again once their file's
+    modification time or size changes. Least recently used images are evicted
+    once the decoded images add up to more than `max_bytes`. Callers get their
+    own copy of cached images, as profiles are rendered on several threads.
+
+    :param max_bytes: Max memory taken by decoded images
+    :type max_bytes: int
+    """
+
+    def __init__(self, max_bytes: int=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[Tuple[int, int], Image.Image]] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get_badge(self, item_id: str, file_path: str) -> Optional[Image.Image]:
+        """
+        Gets badge image, resized to `BADGE_SIZE`
+
+        :param item_id: Profile item id
+        :type item_id: str
+        :param file_path: Badge image file path
+        :type file_path: str
+        :return: Badge image or None if its file can't be read
+        :rtype: Optional[Image.Image]
+        """
+        return self._get(('badge', item_id), file_path, lambda image: image.resize(BADGE_SIZE))
+
+    def get_wallpaper(self, item_id: str, file_path: str, size: Tuple[int, int]) -> Optional[Image.Image]:
+        """
+        Gets wallpaper image, cropped to given size
+
+        :param item_id: Profile item id
+        :type item_id: str
+        :param file_path: Wallpaper image file path
+        :type file_path: str
+        :param size: Profile banner's width and height
+        :type size: Tuple[int, int]
+        :return: RGBA wallpaper image or None if its file can't be read
+        :rtype: Optional[Image.Image]
+        """
+        return self._get(
+            ('wallpaper', item_id, size), file_path,
+            lambda image: image.crop((0, 0, size[0], size[1])).convert('RGBA')
+        )
+
+    def invalidate(self, item_id: str):
+        """
+        Drops every image cached for given profile item
+
+        :param item_id: Profile item id
+        :type item_id: str
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == item_id]:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Clears cached images and resets counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache hit and miss counters and memory taken by cached images
+
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _get(self, key: Hashable, file_path: str,
+             prepare: Callable[[Image.Image], Image.Image]) -> Optional[Image.Image]:
+        try:
+            file_stat = os.stat(file_path)
+        except OSError as e:
+            logging.warning(e)
+            return None
+        file_version = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == file_version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1].copy()
+            self.misses += 1
+
+        try:
+            with open(file_path, 'rb') as f:
+                image = Image.open(f)
+                image.load()
+            image = prepare(image)
+        except OSError as e:
+            logging.warning(e)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (file_version, image)
+            self._bytes += _image_size(image)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+        return image.copy()
+
+    def _remove(self, key: Hashable):
+        _, image = self._entries.pop(key)
+        self._bytes -= _image_size(image)
+
+
+def _image_size(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+load_dotenv()
+profile_asset_cache = ProfileAssetCache(
+    max_bytes=int(os.environ.get("PROFILE_ASSET_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
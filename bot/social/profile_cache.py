@@ -0,0 +1,128 @@
+import os
+from collections import OrderedDict
+from hashlib import sha1
+from typing import Dict, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+ProfileKey = Tuple[int, str, str]
+
+
+class RenderedProfileCache():
+    """
+    Bounded LRU cache of rendered profile banners
+
+    Banners are keyed by user, language and avatar, and must be invalidated
+    whenever anything else shown on them changes. Every user has a generation
+    number, bumped on invalidation, so a banner rendered from data loaded
+    before an invalidation is not cached afterwards.
+
+    :param max_entries: Max number of banners kept
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries: int=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[ProfileKey, bytes] = OrderedDict()
+        self._keys_by_user: Dict[int, Set[ProfileKey]] = {}
+        self._generations: Dict[int, int] = {}
+
+    def get(self, user_id: int, lang: str, avatar_bytes: bytes) -> Optional[bytes]:
+        """
+        Gets cached banner, promoting it to most recently used
+
+        :param user_id: User id
+        :type user_id: int
+        :param lang: Banner's language
+        :type lang: str
+        :param avatar_bytes: User's avatar
+        :type avatar_bytes: bytes
+        :return: PNG image's bytes or None if not cached
+        :rtype: Optional[bytes]
+        """
+        key = self._key(user_id, lang, avatar_bytes)
+        image_bytes = self._entries.get(key)
+        if image_bytes is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return image_bytes
+
+    def generation(self, user_id: int) -> int:
+        """
+        Gets user's current generation, to be read before loading their data
+
+        :param user_id: User id
+        :type user_id: int
+        :rtype: int
+        """
+        return self._generations.get(user_id, 0)
+
+    def put(self, user_id: int, lang: str, avatar_bytes: bytes, image_bytes: bytes, generation: int):
+        """
+        Caches banner, unless user has been invalidated since `generation`
+
+        :param user_id: User id
+        :type user_id: int
+        :param lang: Banner's language
+        :type lang: str
+        :param avatar_bytes: User's avatar
+        :type avatar_bytes: bytes
+        :param image_bytes: Rendered banner
+        :type image_bytes: bytes
+        :param generation: User's generation when their data was loaded
+        :type generation: int
+        """
+        if generation != self.generation(user_id):
+            return
+        key = self._key(user_id, lang, avatar_bytes)
+        self._entries[key] = image_bytes
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *user_ids: int):
+        """
+        Drops every banner cached for given users
+
+        :param user_ids: Users' ids
+        :type user_ids: int
+        """
+        for user_id in user_ids:
+            self._generations[user_id] = self.generation(user_id) + 1
+            for key in self._keys_by_user.pop(user_id, set()):
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Clears cached banners and resets counters
+        """
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache hit and miss counters
+
+        :rtype: Dict[str, int]
+        """
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _key(self, user_id: int, lang: str, avatar_bytes: bytes) -> ProfileKey:
+        return (user_id, lang, sha1(avatar_bytes or b'').hexdigest())
+
+    def _remove(self, key: ProfileKey):
+        del self._entries[key]
+        user_keys = self._keys_by_user[key[0]]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._keys_by_user[key[0]]
+
+
+load_dotenv()
+profile_cache = RenderedProfileCache(max_entries=int(os.environ.get("PROFILE_CACHE_SIZE", '256')))
@@ -2,6 +2,7 @@ from typing import Dict, Iterator
 from pywikibot import config, Page, showDiff
 from pywikibot.exceptions import IsNotRedirectPageError, NoPageError
 
+from bot.misc.executors import WIKI_BOT
 from bot.sww.wiki_bot import WikiBot
 from bot.utils import run_blocking_io_task
 
@@ -11,11 +12,11 @@ class DoubleRedirectBot(WikiBot):
         config.put_throttle = 1
         super().__init__()
         
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_double_redirects(self) -> Iterator[Page]:
         return self.site.double_redirects()
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def fix_double_redirect(self, page: Page) -> Dict[str, Page]:
         try:
             target_page: Page = page.getRedirectTarget().getRedirectTarget()
@@ -24,7 +25,7 @@ class DoubleRedirectBot(WikiBot):
         page.text = f'#{self.site.redirect()} [[{target_page.title()}]]'
         return {'target_page': target_page, 'redirect_page': page}
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def save_page(self, page: Page) -> Page:
         if not self.site.logged_in():
             raise Exception("Bot not logged in")
@@ -1,13 +1,43 @@
+import asyncio
 import json
 import logging
 import os
-from asyncio import as_completed
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from io import BytesIO
+from typing import Dict, List, Optional, Tuple
 
 from aiohttp import ClientSession
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
-from bot.utils import paginate, run_cpu_bound_task, run_cpu_bound_task_with_event_loop
+from bot.misc.rendering import load_font
+from bot.sww.medal_cache import MEDAL_SIZE, medal_image_cache
+from bot.utils import paginate, run_rendering_task
+
+MAX_USERS_PER_PAGE = 10
+
+
+@dataclass
+class LeaderboardSnapshot():
+    """
+    Leaderboard and medals as of `fetched_at`
+
+    :param ranking: Users and their info sorted by points, as built by `Leaderboard.build_leaderboard`
+    :param medals: Medals' name, text, image URL and points
+    :param fetched_at: When data was fetched, in seconds since the epoch
+    :param version: Bumped whenever fetched data differs from previous snapshot's
+    """
+    ranking: List[Tuple[str, dict]]
+    medals: List[dict]
+    fetched_at: float
+    version: int = 0
+    medals_by_name: Dict[str, dict] = field(init=False)
+    rank_by_user: Dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.medals_by_name = {medal['name']: medal for medal in self.medals}
+        self.rank_by_user = {user_name: rank for rank, (user_name, _) in enumerate(self.ranking, start=1)}
 
 
 class Leaderboard():
@@ -18,9 +48,13 @@ class Leaderboard():
     
     def __init__(self, auto_close_session=False):
         self.auto_close_session = auto_close_session
-        self.medals_image_cache = {}
+        self.medals_image_cache = medal_image_cache
         self.main_session: ClientSession = None
-        self.threaded_session: ClientSession = None
+        self.snapshot_ttl = int(os.environ.get("SWW_LEADERBOARD_REFRESH_INTERVAL", '600'))
+        self.snapshot: Optional[LeaderboardSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.page_cache_size = int(os.environ.get("SWW_LEADERBOARD_PAGE_CACHE_SIZE", '32'))
+        self._pages: OrderedDict[Tuple[int, int], bytes] = OrderedDict()
 
     async def get(self):
         if not self.main_session:
@@ -39,6 +73,74 @@ class Leaderboard():
             if self.auto_close_session:
                 await self.main_session.close()
 
+    async def get_snapshot(self) -> LeaderboardSnapshot:
+        """
+        Gets latest leaderboard snapshot. A stale snapshot is returned right
+        away while a new one is fetched in background. Only the first call
+        waits for data to be fetched.
+
+        :rtype: LeaderboardSnapshot
+        """
+        if not self.snapshot:
+            return await self.refresh_snapshot()
+        if time.time() - self.snapshot.fetched_at >= self.snapshot_ttl:
+            self._start_refresh()
+        return self.snapshot
+
+    async def refresh_snapshot(self) -> LeaderboardSnapshot:
+        """
+        Fetches leaderboard and replaces current snapshot. Concurrent calls
+        share a single fetch.
+
+        :rtype: LeaderboardSnapshot
+        """
+        return await asyncio.shield(self._start_refresh())
+
+    def build_snapshot(self, medals_info, medals_points) -> LeaderboardSnapshot:
+        """
+        Builds a snapshot from leaderboard data, as returned by `get`
+
+        :rtype: LeaderboardSnapshot
+        """
+        medals = [{
+            'name': medal_name,
+            'text': medal_info['title'],
+            'image_url': medal_info['image_url'],
+            'points': int(medals_points[medal_name])
+        } for medal_name, medal_info in medals_info['dataMedal'].items()]
+        return LeaderboardSnapshot(
+            ranking=self.build_leaderboard(medals_info, medals_points),
+            medals=medals,
+            fetched_at=time.time()
+        )
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def _refresh(self) -> LeaderboardSnapshot:
+        try:
+            snapshot = self.build_snapshot(*(await self.get()))
+        except Exception as e:
+            if not self.snapshot:
+                raise
+            logging.warning(f'Could not refresh leaderboard, keeping stale one: {e}', exc_info=True)
+            return self.snapshot
+
+        if self.snapshot:
+            unchanged = snapshot.ranking == self.snapshot.ranking and snapshot.medals == self.snapshot.medals
+            snapshot.version = self.snapshot.version + (not unchanged)
+        self.snapshot = snapshot
+        for key in [key for key in self._pages if key[0] != snapshot.version]:
+            del self._pages[key]
+
+        try:
+            await self._prepare_medals_images((medal['name'], medal['image_url']) for medal in snapshot.medals)
+        except Exception as e:
+            logging.warning(f'Could not fetch medals images: {e}', exc_info=True)
+        return snapshot
+
     def build_leaderboard(self, medals_info, medals_points):
         try:
             leaderboard_users = {}
@@ -75,80 +177,116 @@ class Leaderboard():
             })
         return medals
 
-    @run_cpu_bound_task
-    @run_cpu_bound_task_with_event_loop
+    async def draw_leaderboard_page(self, snapshot: LeaderboardSnapshot, page: int) -> BytesIO:
+        """
+        Draws a page of snapshot's leaderboard, reusing pages already drawn
+        for the same snapshot version
+
+        :param snapshot: Leaderboard snapshot
+        :type snapshot: LeaderboardSnapshot
+        :param page: Page number, starting at 1
+        :type page: int
+        :return: Image's bytesIO
+        :rtype: BytesIO
+        """
+        _, last_page = paginate(snapshot.ranking, page, MAX_USERS_PER_PAGE)
+        key = (snapshot.version, min(max(page, 1), last_page))
+        image_bytes = self._pages.get(key)
+        if image_bytes is not None:
+            self._pages.move_to_end(key)
+            return BytesIO(image_bytes)
+
+        image_bytes = (await self.draw_leaderboard(snapshot.ranking, page)).getvalue()
+        # Pages of a replaced snapshot are not kept
+        if self.snapshot and snapshot.version == self.snapshot.version:
+            self._pages[key] = image_bytes
+            while len(self._pages) > self.page_cache_size:
+                self._pages.popitem(last=False)
+        return BytesIO(image_bytes)
+
     async def draw_leaderboard(self, leaderboard: list, page: int):
-        rectangle_height = 50
-        image_width = 500
-        text_spacing = 10
-        font_size = 18
-        medal_size = 30
-        max_users_per_page = 10
-        paginated_leaderboard, _ = paginate(leaderboard, page, max_users_per_page)
-        medal_positions = [5, int(medal_size * 0.5), int(medal_size * 0.833)]
-
-        unique_medals = set([(medal, user_info[1]['medals'][medal]['image_url']) for user_info in leaderboard for medal in user_info[1]['medals']])
+        paginated_leaderboard, _ = paginate(leaderboard, page, MAX_USERS_PER_PAGE)
+
+        unique_medals = set([(medal, user_info[1]['medals'][medal]['image_url']) for user_info in paginated_leaderboard for medal in user_info[1]['medals']])
         await self._prepare_medals_images(unique_medals)
-        
-        final_image = Image.new('RGB', (image_width, rectangle_height * min(len(leaderboard), max_users_per_page)))
-        draw_image = ImageDraw.Draw(final_image)
-        last_rectangle_pos = 0
-        alternate_row_control = True
-        for user_name, user_info in paginated_leaderboard:
-            draw_image.rectangle(
-                ((0, last_rectangle_pos), (image_width, last_rectangle_pos + rectangle_height)),
-                fill="#D3D3D3" if alternate_row_control else "#CCC"
-            )
-            if last_rectangle_pos:
-                draw_image.line(
-                    ((0, last_rectangle_pos), (image_width, last_rectangle_pos)),
-                    fill='#A9A9A9'
-                )
-            draw_image.text(
-                (medal_size * 2 + text_spacing, last_rectangle_pos + text_spacing),
-                '{:.20}'.format(user_name),
-                fill='#2E2E2E',
-                font=ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_USERS_PATH"), size=font_size)
-            )
-            draw_image.text(
-                (image_width - int(5 * font_size * 0.7), last_rectangle_pos + text_spacing),
-                '{:5}'.format(user_info["points"]),
-                fill='#2E2E2E',
-                font=ImageFont.truetype(os.environ.get("TRUETYPE_FONT_FOR_POINTS_PATH"), size=font_size + 2)
-            )
-            last_medal_pos = medal_positions[min(max(len(user_info['medals']) - 1, 0), 2)]
-            for medal_name, medal_info in user_info['medals'].items():
-                medal_image = Image.open(
-                    BytesIO(await self._get_image(medal_name, medal_info['image_url']))
-                ).convert('RGBA').resize((medal_size, medal_size))
-                final_image.paste(
-                    medal_image,
-                    (last_medal_pos, last_rectangle_pos + text_spacing),
-                    mask=medal_image
-                )
-                if not medal_positions.index(last_medal_pos):
-                    break
-                last_medal_pos = medal_positions[medal_positions.index(last_medal_pos) - 1]
-            last_rectangle_pos += rectangle_height
-            alternate_row_control = not(alternate_row_control)
-
-        bytesio = BytesIO()
-        final_image.save(bytesio, format="png")
-        bytesio.seek(0)
-        return bytesio
+        medals_images = {
+            medal_name: await self.medals_image_cache.get_image(medal_info['image_url'])
+            for _, user_info in paginated_leaderboard
+            for medal_name, medal_info in user_info['medals'].items()
+        }
+
+        return await run_rendering_task(render_leaderboard, paginated_leaderboard, len(leaderboard), medals_images)
 
     async def _prepare_medals_images(self, unique_medals):
-        self.threaded_session = ClientSession()
-        
-        for r in as_completed([self._get_image(name, url) for name, url in unique_medals]):
-            await r
-        await self.threaded_session.close()
+        await self.medals_image_cache.prefetch(url for _, url in unique_medals)
     
     async def _get_image(self, medal_name, image_url):
-        if medal_name in self.medals_image_cache:
-            return self.medals_image_cache[medal_name]
-        
-        async with self.threaded_session.get(image_url) as response:
-            response_bytes = await response.read()
-            self.medals_image_cache[medal_name] = response_bytes
-            return response_bytes
+        return await self.medals_image_cache.get_bytes(image_url)
+
+
+def render_leaderboard(paginated_leaderboard: list, leaderboard_size: int, medals_images: dict) -> BytesIO:
+    """
+    Renders a page of the leaderboard
+
+    :param paginated_leaderboard: Page's users and their info, as built by `Leaderboard.build_leaderboard`
+    :type paginated_leaderboard: list
+    :param leaderboard_size: Number of users across every page
+    :type leaderboard_size: int
+    :param medals_images: Medals' images, already resized to `MEDAL_SIZE`, by medal name
+    :type medals_images: dict
+    :return: Image's bytesIO
+    :rtype: BytesIO
+    """
+    rectangle_height = 50
+    image_width = 500
+    text_spacing = 10
+    font_size = 18
+    medal_size = MEDAL_SIZE
+    medal_positions = [5, int(medal_size * 0.5), int(medal_size * 0.833)]
+    users_font = load_font(os.environ.get("TRUETYPE_FONT_FOR_USERS_PATH"), font_size)
+    points_font = load_font(os.environ.get("TRUETYPE_FONT_FOR_POINTS_PATH"), font_size + 2)
+
+    final_image = Image.new('RGB', (image_width, rectangle_height * min(leaderboard_size, MAX_USERS_PER_PAGE)))
+    draw_image = ImageDraw.Draw(final_image)
+    last_rectangle_pos = 0
+    alternate_row_control = True
+    for user_name, user_info in paginated_leaderboard:
+        draw_image.rectangle(
+            ((0, last_rectangle_pos), (image_width, last_rectangle_pos + rectangle_height)),
+            fill="#D3D3D3" if alternate_row_control else "#CCC"
+        )
+        if last_rectangle_pos:
+            draw_image.line(
+                ((0, last_rectangle_pos), (image_width, last_rectangle_pos)),
+                fill='#A9A9A9'
+            )
+        draw_image.text(
+            (medal_size * 2 + text_spacing, last_rectangle_pos + text_spacing),
+            '{:.20}'.format(user_name),
+            fill='#2E2E2E',
+            font=users_font
+        )
+        draw_image.text(
+            (image_width - int(5 * font_size * 0.7), last_rectangle_pos + text_spacing),
+            '{:5}'.format(user_info["points"]),
+            fill='#2E2E2E',
+            font=points_font
+        )
+        last_medal_pos = medal_positions[min(max(len(user_info['medals']) - 1, 0), 2)]
+        for medal_name in user_info['medals']:
+            medal_image = medals_images[medal_name]
+            final_image.paste(
+                medal_image,
+                (last_medal_pos, last_rectangle_pos + text_spacing),
+                mask=medal_image
+            )
+            if not medal_positions.index(last_medal_pos):
+                break
+            last_medal_pos = medal_positions[medal_positions.index(last_medal_pos) - 1]
+        last_rectangle_pos += rectangle_height
+        alternate_row_control = not(alternate_row_control)
+
+    bytesio = BytesIO()
+    final_image.save(bytesio, format="png")
+    bytesio.seek(0)
+    return bytesio
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+
+from aiohttp import ClientSession
+from dotenv import load_dotenv
+from PIL import Image
+
+MEDAL_SIZE = 30
+
+
+class MedalImageCache():
+    """
+    Two-tier cache of medals' images, by image URL
+
+    Downloaded images are stored on disk by content hash, along with their
+    ETag and Last-Modified headers, so they survive restarts and are only
+    downloaded again if the server says they have changed. Images checked
+    less than `revalidate_after` seconds ago are not checked again.
+    Least recently used images are kept in memory, both as downloaded and
+    decoded and resized to `MEDAL_SIZE`.
+
+    :param disk_path: Directory for the on-disk tier. Disabled if not given
+    :type disk_path: Optional[str]
+    :param max_entries: Max number of images kept in memory
+    :type max_entries: int
+    :param max_downloads: Max number of images downloaded at once
+    :type max_downloads: int
+    :param revalidate_after: Seconds after which images are checked for changes
+    :type revalidate_after: float
+    """
+
+    INDEX_FILE_NAME = 'index.json'
+
+    def __init__(self, disk_path: Optional[str]=None, max_entries: int=256, max_downloads: int=4,
+                 revalidate_after: float=86400):
+        self.disk_path = disk_path
+        self.max_entries = max_entries
+        self.max_downloads = max_downloads
+        self.revalidate_after = revalidate_after
+        self.downloads = 0
+        self.revalidations = 0
+        self._index: Dict[str, dict] = {}
+        self._images: OrderedDict[str, Image.Image] = OrderedDict()
+        self._contents: OrderedDict[str, bytes] = OrderedDict()
+        self._requests: Dict[str, asyncio.Task] = {}
+        self._download_semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        if self.disk_path:
+            os.makedirs(self.disk_path, exist_ok=True)
+            self._index = self._read_index()
+
+    async def prefetch(self, urls: Iterable[str]):
+        """
+        Makes sure given images are cached and up to date, sharing a
+        single HTTP session among downloads
+
+        :param urls: Images' URLs
+        :type urls: Iterable[str]
+        """
+        urls = [url for url in set(urls) if self._needs_request(url)]
+        if not urls:
+            return
+        async with ClientSession() as session:
+            await asyncio.gather(*[self.get_bytes(url, session) for url in urls])
+
+    async def get_bytes(self, url: str, session: Optional[ClientSession]=None) -> bytes:
+        """
+        Gets image as downloaded
+
+        :param url: Image's URL
+        :type url: str
+        :param session: HTTP session used if image has to be downloaded
+        :type session: Optional[ClientSession]
+        :return: Image bytes
+        :rtype: bytes
+        """
+        content = None if self._needs_request(url) else self._cached_content(url)
+        if content is None:
+            # Concurrent calls for the same URL wait on a single request
+            request = self._requests.get(url)
+            if request is None:
+                request = asyncio.ensure_future(self._request(url, session))
+                self._requests[url] = request
+                request.add_done_callback(lambda _: self._requests.pop(url, None))
+            await request
+            content = self._cached_content(url)
+        self._remember(self._contents, url, content)
+        return content
+
+    async def get_image(self, url: str, session: Optional[ClientSession]=None) -> Image.Image:
+        """
+        Gets a copy of the image decoded and resized to `MEDAL_SIZE`
+
+        :param url: Image's URL
+        :type url: str
+        :param session: HTTP session used if image has to be downloaded
+        :type session: Optional[ClientSession]
+        :return: RGBA image
+        :rtype: Image.Image
+        """
+        if self._needs_request(url) or url not in self._images:
+            content = await self.get_bytes(url, session)
+            # Decoded image is kept unless downloaded content has changed
+            if url not in self._images:
+                self._images[url] = Image.open(BytesIO(content)).convert('RGBA').resize((MEDAL_SIZE, MEDAL_SIZE))
+        image = self._images[url]
+        self._remember(self._images, url, image)
+        return image.copy()
+
+    def _needs_request(self, url: str) -> bool:
+        entry = self._index.get(url)
+        return (not entry or time.time() - entry['checked_at'] >= self.revalidate_after or
+            (url not in self._contents and not self.disk_path))
+
+    def _cached_content(self, url: str) -> Optional[bytes]:
+        content = self._contents.get(url)
+        if content is None and url in self._index and self.disk_path:
+            try:
+                content = self._read_content(self._index[url]['sha256'])
+            except OSError as e:
+                logging.warning(e)
+                del self._index[url]
+        return content
+
+    async def _request(self, url: str, session: Optional[ClientSession]):
+        if session is None:
+            async with ClientSession() as session:
+                return await self._request(url, session)
+
+        # Changes are only asked for if unchanged content can still be read
+        entry = self._index.get(url) if self._cached_content(url) is not None else None
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        async with self._semaphore():
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry:
+                    self.revalidations += 1
+                    entry['checked_at'] = time.time()
+                    self._write_index()
+                    return
+                response.raise_for_status()
+                content = await response.read()
+                self.downloads += 1
+
+        content_hash = sha256(content).hexdigest()
+        self._write_content(content_hash, content)
+        self._index[url] = {
+            'sha256': content_hash,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time()
+        }
+        self._images.pop(url, None)
+        self._remember(self._contents, url, content)
+        self._write_index()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the event loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._download_semaphore is None or self._semaphore_loop is not loop:
+            self._download_semaphore = asyncio.Semaphore(self.max_downloads)
+            self._semaphore_loop = loop
+        return self._download_semaphore
+
+    def _remember(self, entries: OrderedDict, url: str, value):
+        entries[url] = value
+        entries.move_to_end(url)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _content_file_path(self, content_hash: str) -> str:
+        return os.path.join(self.disk_path, content_hash)
+
+    def _read_content(self, content_hash: str) -> bytes:
+        with open(self._content_file_path(content_hash), 'rb') as f:
+            return f.read()
+
+    def _write_content(self, content_hash: str, content: bytes):
+        if not self.disk_path:
+            return
+        self._write_file(self._content_file_path(content_hash), content)
+
+    def _read_index(self) -> Dict[str, dict]:
+        try:
+            with open(os.path.join(self.disk_path, self.INDEX_FILE_NAME)) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(e)
+            return {}
+        return {
+            url: entry for url, entry in index.items()
+            if os.path.exists(self._content_file_path(entry['sha256']))
+        }
+
+    def _write_index(self):
+        if not self.disk_path:
+            return
+        self._write_file(
+            os.path.join(self.disk_path, self.INDEX_FILE_NAME), json.dumps(self._index).encode('utf-8'))
+
+    def _write_file(self, file_path: str, content: bytes):
+        try:
+            temp_file_path = f'{file_path}.{os.getpid()}.tmp'
+            with open(temp_file_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            logging.warning(e)
+
+
+load_dotenv()
+medal_image_cache = MedalImageCache(
+    disk_path=os.environ.get("SWW_MEDALS_CACHE_PATH") or None,
+    max_entries=int(os.environ.get("SWW_MEDALS_CACHE_SIZE", '256')),
+    max_downloads=int(os.environ.get("SWW_MEDALS_MAX_DOWNLOADS", '4')),
+    revalidate_after=int(os.environ.get("SWW_MEDALS_REVALIDATE_AFTER", '86400'))
+)
@@ -1,13 +1,15 @@
 import logging
 import re
 from hashlib import md5
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from pywikibot import config, Page
 from mwparserfromhell import parse as mwparse
 from mwparserfromhell.wikicode import Wikicode
 from mwparserfromhell.nodes.tag import Tag
 
+from bot.misc.executors import WIKI_BOT
+from bot.sww.translation_engine import TranslationEngine
 from bot.sww.translations import MEDIA_TRANSLATIONS
 from bot.sww.wiki_bot import WikiBot
 from bot.utils import run_blocking_io_task
@@ -15,6 +17,8 @@ from bot.utils import run_blocking_io_task
 
 class TimelineTranslator(WikiBot):
     WOOKIEE_TIMELINE_URL = "http://starwars.wikia.com/wiki/Timeline_of_canon_media?action=raw"
+    # Rows start right after a line break, with a row separator ("|-")
+    TABLE_ROW_START = re.compile(r'(?<=\n)(?=\|-)')
     
     def __init__(self, auto_close_session: bool=False) -> None:
         self.auto_close_session = auto_close_session
@@ -23,6 +27,8 @@ class TimelineTranslator(WikiBot):
         self._current_content: str = None
         self._translated_refs: Dict[str, str] = {}
         self._current_revision: int = None
+        self._parsed_contents: Dict[str, Tuple[str, Wikicode]] = {}
+        self._translated_rows: Dict[str, str] = {}
         config.put_throttle = 1
         super().__init__()
         
@@ -30,7 +36,7 @@ class TimelineTranslator(WikiBot):
         self._original_content = Page(self.wookiee_site, u"Timeline of canon media").text
         return self._original_content
                 
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_timeline_page(self) -> Page:
         self.page = Page(self.site, u"Linha do tempo de mídia canônica")
         self._current_content = self.page.text
@@ -41,11 +47,12 @@ class TimelineTranslator(WikiBot):
         if not self._original_content or not self._current_content:
             raise Exception("Load both Wookieepedia and SWW content first")
         
-        original_refs = self._build_reference_dict(self._original_content)
-        current_refs = self._build_reference_dict(self._current_content)
+        all_original_refs = self._get_tags_from_wikitext(self._parse('original', self._original_content), 'ref')
+        all_current_refs = self._get_tags_from_wikitext(self._parse('current', self._current_content), 'ref')
+        original_refs = self._build_reference_dict(all_original_refs)
+        current_refs = self._build_reference_dict(all_current_refs)
         self._translated_refs = current_refs
         
-        all_original_refs = self._get_tags_from_wikitext(mwparse(self._original_content), 'ref')
         for tag in all_original_refs:
             if not tag.has("name") and tag.contents:
                 translated_contents = self._apply_translations(str(tag.contents))
@@ -57,12 +64,14 @@ class TimelineTranslator(WikiBot):
         self._translated_refs[reference_name] = content
         
     def translate_page(self) -> Page:
-        parsed_current_content: Wikicode = mwparse(self._current_content, skip_style_tags=True)
+        parsed_current_content = self._parse('current', self._current_content)
+        # Current content's tree is edited below, so it must be parsed again next time
+        del self._parsed_contents['current']
         current_main_table = self._get_tags_from_wikitext(parsed_current_content, 'table')[1]
-        parsed_original_content: Wikicode = mwparse(self._original_content, skip_style_tags=True)
+        parsed_original_content = self._parse('original', self._original_content)
         original_main_table = self._get_tags_from_wikitext(parsed_original_content, 'table')[1]
         
-        translated_contents = self._apply_translations(str(original_main_table.contents))
+        translated_contents = self._translate_table(str(original_main_table.contents))
         current_main_table.contents = translated_contents
         
         all_refs = self._get_tags_from_wikitext(current_main_table.contents, 'ref')
@@ -81,12 +90,25 @@ class TimelineTranslator(WikiBot):
         self.page.text = str(parsed_current_content)
         return self.page
     
+    def _translate_table(self, table_contents: str) -> str:
+        # Translations never match across rows, so only rows changed since
+        # last translated table have to be translated
+        translated_rows: Dict[str, str] = {}
+        rows = self.TABLE_ROW_START.split(table_contents)
+        for row in rows:
+            row_hash = self._md5(row)
+            if row_hash in translated_rows:
+                continue
+            translated_row = self._translated_rows.get(row_hash)
+            translated_rows[row_hash] = translated_row if translated_row is not None else self._apply_translations(row)
+        logging.info(f'{len(translated_rows.keys() - self._translated_rows.keys())} of {len(rows)} timeline rows translated')
+        self._translated_rows = translated_rows
+        return ''.join(translated_rows[self._md5(row)] for row in rows)
+    
     def _apply_translations(self, text: str) -> str:
-        for (pattern, replacement) in self._TRANSLATIONS:
-            text = re.sub(pattern, replacement, text)
-        return text
+        return self._translation_engine.translate(text)
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def save_page(self) -> None:
         if not self.site.logged_in():
             raise Exception("Bot not logged in")
@@ -95,9 +117,14 @@ class TimelineTranslator(WikiBot):
     def get_diff_url(self) -> str:
         return f'{self.page.permalink(self._current_revision, with_protocol=True)}&diff=next'
     
-    def _build_reference_dict(self, wikitext: str) -> Dict[str, str]:
-        parsed_content: Wikicode = mwparse(wikitext)
-        all_refs = self._get_tags_from_wikitext(parsed_content, 'ref')
+    def _parse(self, name: str, wikitext: str) -> Wikicode:
+        parsed_content = self._parsed_contents.get(name)
+        if parsed_content is None or parsed_content[0] != wikitext:
+            parsed_content = (wikitext, mwparse(wikitext, skip_style_tags=True))
+            self._parsed_contents[name] = parsed_content
+        return parsed_content[1]
+    
+    def _build_reference_dict(self, all_refs: List[Tag]) -> Dict[str, str]:
         return {str(x.get("name").value): str(x.contents) for x in all_refs if x.contents and x.has("name")}
         
     def _get_tags_from_wikitext(self, wikitext: Wikicode, tag: str) -> List[Tag]:
@@ -194,6 +221,7 @@ class TimelineTranslator(WikiBot):
         
         (r'cellpadding="4" cellspacing="0" style=".*"', ''),
     ] + MEDIA_TRANSLATIONS
+    _translation_engine = TranslationEngine(_TRANSLATIONS)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import re
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_WORD_CHAR = re.compile(r'\w')
+_REGEX_METACHARS = set('.^$*+?{}[]|()')
+
+
+class _LiteralRule(NamedTuple):
+    text: str
+    replacement: str
+    leading_boundary: bool
+    trailing_boundary: bool
+
+    @property
+    def tokens(self) -> List[str]:
+        tokens = [re.escape(char) for char in self.text]
+        if self.leading_boundary:
+            tokens[0] = _leading_boundary_pattern(self.text[0])
+        if self.trailing_boundary:
+            tokens.append(r'\b')
+        return tokens
+
+    @property
+    def pattern(self) -> str:
+        return ''.join(self.tokens)
+
+
+class TranslationEngine():
+    """
+    Applies a list of `re.sub` rules in a fixed number of passes, giving the
+    same output as calling `re.sub` for every rule in order.
+
+    Rules are compiled once. Consecutive rules matching plain text,
+    optionally between word boundaries, are merged into a single pass over
+    a keyword trie, as long as none of them can match text overlapping
+    another one's match or replacement. Other rules keep their own pass,
+    in their original order.
+
+    :param rules: Pattern and replacement pairs, as given to `re.sub`
+    :type rules: List[Tuple[str, str]]
+    """
+
+    def __init__(self, rules: List[Tuple[str, str]]):
+        self.rules = rules
+        self._passes: List[Callable[[str], str]] = []
+        batch: List[_LiteralRule] = []
+        for pattern, replacement in rules:
+            literal_rule = _parse_literal_rule(pattern, replacement)
+            if literal_rule and all(_can_share_pass(rule, literal_rule) for rule in batch):
+                batch.append(literal_rule)
+                continue
+            self._add_literal_pass(batch)
+            batch = [literal_rule] if literal_rule else []
+            if not literal_rule:
+                self._passes.append(partial(re.compile(_optimize_pattern(pattern)).sub, replacement))
+        self._add_literal_pass(batch)
+
+    @property
+    def passes_count(self) -> int:
+        """
+        Number of passes made over translated text
+
+        :rtype: int
+        """
+        return len(self._passes)
+
+    def translate(self, text: str) -> str:
+        """
+        Applies every rule to given text
+
+        :param text: Text to be translated
+        :type text: str
+        :return: Translated text
+        :rtype: str
+        """
+        for translation_pass in self._passes:
+            text = translation_pass(text)
+        return text
+
+    def _add_literal_pass(self, batch: List[_LiteralRule]):
+        if not batch:
+            return
+        if len(batch) == 1:
+            self._passes.append(partial(re.compile(batch[0].pattern).sub, batch[0].replacement))
+            return
+        replacements = {rule.text: rule.replacement for rule in batch}
+        regex = re.compile(_build_trie_pattern(batch))
+        self._passes.append(partial(regex.sub, lambda match: replacements[match.group()]))
+
+
+def _parse_literal_rule(pattern: str, replacement: str) -> Optional[_LiteralRule]:
+    if '\\' in replacement:
+        return None
+    leading_boundary = pattern.startswith(r'\b')
+    trailing_boundary = pattern.endswith(r'\b') and not pattern.endswith(r'\\b')
+    pattern = pattern[2 if leading_boundary else 0:len(pattern) - (2 if trailing_boundary else 0)]
+
+    text = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            # Escaped letters and digits are character classes or references
+            if _WORD_CHAR.match(char):
+                return None
+            text.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in _REGEX_METACHARS:
+            return None
+        else:
+            text.append(char)
+    if escaped or not text:
+        return None
+    return _LiteralRule(''.join(text), replacement, leading_boundary, trailing_boundary)
+
+
+def _optimize_pattern(pattern: str) -> str:
+    if (len(pattern) > 3 and pattern.startswith(r'\b') and pattern[2] not in _REGEX_METACHARS | {'\\'} and
+            pattern[3] not in '*+?{'):
+        return _leading_boundary_pattern(pattern[2]) + pattern[3:]
+    return pattern
+
+
+def _leading_boundary_pattern(char: str) -> str:
+    # Boundary is checked after the first char rather than before it, which
+    # lets the regex engine skip right to positions where that char is found
+    escaped_char = re.escape(char)
+    if _is_word_char(char):
+        return rf'{escaped_char}(?<!\w{escaped_char})'
+    return rf'{escaped_char}(?<=\w{escaped_char})'
+
+
+def _can_share_pass(earlier: _LiteralRule, later: _LiteralRule) -> bool:
+    # Later rule must neither compete with earlier one for the same text nor
+    # match any text written by it, including word boundaries next to it
+    if not earlier.replacement or _overlap(earlier.text, later.text) or _overlap(earlier.replacement, later.text):
+        return False
+    if later.leading_boundary or later.trailing_boundary:
+        return (_is_word_char(earlier.text[0]) == _is_word_char(earlier.replacement[0]) and
+                _is_word_char(earlier.text[-1]) == _is_word_char(earlier.replacement[-1]))
+    return True
+
+
+def _overlap(text: str, other_text: str) -> bool:
+    if text in other_text or other_text in text:
+        return True
+    return any(
+        text.endswith(other_text[:i]) or other_text.endswith(text[:i])
+        for i in range(1, min(len(text), len(other_text)))
+    )
+
+
+def _is_word_char(char: str) -> bool:
+    return bool(_WORD_CHAR.match(char))
+
+
+def _build_trie_pattern(batch: List[_LiteralRule]) -> str:
+    trie: Dict[str, dict] = {}
+    for rule in batch:
+        node = trie
+        for token in rule.tokens:
+            node = node.setdefault(token, {})
+        node[''] = {}
+    return _trie_node_pattern(trie)
+
+
+def _trie_node_pattern(node: Dict[str, dict]) -> str:
+    # Keys never overlap, so no key ends where another one goes on
+    alternatives = [token + _trie_node_pattern(child) for token, child in node.items() if token]
+    if not alternatives:
+        return ''
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return f'(?:{"|".join(alternatives)})'
@@ -2,6 +2,7 @@ import json
 
 from pywikibot import Page
 
+from bot.misc.executors import WIKI_BOT
 from bot.sww.wiki_bot import WikiBot
 from bot.utils import run_blocking_io_task
 
@@ -137,12 +138,12 @@ class JSONTranslationsUpdater(WikiBot):
         fixes_json = json.dumps(fixes, ensure_ascii=False, indent=4)
         return "<pre>{}</pre>".format(fixes_json.replace('\\\\1', '$1'))
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_page(self) -> Page:
         self.page = Page(self.site, "Star Wars Wiki:Apêndice de Tradução de obras/JSON")
         return self.page
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def update_json_page(self, content: str):
         self.page.text = content
         self.page.save("Atualizando com novo conteúdo")
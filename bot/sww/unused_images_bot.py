@@ -2,6 +2,7 @@ from typing import Iterator, Tuple
 
 from pywikibot import config, FilePage
 
+from bot.misc.executors import WIKI_BOT
 from bot.sww.wiki_bot import WikiBot
 from bot.utils import run_blocking_io_task
 
@@ -11,11 +12,11 @@ class UnusedImagesBot(WikiBot):
         config.put_throttle = 1
         super().__init__()
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_unused_images(self) -> Iterator[FilePage]:
         return self.site.unusedfiles()
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def check_for_deletion(self, file_page: FilePage) -> Tuple[bool, str]:
         if not file_page.exists():
             return False, "Page does not exist"
@@ -24,7 +25,7 @@ class UnusedImagesBot(WikiBot):
         
         return True, ""
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def delete_image(self, file_page: FilePage) -> FilePage:
         return file_page.delete(reason="Imagem não utilizada", prompt=False, mark=False)
 
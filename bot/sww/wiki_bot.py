@@ -4,6 +4,7 @@ import os
 from pywikibot import APISite, config
 from pywikibot.login import ClientLoginManager, BotPassword
 
+from bot.misc.executors import WIKI_BOT
 from bot.sww.sww_family import StarWarsWikiFamily
 from bot.utils import run_blocking_io_task
 
@@ -17,7 +18,7 @@ class WikiBot():
         self.username: str = os.environ.get("SWW_BOT_USERNAME")
         self._password: str = os.environ.get("SWW_BOT_PASSWORD")
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_site(self) -> APISite:
         self.site = APISite(fam=StarWarsWikiFamily(), code='pt', user=self.username)
         
@@ -27,12 +28,12 @@ class WikiBot():
         
         return self.site
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def get_wookiee_site(self) -> APISite:
         self.wookiee_site = APISite(fam=StarWarsWikiFamily(), code='en', user=self.username)
         return self.wookiee_site
     
-    @run_blocking_io_task
+    @run_blocking_io_task(executor=WIKI_BOT)
     def login(self) -> None:
         logging.getLogger('pywiki').disabled = True
         try:
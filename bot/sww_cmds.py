@@ -41,6 +41,7 @@ class StarWarsWikiCmds(app_commands.Group):
         scheduler_bot.register_function('translate_timeline', self.translate_timeline)
         scheduler_bot.register_function('delete_unused_images', self.delete_unused_images)
         scheduler_bot.register_function('fix_double_redirect', self.fix_double_redirect)
+        scheduler_bot.register_function('refresh_leaderboard', self.leaderboard_bot.refresh_snapshot)
         scheduler_bot.add_periodical_job('cron', {'hour': '11'}, 'icp_metric_fetcher', (),
                                          job_id='icp_metric_fetcher_scheduled_job')
         scheduler_bot.add_periodical_job('cron', {'hour': '12'}, 'translate_timeline',
@@ -53,6 +54,9 @@ class StarWarsWikiCmds(app_commands.Group):
         scheduler_bot.add_periodical_job('cron', {'hour': '11'}, 'fix_double_redirect',
                                        (os.environ.get('SWW_BOT_CHANNEL_ID'),),
                                        job_id='fix_double_redirect_scheduled_job')
+        scheduler_bot.add_periodical_job('interval',
+                                         {'seconds': int(os.environ.get("SWW_LEADERBOARD_REFRESH_INTERVAL", '600'))},
+                                         'refresh_leaderboard', job_id='refresh_leaderboard_scheduled_job')
     
     async def translate_timeline(self, channel_id: str):
         channel = await self.client.fetch_channel(channel_id)
@@ -191,9 +195,8 @@ class StarWarsWikiCmds(app_commands.Group):
         """
         await interaction.response.defer()
         try:
-            leaderboard_data = await self.leaderboard_bot.get()
-            leaderboard_result = self.leaderboard_bot.build_leaderboard(*leaderboard_data)
-            leaderboard_img = await self.leaderboard_bot.draw_leaderboard(leaderboard_result, page)
+            snapshot = await self.leaderboard_bot.get_snapshot()
+            leaderboard_img = await self.leaderboard_bot.draw_leaderboard_page(snapshot, page)
 
             await interaction.followup.send(file=discord.File(leaderboard_img, 'leaderboard.png'))
         except Exception as e:
@@ -211,14 +214,11 @@ class StarWarsWikiCmds(app_commands.Group):
         """
         await interaction.response.defer()
         try:
-            leaderboard_data = await self.leaderboard_bot.get()
-            medals = await self.leaderboard_bot.build_medals_info(*leaderboard_data)
-            
-            medal_info = [medal for medal in medals if medal['name'] == medal_name]
+            snapshot = await self.leaderboard_bot.get_snapshot()
+            medal_info = snapshot.medals_by_name.get(medal_name)
             if not medal_info:
                 return await interaction.followup.send(i(interaction, "Medal not found"))
             
-            medal_info = medal_info[0]
             embed = discord.Embed(
                 title=i(interaction, "Star Wars Wiki's medals"),
                 description=medal_info['name'],
@@ -251,9 +251,8 @@ class StarWarsWikiCmds(app_commands.Group):
 
     async def _build_medals_embed(self, page_number, original_message):
         max_medals_per_page = 6
-        leaderboard_data = await self.leaderboard_bot.get()
-        medals = await self.leaderboard_bot.build_medals_info(*leaderboard_data)
-        paginated_medals, last_page = paginate(medals, page_number, max_medals_per_page)
+        snapshot = await self.leaderboard_bot.get_snapshot()
+        paginated_medals, last_page = paginate(snapshot.medals, page_number, max_medals_per_page)
         
         embed = discord.Embed(
             title=i(original_message, "Star Wars Wiki's medals"),
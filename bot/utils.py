@@ -1,11 +1,11 @@
 import subprocess
 from typing import Any, Awaitable, Callable, Coroutine, ParamSpec, Tuple, TypeVar
 
-from asyncio import get_running_loop, new_event_loop
-from concurrent.futures.thread import ThreadPoolExecutor
+from asyncio import get_running_loop
 from functools import partial
 
 from bot.chess.player import Player
+from bot.misc.executors import BLOCKING_IO, get_executor, get_rendering_executor
 
 try:
     current_bot_version = subprocess.check_output(["git", "describe", "--always"]).strip().decode()
@@ -15,28 +15,30 @@ except:
 PR = ParamSpec('PR')
 RT = TypeVar('RT')
 
-def run_blocking_io_task(func: Callable[PR, RT], *args, **kwargs) -> Callable[PR, Awaitable[RT]]:
-    async def function_wrapper(*args: PR.args, **kwargs: PR.kwargs) -> Coroutine[Any, Any, RT]:
-        loop = get_running_loop()
-        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
-    return function_wrapper
-
-def run_cpu_bound_task(func, *args, **kwargs):
-    async def function_wrapper(*args, **kwargs):
-        loop = get_running_loop()
-        with ThreadPoolExecutor() as pool:
-            return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
-    return function_wrapper
+def run_blocking_io_task(func: Callable[PR, RT]=None, *, executor: str=BLOCKING_IO):
+    """
+    Runs decorated function on a shared executor, `blocking_io` by default.
+    May be used either as `@run_blocking_io_task` or as
+    `@run_blocking_io_task(executor='wiki_bot')`.
+    """
+    def decorator(func: Callable[PR, RT]) -> Callable[PR, Awaitable[RT]]:
+        async def function_wrapper(*args: PR.args, **kwargs: PR.kwargs) -> Coroutine[Any, Any, RT]:
+            loop = get_running_loop()
+            return await loop.run_in_executor(get_executor(executor), partial(func, *args, **kwargs))
+        return function_wrapper
+    if func is None:
+        return decorator
+    return decorator(func)
 
-def run_cpu_bound_task_with_event_loop(func, *args, **kwargs):
-    def function_wrapper(*args, **kwargs):
-        event_loop = new_event_loop()
-        try:
-            corofn = func(*args, **kwargs)
-            return event_loop.run_until_complete(corofn)
-        finally:
-            event_loop.close()
-    return function_wrapper
+async def run_rendering_task(func: Callable[..., RT], *args, **kwargs) -> RT:
+    """
+    Runs given image rendering function on the rendering executor, which is
+    made of either threads or worker processes depending on `RENDERING_EXECUTOR`.
+    Function must be defined at module level and be given picklable arguments,
+    such as FEN strings, ids and plain dicts, so it can run on another process.
+    """
+    loop = get_running_loop()
+    return await loop.run_in_executor(get_rendering_executor(), partial(func, *args, **kwargs))
 
 def convert_users_to_players(*args):
         return tuple(map(lambda user: Player(user) if user else None, args))
@@ -4,8 +4,10 @@ import os
 
 from dotenv import load_dotenv
 
-from bot.client import client
-
 load_dotenv()
 
-client.run(os.environ.get("API_KEY"))
+# Rendering worker processes import this module again, so only run the bot from main process
+if __name__ == '__main__':
+    from bot.client import client
+
+    client.run(os.environ.get("API_KEY"))
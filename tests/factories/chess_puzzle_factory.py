@@ -0,0 +1,19 @@
+from factory import Sequence
+from factory.alchemy import SQLAlchemyModelFactory
+
+from bot.models.chess_puzzle import ChessPuzzle
+from tests.support.db_connection import Session
+
+
+class ChessPuzzleFactory(SQLAlchemyModelFactory):
+    class Meta:
+        model = ChessPuzzle
+        sqlalchemy_session = Session
+
+    id = Sequence(lambda n: f'puzzle{n}')
+    position = Sequence(lambda n: n + 1)
+    fen = '8/7p/4p1p1/1p5k/8/PB4PK/2P2q1P/4R3 w - - 0 37'
+    blunder_move = 'g4+'
+    forced_line = 'Kg5 Rf1 Qxf1+ Kg3 Qf4+'
+    rating = 1500
+    themes = ['endgame']
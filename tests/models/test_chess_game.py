@@ -56,3 +56,54 @@ class TestChessGame(TestCase):
         result = asyncio.run(ChessGame.get_number_of_victories(14))
 
         self.assertEqual(result, 0)
+
+    def test_save_with_players_new_game(self):
+        test_session = Session()
+        test_session.add(User(id=14, name='Me'))
+        test_session.commit()
+
+        result = asyncio.run(ChessGame.save_with_players(
+            None, [(14, 'Me'), (15, 'Them')], pgn='1. e4 *', color_schema='blue'))
+
+        chess_game = test_session.query(ChessGame).get(result)
+        self.assertEqual(chess_game.player1_id, 14)
+        self.assertEqual(chess_game.player2_id, 15)
+        self.assertEqual(chess_game.pgn, '1. e4 *')
+        self.assertEqual(chess_game.color_schema, 'blue')
+        self.assertEqual(test_session.query(User).get(15).name, 'Them')
+
+    def test_save_with_players_existing_game(self):
+        test_session = Session()
+        chess_game = ChessGame(pgn='1. e4 *', moves='e7e5')
+        chess_game.player1 = User(id=14, name='Me')
+        chess_game.player2 = User(id=15, name='Them')
+        test_session.add(chess_game)
+        test_session.commit()
+        chess_game_id = chess_game.id
+
+        result = asyncio.run(ChessGame.save_with_players(
+            chess_game_id, [(14, 'Me'), (15, 'Them')], pgn='1. e4 e5 *', moves=None, result=0))
+        Session.remove()
+
+        self.assertEqual(result, chess_game_id)
+        chess_game = Session().query(ChessGame).get(chess_game_id)
+        self.assertEqual(chess_game.pgn, '1. e4 e5 *')
+        self.assertIsNone(chess_game.moves)
+        self.assertEqual(chess_game.result, 0)
+
+    def test_append_moves(self):
+        test_session = Session()
+        chess_game = ChessGame(pgn='1. e4 *')
+        chess_game.player1 = User(id=14, name='Me')
+        chess_game.player2 = User(id=15, name='Them')
+        test_session.add(chess_game)
+        test_session.commit()
+        chess_game_id = chess_game.id
+
+        asyncio.run(ChessGame.append_moves(chess_game_id, ['e7e5']))
+        asyncio.run(ChessGame.append_moves(chess_game_id, ['g1f3', 'b8c6']))
+        Session.remove()
+
+        chess_game = Session().query(ChessGame).get(chess_game_id)
+        self.assertEqual(chess_game.pgn, '1. e4 *')
+        self.assertEqual(chess_game.moves, 'e7e5 g1f3 b8c6')
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+from unittest import TestCase
+
+from dotenv import load_dotenv
+
+from bot.models.astrology_chart import AstrologyChart
+from bot.models.chess_game import ChessGame
+from bot.models.profile_data import ProfileData
+from bot.models.user import User
+from bot.models.xp_point import XpPoint
+from tests.support.db_connection import clear_data, Session
+
+
+class TestProfileData(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_dotenv()
+    
+    def tearDown(self):
+        clear_data(Session())
+
+    def test_get_all_fields(self):
+        test_session = Session()
+        user_1 = User(id=14, name='Me')
+        user_2 = User(id=15, name='Them')
+        chess_game_1 = ChessGame()
+        chess_game_1.player1 = user_1
+        chess_game_1.player2 = user_2
+        chess_game_1.result = 1
+        test_session.add(chess_game_1)
+        chess_game_2 = ChessGame()
+        chess_game_2.player1 = user_2
+        chess_game_2.player2 = user_1
+        chess_game_2.result = -1
+        test_session.add(chess_game_2)
+        chess_game_3 = ChessGame()
+        chess_game_3.player1 = user_2
+        chess_game_3.player2 = user_1
+        chess_game_3.result = 1
+        test_session.add(chess_game_3)
+        for server_id, points in [(10, 140), (12, 260)]:
+            xp_point = XpPoint()
+            xp_point.user = user_1
+            xp_point.server_id = server_id
+            xp_point.points = points
+            test_session.add(xp_point)
+        astrology_chart = AstrologyChart()
+        astrology_chart.user = user_1
+        astrology_chart.datetime = datetime(2000, 1, 1, 12, 0)
+        astrology_chart.timezone = '-03:00'
+        astrology_chart.latitude = -23.5
+        astrology_chart.longitude = -46.6
+        test_session.add(astrology_chart)
+        test_session.commit()
+
+        result = asyncio.run(ProfileData.get(user_1.id))
+
+        self.assertEqual(result.user.id, user_1.id)
+        self.assertEqual(result.user.profile_items, [])
+        self.assertEqual(result.astrology_chart.id, astrology_chart.id)
+        self.assertEqual(result.chess_victories, 2)
+        self.assertEqual(result.total_points, 400)
+
+    def test_get_user_exists_no_info(self):
+        test_session = Session()
+        user = User(id=14, name='Me')
+        test_session.add(user)
+        test_session.commit()
+
+        result = asyncio.run(ProfileData.get(user.id))
+
+        self.assertEqual(result.user.id, user.id)
+        self.assertIsNone(result.astrology_chart)
+        self.assertEqual(result.chess_victories, 0)
+        self.assertEqual(result.total_points, 0)
+
+    def test_get_no_user(self):
+        result = asyncio.run(ProfileData.get(14))
+
+        self.assertIsNone(result)
@@ -1,8 +1,11 @@
 import asyncio
+from datetime import datetime
 from unittest import TestCase
 
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from bot.models import engine
 from bot.models.user import User
 from bot.models.xp_point import XpPoint
 from tests.support.db_connection import clear_data, Session
@@ -49,3 +52,65 @@ class TestXpPoint(TestCase):
         result = asyncio.run(XpPoint.get_user_aggregated_points(14))
 
         self.assertIsNone(result)
+
+    def test_save_all(self):
+        test_session = Session()
+        user_1 = User(id=14, name='Me')
+        xp_point_1 = XpPoint(server_id=10, points=140, level=3, updated_at=datetime.utcnow())
+        xp_point_1.user = user_1
+        test_session.add(xp_point_1)
+        test_session.commit()
+
+        asyncio.run(XpPoint.save_all(
+            [
+                XpPoint(user_id=14, server_id=10, points=150, level=3, updated_at=datetime.utcnow()),
+                XpPoint(user_id=15, server_id=10, points=10, level=1, updated_at=datetime.utcnow())
+            ],
+            {14: 'New me', 15: 'Them'}
+        ))
+        Session.remove()
+
+        test_session = Session()
+        self.assertEqual(test_session.query(XpPoint).get((14, 10)).points, 150)
+        self.assertEqual(test_session.query(XpPoint).get((15, 10)).points, 10)
+        self.assertEqual(test_session.query(User).get(14).name, 'New me')
+        self.assertEqual(test_session.query(User).get(15).name, 'Them')
+
+    def test_save_all_merges_changes_from_newer_version(self):
+        test_session = Session()
+        xp_point = XpPoint(server_id=10, points=200, level=3, version=4, updated_at=datetime.utcnow())
+        xp_point.user = User(id=14, name='Me')
+        test_session.add(xp_point)
+        test_session.commit()
+
+        result = asyncio.run(XpPoint.save_all(
+            [XpPoint(user_id=14, server_id=10, points=150, level=3, version=2, updated_at=datetime.utcnow())],
+            {14: 'Me'},
+            {(14, 10): 140}
+        ))
+        Session.remove()
+
+        self.assertEqual(result, {(14, 10): (210, 3, 5)})
+        saved_xp_point = Session().query(XpPoint).get((14, 10))
+        self.assertEqual(saved_xp_point.points, 210)
+        self.assertEqual(saved_xp_point.version, 5)
+
+    def test_insert_or_merge_adds_gained_points_to_row_inserted_meanwhile(self):
+        test_session = Session()
+        xp_point = XpPoint(server_id=10, points=30, level=1, version=1, updated_at=datetime.utcnow())
+        xp_point.user = User(id=14, name='Me')
+        test_session.add(xp_point)
+        test_session.commit()
+
+        async def insert_or_merge():
+            async with AsyncSession(engine) as session:
+                saved_values = await XpPoint._insert_or_merge(
+                    session, XpPoint(user_id=14, server_id=10, points=15, level=1, updated_at=datetime.utcnow()), 15)
+                await session.commit()
+                return saved_values
+
+        result = asyncio.run(insert_or_merge())
+        Session.remove()
+
+        self.assertEqual(result, (45, 1, 2))
+        self.assertEqual(Session().query(XpPoint).get((14, 10)).points, 45)
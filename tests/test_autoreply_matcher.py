@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from bot.models.server_config_autoreply import ServerConfigAutoreply
+from bot.servers.autoreply_matcher import AutoreplyMatcher
+
+
+class TestAutoreplyMatcher(TestCase):
+
+    def _build_autoreply_configs(self, *regexes):
+        return [ServerConfigAutoreply(message_regex=regex, reply=str(index))
+                for index, regex in enumerate(regexes)]
+
+    def test_match_first_matching_regex(self):
+        autoreply_configs = self._build_autoreply_configs('^hello', '.*bye$', '.*wait.*', 'hello.*')
+        matcher = AutoreplyMatcher(autoreply_configs)
+
+        self.assertIs(matcher.match('hello there'), autoreply_configs[0])
+        self.assertIs(matcher.match('ok, bye'), autoreply_configs[1])
+        self.assertIs(matcher.match('wait, bye'), autoreply_configs[1])
+        self.assertIs(matcher.match('please, wait for me'), autoreply_configs[2])
+        self.assertIsNone(matcher.match('nopee'))
+
+    def test_match_regexes_with_groups(self):
+        autoreply_configs = self._build_autoreply_configs(
+            'sábi(\\w) (.*)', '^hi', '(a)\\1', 'aa', '.*')
+        matcher = AutoreplyMatcher(autoreply_configs)
+
+        self.assertIs(matcher.match('sábia Lele'), autoreply_configs[0])
+        self.assertIs(matcher.match('hi'), autoreply_configs[1])
+        self.assertIs(matcher.match('aa'), autoreply_configs[2])
+        self.assertIs(matcher.match('ab'), autoreply_configs[4])
+
+    def test_match_ignores_invalid_regexes(self):
+        autoreply_configs = self._build_autoreply_configs('(hello', 'hello')
+        matcher = AutoreplyMatcher(autoreply_configs)
+
+        self.assertIs(matcher.match('hello'), autoreply_configs[1])
+
+    def test_match_regexes_with_inline_flags(self):
+        autoreply_configs = self._build_autoreply_configs('^hi', '(?i)hello', 'HELLO')
+        matcher = AutoreplyMatcher(autoreply_configs)
+
+        self.assertIs(matcher.match('HeLLo'), autoreply_configs[1])
+
+    def test_match_many_regexes(self):
+        autoreply_configs = self._build_autoreply_configs(*[f'^word{i}$' for i in range(120)])
+        matcher = AutoreplyMatcher(autoreply_configs, max_patterns_per_chunk=50)
+
+        for i in [0, 49, 50, 119]:
+            self.assertIs(matcher.match(f'word{i}'), autoreply_configs[i])
+        self.assertIsNone(matcher.match('word120'))
@@ -0,0 +1,60 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from bot.chess.board_cache import BoardImageCache
+
+
+class TestBoardImageCache(TestCase):
+
+    def test_get_miss(self):
+        board_cache = BoardImageCache()
+
+        result = board_cache.get(('8/8/8/8/8/8/8/8', None, ('#fff',), None))
+
+        self.assertIsNone(result)
+        self.assertEqual(board_cache.stats()["misses"], 1)
+        self.assertEqual(board_cache.stats()["hits"], 0)
+
+    def test_get_hit(self):
+        board_cache = BoardImageCache()
+        key = ('8/8/8/8/8/8/8/8', 'e2e4', ('#fff',), 400)
+        board_cache.put(key, b'png')
+
+        result = board_cache.get(key)
+
+        self.assertEqual(result, b'png')
+        self.assertEqual(board_cache.stats()["hits"], 1)
+        self.assertEqual(board_cache.stats()["misses"], 0)
+
+    def test_put_evicts_least_recently_used(self):
+        board_cache = BoardImageCache(max_entries=2)
+        board_cache.put('a', b'1')
+        board_cache.put('b', b'2')
+        board_cache.get('a')
+        board_cache.put('c', b'3')
+
+        self.assertEqual(len(board_cache), 2)
+        self.assertEqual(board_cache.get('a'), b'1')
+        self.assertEqual(board_cache.get('c'), b'3')
+        self.assertIsNone(board_cache.get('b'))
+
+    def test_get_from_disk_after_eviction(self):
+        with TemporaryDirectory() as disk_path:
+            board_cache = BoardImageCache(max_entries=1, disk_path=disk_path)
+            board_cache.put('a', b'1')
+            board_cache.put('b', b'2')
+
+            result = board_cache.get('a')
+
+            self.assertEqual(result, b'1')
+            self.assertEqual(board_cache.stats()["disk_hits"], 1)
+            self.assertEqual(len(os.listdir(disk_path)), 2)
+
+    def test_get_from_disk_on_new_cache(self):
+        with TemporaryDirectory() as disk_path:
+            BoardImageCache(disk_path=disk_path).put('a', b'1')
+
+            result = BoardImageCache(disk_path=disk_path).get('a')
+
+            self.assertEqual(result, b'1')
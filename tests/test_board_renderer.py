@@ -0,0 +1,47 @@
+from io import BytesIO
+from unittest import TestCase
+
+import chess
+from imagehash import average_hash
+from PIL import Image
+
+from bot.chess.board_renderer import (BOARD_SIZE, PillowBoardRenderer,
+                                      SvgBoardRenderer, build_board_renderer)
+
+
+class TestBoardRenderer(TestCase):
+
+    colors = ("#ffffdd", "#86a666", "#96d6d4", "#4fa28e")
+
+    def test_build_board_renderer(self):
+        self.assertIsInstance(build_board_renderer('svg'), SvgBoardRenderer)
+        self.assertIsInstance(build_board_renderer('pillow'), PillowBoardRenderer)
+
+    def test_build_board_renderer_unknown_name(self):
+        with self.assertRaises(ValueError):
+            build_board_renderer('opengl')
+
+    def test_pillow_renderer_matches_svg_renderer(self):
+        board = chess.Board()
+        board.push_san('e4')
+        board.push_san('c5')
+        last_move = board.peek()
+
+        for size in [None, 200, 400]:
+            svg_image = Image.open(BytesIO(
+                SvgBoardRenderer().render(board, last_move, self.colors, size)))
+            pillow_image = Image.open(BytesIO(
+                PillowBoardRenderer().render(board, last_move, self.colors, size)))
+
+            self.assertEqual(pillow_image.size, svg_image.size)
+            self.assertEqual(pillow_image.size, (size or BOARD_SIZE, size or BOARD_SIZE))
+            self.assertEqual(average_hash(pillow_image), average_hash(svg_image))
+
+    def test_pillow_renderer_reuses_sprites(self):
+        board_renderer = PillowBoardRenderer()
+
+        board_renderer.render(chess.Board(), None, self.colors, 400)
+        board_renderer.render(chess.Board(), None, self.colors, 400)
+
+        self.assertEqual(len(board_renderer._empty_boards), 1)
+        self.assertEqual(len(board_renderer._piece_sprites), 12)
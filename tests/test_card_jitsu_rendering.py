@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dotenv import load_dotenv
+from PIL import Image
+
+from bot.card_jitsu.rendering import (CARD_SIZE, TURN_IMAGE_SIZE, CardSpriteAtlas,
+                                      TurnBackgroundCache, card_sprites, render_turn)
+
+
+class TestCardSpriteAtlas(TestCase):
+
+    def setUp(self):
+        self.cards_path = os.environ.get('CARD_JITSU_CARDS_BASE_PATH')
+        self.temp_dir = tempfile.mkdtemp()
+        os.environ['CARD_JITSU_CARDS_BASE_PATH'] = self.temp_dir
+        Image.new('RGB', (300, 330), '#2266aa').save(os.path.join(self.temp_dir, '1.png'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        if self.cards_path is None:
+            del os.environ['CARD_JITSU_CARDS_BASE_PATH']
+        else:
+            os.environ['CARD_JITSU_CARDS_BASE_PATH'] = self.cards_path
+
+    def test_card_is_resized_once(self):
+        card_sprites = CardSpriteAtlas()
+
+        result = card_sprites.card(1)
+
+        self.assertEqual(result.size, CARD_SIZE)
+        self.assertIs(card_sprites.card(1), result)
+
+    def test_card_grayscale(self):
+        card_sprites = CardSpriteAtlas()
+
+        result = card_sprites.card(1, grayscale=True)
+
+        self.assertEqual(result.size, CARD_SIZE)
+        self.assertEqual(result.mode, 'L')
+        self.assertIsNot(result, card_sprites.card(1))
+
+    def test_score_thumbnail(self):
+        card_sprites = CardSpriteAtlas()
+
+        low_value_result = card_sprites.score_thumbnail(1, 2)
+        high_value_result = card_sprites.score_thumbnail(1, 10)
+
+        self.assertEqual(low_value_result.size, (220, 220))
+        self.assertIsNot(low_value_result, high_value_result)
+        self.assertIs(card_sprites.score_thumbnail(1, 3), low_value_result)
+
+    def test_score_thumbnail_scale(self):
+        card_sprites = CardSpriteAtlas()
+
+        result = card_sprites.score_thumbnail(1, 2, scale=0.5)
+
+        self.assertEqual(result.size, (110, 110))
+        self.assertEqual(card_sprites.card(1, scale=0.5).size, (455, 512))
+
+    def test_load_missing_card(self):
+        card_sprites = CardSpriteAtlas()
+
+        with self.assertRaises(OSError):
+            card_sprites.load([(2, 3)])
+
+
+class TestRenderTurn(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_dotenv()
+
+    def setUp(self):
+        self.cards_path = os.environ.get('CARD_JITSU_CARDS_BASE_PATH')
+        self.temp_dir = tempfile.mkdtemp()
+        os.environ['CARD_JITSU_CARDS_BASE_PATH'] = self.temp_dir
+        for card_id in [1, 2, 3]:
+            Image.effect_noise((300, 330), 40).convert('RGB').save(os.path.join(self.temp_dir, f'{card_id}.png'))
+        with open(os.path.join('tests', 'support', 'user_avatar.png'), 'rb') as f:
+            self.avatar_bytes = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        if self.cards_path is None:
+            del os.environ['CARD_JITSU_CARDS_BASE_PATH']
+        else:
+            os.environ['CARD_JITSU_CARDS_BASE_PATH'] = self.cards_path
+
+    def test_render_turn_cached_background_matches_full_render(self):
+        scores = [
+            [[]],
+            [[(1, 3)]],
+            [[(1, 3), (2, 10)]],
+            [[(1, 3), (2, 10)], [(3, 2)]],
+            [[(3, 2)], [(1, 3), (2, 10), (1, 3)]],
+        ]
+        turn_backgrounds = TurnBackgroundCache()
+
+        for score in scores:
+            players = [self._player_info('User 1', score), self._player_info('User 2', [])]
+            cached_background = turn_backgrounds.get('game', players)
+            full_background = TurnBackgroundCache().get(None, players)
+
+            self.assertEqual(cached_background.tobytes(), full_background.tobytes())
+
+    def test_render_turn_cached_scaled_background_matches_full_render(self):
+        turn_backgrounds = TurnBackgroundCache()
+
+        for score in [[[(1, 3)]], [[(1, 3), (2, 10)]]]:
+            players = [self._player_info('User 1', score), self._player_info('User 2', [])]
+            cached_background = turn_backgrounds.get('game', players, 0.5)
+            full_background = TurnBackgroundCache().get(None, players, 0.5)
+
+            self.assertEqual(cached_background.size, (TURN_IMAGE_SIZE[0] // 2, TURN_IMAGE_SIZE[1] // 2))
+            self.assertEqual(cached_background.tobytes(), full_background.tobytes())
+
+    def test_render_turn_does_not_draw_on_sprites(self):
+        players = [self._player_info('User 1', [[(1, 3), (2, 10)]]), self._player_info('User 2', [[(3, 2)]])]
+        players[1]['card_id'] = 2
+        players[1]['lost'] = True
+        sprites = [
+            card_sprites.card(1), card_sprites.card(2, grayscale=True),
+            card_sprites.score_thumbnail(1, 3), card_sprites.score_thumbnail(2, 10), card_sprites.score_thumbnail(3, 2)
+        ]
+        sprites_bytes = [sprite.tobytes() for sprite in sprites]
+
+        render_turn(players, background_key='game')
+        render_turn(players, background_key='game')
+
+        self.assertEqual([sprite.tobytes() for sprite in sprites], sprites_bytes)
+
+    def test_render_turn_scale(self):
+        players = [self._player_info('User 1', [[(1, 3)]]), self._player_info('User 2', [])]
+
+        result = render_turn(players, scale=0.5)
+
+        self.assertEqual(Image.open(result).size, (TURN_IMAGE_SIZE[0] // 2, TURN_IMAGE_SIZE[1] // 2))
+
+    def _player_info(self, name, score):
+        return {"name": name, "avatar_bytes": self.avatar_bytes, "card_id": 1, "lost": False, "score": score}
@@ -7,10 +7,13 @@ from unittest import TestCase
 import chess
 from chess.engine import Cp, Mate
 from dotenv import load_dotenv
+from imagehash import average_hash
+from PIL import Image
 
 from bot.chess.chess import Chess
-from bot.chess.exceptions import (GameAlreadyInProgress, GameNotFound, 
-                                InvalidMove, MultipleGamesAtOnce, NoGamesWithPlayer)
+from bot.chess.exceptions import (GameAlreadyInProgress, GameNotFound, GifTooLarge,
+                                InvalidMove, MultipleGamesAtOnce, NoGamesWithPlayer,
+                                SequenceTooLong)
 from bot.chess.game import Game
 from bot.chess.player import Player
 from bot.models.chess_game import ChessGame
@@ -484,6 +487,40 @@ class TestChess(TestCase):
         self.assertEqual(game2.color_schema, expected[1].color_schema)
         self.assertEqual(game2.cpu_level, expected[1].cpu_level)
 
+    def test_save_game_appends_moves(self):
+        game = Game()
+        game.board = chess.Board()
+        game.board.push_san("e4")
+        game.player1 = FakeDiscordUser(id=1)
+        game.player2 = FakeDiscordUser(id=2)
+        asyncio.run(game.save())
+        game.board.push_san("e5")
+        game.board.push_san("Nf3")
+        asyncio.run(game.save())
+
+        chess_game = self.db_session.query(ChessGame).get(game.id)
+        self.assertEqual(chess_game.moves, 'e7e5 g1f3')
+        self.assertNotIn('e5', chess_game.pgn)
+        self.assertEqual(Game.from_chess_game_model(chess_game).board.move_stack, game.board.move_stack)
+
+    def test_save_game_rewrites_finished_game(self):
+        game = Game()
+        game.board = chess.Board()
+        game.board.push_san("f3")
+        game.player1 = FakeDiscordUser(id=1)
+        game.player2 = FakeDiscordUser(id=2)
+        asyncio.run(game.save())
+        game.board.push_san("e5")
+        game.board.push_san("g4")
+        game.board.push_san("Qh4#")
+        game.result = game.board.result()
+        asyncio.run(game.save())
+
+        chess_game = self.db_session.query(ChessGame).get(game.id)
+        self.assertIsNone(chess_game.moves)
+        self.assertIn('Qh4#', chess_game.pgn)
+        self.assertEqual(chess_game.result, -1)
+
     def test_generate_pgn(self):
         board = chess.Board()
         board.push_san("g4")
@@ -518,8 +555,10 @@ class TestChess(TestCase):
 
         image_bytesio = asyncio.run(chess_bot.get_all_boards_png())
 
-        with open(os.path.join('tests', 'support', 'get_all_boards_png_one_game.png'), 'rb') as f:
-            self.assertEqual(image_bytesio.read(), f.read())
+        image = Image.open(image_bytesio)
+        expected_hash = average_hash(Image.open(os.path.join('tests', 'support', 'get_all_boards_png_one_game.png')))
+        self.assertEqual(image.size, (1200, 1200))
+        self.assertEqual(average_hash(image), expected_hash)
 
     def test_get_all_boards_png_three_games(self):
         chess_bot = Chess()
@@ -549,8 +588,10 @@ class TestChess(TestCase):
         
         image_bytesio = asyncio.run(chess_bot.get_all_boards_png())
 
-        with open(os.path.join('tests', 'support', 'get_all_boards_png_three_games.png'), 'rb') as f:
-            self.assertEqual(image_bytesio.read(), f.read())
+        image = Image.open(image_bytesio)
+        expected_hash = average_hash(Image.open(os.path.join('tests', 'support', 'get_all_boards_png_three_games.png')))
+        self.assertEqual(image.size, (1200, 1200))
+        self.assertEqual(average_hash(image), expected_hash)
 
     def test_get_all_boards_png_no_twelve_games(self):
         chess_bot = Chess()
@@ -585,8 +626,10 @@ class TestChess(TestCase):
 
         image_bytesio = asyncio.run(chess_bot.get_all_boards_png())
 
-        with open(os.path.join('tests', 'support', 'get_all_boards_png_twelve_games.png'), 'rb') as f:
-            self.assertEqual(image_bytesio.read(), f.read())
+        image = Image.open(image_bytesio)
+        expected_hash = average_hash(Image.open(os.path.join('tests', 'support', 'get_all_boards_png_twelve_games.png')))
+        self.assertEqual(image.size, (1200, 1200))
+        self.assertEqual(average_hash(image), expected_hash)
 
     def test_get_all_boards_png_no_twelve_games_second_page(self):
         chess_bot = Chess()
@@ -621,9 +664,35 @@ class TestChess(TestCase):
 
         image_bytesio = asyncio.run(chess_bot.get_all_boards_png(page=2), debug=True)
 
-        with open(os.path.join('tests', 'support', 'get_all_boards_png_twelve_games_second_page.png'), 'rb') as f:
-            self.assertEqual(image_bytesio.read(), f.read())
+        image = Image.open(image_bytesio)
+        expected_hash = average_hash(Image.open(os.path.join('tests', 'support', 'get_all_boards_png_twelve_games_second_page.png')))
+        self.assertEqual(image.size, (1200, 1200))
+        self.assertEqual(average_hash(image), expected_hash)
     
+    def test_get_all_boards_png_caches_page_until_a_game_moves(self):
+        chess_bot = Chess()
+
+        board1 = chess.Board()
+        board1.push_san("e4")
+        game1 = Game()
+        game1.board = board1
+        chess_bot.games.append(game1)
+
+        board2 = chess.Board()
+        game2 = Game()
+        game2.board = board2
+        chess_bot.games.append(game2)
+
+        first_image = asyncio.run(chess_bot.get_all_boards_png()).read()
+        second_image = asyncio.run(chess_bot.get_all_boards_png()).read()
+        board2.push_san("e4")
+        third_image = asyncio.run(chess_bot.get_all_boards_png()).read()
+
+        self.assertEqual(first_image, second_image)
+        self.assertNotEqual(first_image, third_image)
+        self.assertEqual(chess_bot.mosaic_cache.stats()["hits"], 1)
+        self.assertEqual(chess_bot.mosaic_cache.stats()["misses"], 2)
+
     def test_get_all_boards_png_no_games_being_played(self):
         chess_bot = Chess()
 
@@ -805,8 +874,37 @@ class TestChess(TestCase):
 
         result = asyncio.run(chess_bot.build_animated_sequence_gif(game, 2, sequence))
 
-        with open(os.path.join('tests', 'support', 'build_animated_sequence_gif.gif'), 'rb') as f:
-            self.assertEqual(result.getvalue(), f.read())
+        image = Image.open(result)
+        expected_image = Image.open(os.path.join('tests', 'support', 'build_animated_sequence_gif.gif'))
+        self.assertEqual(image.n_frames, expected_image.n_frames)
+        self.assertEqual(image.info["duration"], 1000)
+        for frame in range(image.n_frames):
+            image.seek(frame)
+            expected_image.seek(frame)
+            self.assertEqual(image.size, expected_image.size)
+            self.assertEqual(average_hash(image.convert('RGB')), average_hash(expected_image.convert('RGB')))
+
+    def test_build_animated_sequence_gif_sequence_too_long(self):
+        board = chess.Board()
+        game = Game()
+        game.board = board
+
+        chess_bot = Chess()
+        chess_bot.gif_max_moves = 3
+
+        with self.assertRaises(SequenceTooLong):
+            asyncio.run(chess_bot.build_animated_sequence_gif(game, 0, ['e4', 'e5', 'Nf3', 'Nc6']))
+
+    def test_build_animated_sequence_gif_too_large(self):
+        board = chess.Board()
+        game = Game()
+        game.board = board
+
+        chess_bot = Chess()
+        chess_bot.gif_max_bytes = 1000
+
+        with self.assertRaises(GifTooLarge):
+            asyncio.run(chess_bot.build_animated_sequence_gif(game, 0, ['e4', 'e5', 'Nf3', 'Nc6']))
 
     def test_build_animated_sequence_gif_invalid_move_in_sequence(self):
         board = chess.Board()
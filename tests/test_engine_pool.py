@@ -0,0 +1,76 @@
+import asyncio
+import os
+from unittest import TestCase
+
+import chess
+import chess.engine
+from dotenv import load_dotenv
+
+from bot.chess.engine_pool import EnginePool
+from bot.chess.exceptions import EngineBusy
+
+
+class TestEnginePool(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        load_dotenv()
+
+    def setUp(self):
+        self.engine_path = os.environ.get("STOCKFISH_PATH_EXE", '')
+        if not self.engine_path:
+            self.skipTest("Stockfish is not enabled on this environment")
+
+    def test_play_reuses_engine(self):
+        engine_pool = EnginePool(self.engine_path, size=1)
+        limit = chess.engine.Limit(time=0.1)
+
+        async def play_twice():
+            try:
+                first_result = await engine_pool.play(chess.Board(), limit, options={'Skill level': 0})
+                first_engine = engine_pool._idle[0]
+                second_result = await engine_pool.play(chess.Board(), limit, options={'Skill level': 20})
+                second_engine = engine_pool._idle[0]
+                return first_result, second_result, first_engine is second_engine
+            finally:
+                await engine_pool.close()
+
+        first_result, second_result, same_engine = asyncio.run(play_twice())
+
+        self.assertIsInstance(first_result.move, chess.Move)
+        self.assertIsInstance(second_result.move, chess.Move)
+        self.assertTrue(same_engine)
+
+    def test_analyse_replaces_dead_engine(self):
+        engine_pool = EnginePool(self.engine_path, size=1)
+        limit = chess.engine.Limit(time=0.1)
+
+        async def analyse_after_crash():
+            try:
+                await engine_pool.analyse(chess.Board(), limit)
+                dead_engine = engine_pool._idle[0]
+                dead_engine.transport.kill()
+                await asyncio.shield(dead_engine.protocol.returncode)
+                result = await engine_pool.analyse(chess.Board(), limit)
+                return result, engine_pool._idle[0] is not dead_engine
+            finally:
+                await engine_pool.close()
+
+        result, replaced = asyncio.run(analyse_after_crash())
+
+        self.assertIn("score", result)
+        self.assertTrue(replaced)
+
+    def test_engine_queue_full(self):
+        engine_pool = EnginePool(self.engine_path, size=1, max_queue=0)
+
+        async def acquire_while_busy():
+            try:
+                async with engine_pool.engine():
+                    async with engine_pool.engine():
+                        pass
+            finally:
+                await engine_pool.close()
+
+        with self.assertRaises(EngineBusy):
+            asyncio.run(acquire_while_busy())
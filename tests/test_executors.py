@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+from math import factorial
+from unittest import TestCase
+
+from bot.misc.executors import (BLOCKING_IO, IMAGE_RENDERING, RENDERING_PROCESSES,
+                                NamedExecutor, get_executor, get_rendering_executor)
+from bot.utils import run_blocking_io_task, run_rendering_task
+
+
+class TestExecutors(TestCase):
+
+    def test_get_executor_reuses_executor(self):
+        self.assertIs(get_executor(BLOCKING_IO), get_executor(BLOCKING_IO))
+
+    def test_get_executor_unknown_name(self):
+        with self.assertRaises(KeyError):
+            get_executor('unknown')
+
+    def test_executor_limits_running_tasks(self):
+        executor = NamedExecutor('test', max_workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def task():
+            started.set()
+            release.wait(5)
+            return threading.current_thread().name
+
+        try:
+            first_future = executor.submit(task)
+            second_future = executor.submit(task)
+            started.wait(5)
+            stats = executor.stats()
+            release.set()
+            thread_names = {first_future.result(5), second_future.result(5)}
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(stats, {"max_workers": 1, "pending": 1, "active": 1, "completed": 0})
+        self.assertEqual(executor.stats()["completed"], 2)
+        self.assertEqual(len(thread_names), 1)
+        self.assertTrue(thread_names.pop().startswith('test'))
+
+    def test_executor_can_be_used_after_shutdown(self):
+        executor = NamedExecutor('test', max_workers=1)
+        executor.submit(int).result(5)
+        executor.shutdown()
+
+        try:
+            result = executor.submit(int, '42').result(5)
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(result, 42)
+
+    def test_process_executor_runs_tasks_on_other_process(self):
+        executor = NamedExecutor('test', max_workers=1, processes=True)
+
+        try:
+            result = executor.submit(factorial, 5).result(60)
+            worker_pid = executor.submit(os.getpid).result(60)
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(result, 120)
+        self.assertNotEqual(worker_pid, os.getpid())
+        self.assertEqual(executor.stats(), {"max_workers": 1, "pending": 0, "active": 0, "completed": 2})
+
+    def test_get_rendering_executor(self):
+        rendering_executor = os.environ.get("RENDERING_EXECUTOR")
+        try:
+            os.environ["RENDERING_EXECUTOR"] = 'threads'
+            self.assertIs(get_rendering_executor(), get_executor(IMAGE_RENDERING))
+            os.environ["RENDERING_EXECUTOR"] = 'processes'
+            self.assertIs(get_rendering_executor(), get_executor(RENDERING_PROCESSES))
+            self.assertTrue(get_rendering_executor().processes)
+            os.environ["RENDERING_EXECUTOR"] = 'gpu'
+            with self.assertRaises(ValueError):
+                get_rendering_executor()
+        finally:
+            if rendering_executor is None:
+                del os.environ["RENDERING_EXECUTOR"]
+            else:
+                os.environ["RENDERING_EXECUTOR"] = rendering_executor
+
+    def test_run_rendering_task(self):
+        result = asyncio.run(run_rendering_task(factorial, 4))
+
+        self.assertEqual(result, 24)
+
+    def test_run_blocking_io_task_decorator_forms(self):
+        @run_blocking_io_task
+        def default_executor():
+            return threading.current_thread().name
+
+        @run_blocking_io_task(executor='wiki_bot')
+        def named_executor():
+            return threading.current_thread().name
+
+        self.assertTrue(asyncio.run(default_executor()).startswith('blocking_io'))
+        self.assertTrue(asyncio.run(named_executor()).startswith('wiki_bot'))
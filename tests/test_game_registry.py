@@ -0,0 +1,138 @@
+import asyncio
+from unittest import TestCase
+
+import chess
+
+from bot.chess.game import Game
+from bot.chess.game_registry import GameRegistry
+from tests.support.fake_discord_user import FakeDiscordUser
+
+
+class TestGameRegistry(TestCase):
+
+    def _build_game(self, player1_id: int, player2_id: int, game_id: str=None) -> Game:
+        game = Game()
+        game.id = game_id
+        game.board = chess.Board()
+        game.player1 = FakeDiscordUser(id=player1_id)
+        game.player2 = FakeDiscordUser(id=player2_id)
+        game.current_player = game.player1
+        return game
+
+    def test_find_by_current_player(self):
+        game1 = self._build_game(1, 2)
+        game2 = self._build_game(3, 1)
+        game3 = self._build_game(1, 4)
+        games = GameRegistry([game1, game2, game3])
+
+        result = games.find_by_current_player(1)
+
+        self.assertEqual(len(result), 2)
+        self.assertIs(result[0], game1)
+        self.assertIs(result[1], game3)
+
+    def test_find_by_players(self):
+        game1 = self._build_game(1, 2)
+        game2 = self._build_game(2, 1)
+        game3 = self._build_game(1, 3)
+        games = GameRegistry([game1, game2, game3])
+
+        result = games.find_by_players(2, 1)
+
+        self.assertEqual(len(result), 2)
+        self.assertIs(result[0], game1)
+        self.assertIs(result[1], game2)
+
+    def test_get(self):
+        game = self._build_game(1, 2, game_id='a2b4')
+        games = GameRegistry([self._build_game(1, 3), game])
+
+        self.assertIs(games.get('a2b4'), game)
+        self.assertIsNone(games.get('c3d4'))
+
+    def test_set_current_player(self):
+        game = self._build_game(1, 2)
+        games = GameRegistry([game])
+
+        games.set_current_player(game, game.player2)
+
+        self.assertIs(game.current_player, game.player2)
+        self.assertEqual(games.find_by_current_player(1), [])
+        self.assertIs(games.find_by_current_player(2)[0], game)
+
+    def test_set_current_player_keeps_registration_order(self):
+        game1 = self._build_game(1, 2)
+        game2 = self._build_game(1, 2)
+        games = GameRegistry([game1, game2])
+
+        games.set_current_player(game1, game1.player2)
+        games.set_current_player(game1, game1.player1)
+
+        result = games.find_by_current_player(1)
+        self.assertIs(result[0], game1)
+        self.assertIs(result[1], game2)
+
+    def test_save_indexes_new_game_id(self):
+        game = self._build_game(1, 2)
+        games = GameRegistry([game])
+
+        async def save(force=False):
+            game.id = 'a2b4'
+        game.save = save
+        asyncio.run(games.save(game))
+
+        self.assertIs(games.get('a2b4'), game)
+
+    def test_remove(self):
+        game1 = self._build_game(1, 2, game_id='a2b4')
+        game2 = self._build_game(1, 3)
+        games = GameRegistry([game1, game2])
+
+        games.remove(game1)
+
+        self.assertEqual(len(games), 1)
+        self.assertNotIn(game1, games)
+        self.assertEqual(games.find_by_players(1, 2), [])
+        self.assertIsNone(games.get('a2b4'))
+        self.assertIs(games.find_by_current_player(1)[0], game2)
+
+    def test_remove_game_not_registered(self):
+        games = GameRegistry([self._build_game(1, 2)])
+
+        with self.assertRaises(ValueError):
+            games.remove(self._build_game(1, 3))
+
+    def test_remove_equal_game(self):
+        game = self._build_game(1, 2, game_id='a2b4')
+        games = GameRegistry([game])
+        equal_game = self._build_game(1, 2)
+
+        self.assertIn(equal_game, games)
+        games.remove(equal_game)
+
+        self.assertEqual(len(games), 0)
+        self.assertNotIn(game, games)
+        self.assertIsNone(games.get('a2b4'))
+
+    def test_duplicated_games(self):
+        game = self._build_game(1, 2)
+        games = GameRegistry()
+        games.append(game)
+        games.append(game)
+
+        games.remove(game)
+
+        self.assertEqual(len(games), 1)
+        self.assertIs(games.find_by_current_player(1)[0], game)
+
+    def test_behaves_like_list(self):
+        game1 = self._build_game(1, 2)
+        game2 = self._build_game(3, 4)
+        games = GameRegistry([game1, game2])
+
+        self.assertEqual(games, [game1, game2])
+        self.assertEqual(list(games), [game1, game2])
+        self.assertEqual(games[1:], [game2])
+        self.assertIn(game2, games)
+        self.assertTrue(games)
+        self.assertFalse(GameRegistry())
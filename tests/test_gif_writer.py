@@ -0,0 +1,91 @@
+from io import BytesIO
+from unittest import TestCase
+
+from PIL import Image, ImageDraw, ImageSequence
+
+from bot.chess.exceptions import GifTooLarge
+from bot.chess.gif_writer import GifSequenceWriter
+
+
+class TestGifSequenceWriter(TestCase):
+
+    def _build_frames(self, number_of_frames):
+        background = Image.new('RGB', (200, 200), "#f0d9b5")
+        background_draw = ImageDraw.Draw(background)
+        for x in range(0, 200, 25):
+            for y in range(0, 200, 25):
+                if (x + y) // 25 % 2:
+                    background_draw.rectangle((x, y, x + 24, y + 24), fill="#b58863")
+        frames = []
+        for index in range(number_of_frames):
+            frame = background.copy()
+            ImageDraw.Draw(frame).ellipse((index * 25, 50, index * 25 + 20, 70), fill="#000")
+            frames.append(frame)
+        return frames
+
+    def test_add_frame_writes_every_frame(self):
+        frames = self._build_frames(4) + self._build_frames(4)[-1:]
+        bytesio = BytesIO()
+        gif_writer = GifSequenceWriter(bytesio, colors=16, duration=500)
+
+        for frame in frames:
+            gif_writer.add_frame(frame)
+        gif_writer.close()
+
+        image = Image.open(BytesIO(bytesio.getvalue()))
+        self.assertEqual(image.n_frames, len(frames))
+        self.assertEqual(image.info["duration"], 500)
+        self.assertEqual(image.info["loop"], 0)
+        for gif_frame, frame in zip(ImageSequence.Iterator(image), frames):
+            self.assertEqual(gif_frame.size, frame.size)
+            self.assertEqual(list(gif_frame.convert('RGB').getdata()), list(frame.getdata()))
+
+    def test_add_frame_keeps_reserved_colors_missing_from_first_frame(self):
+        frames = self._build_frames(2)
+        ImageDraw.Draw(frames[1]).rectangle((25, 0, 49, 24), fill="#aaa23b")
+        ImageDraw.Draw(frames[1]).rectangle((50, 0, 74, 24), fill="#cdd16a")
+        bytesio = BytesIO()
+        gif_writer = GifSequenceWriter(
+            bytesio, colors=16, reserved_colors=["#f0d9b5", "#b58863", "#cdd16a", "#aaa23b", "#fff", "#000"])
+
+        for frame in frames:
+            gif_writer.add_frame(frame)
+        gif_writer.close()
+
+        image = Image.open(BytesIO(bytesio.getvalue()))
+        image.seek(1)
+        second_frame = image.convert('RGB')
+        self.assertEqual(second_frame.getpixel((30, 10)), (170, 162, 59))
+        self.assertEqual(second_frame.getpixel((60, 10)), (205, 209, 106))
+        self.assertEqual(second_frame.getpixel((5, 10)), (240, 217, 181))
+
+    def test_add_frame_writes_only_changed_region(self):
+        frames = self._build_frames(2)
+        first_frame_bytesio = BytesIO()
+        gif_writer = GifSequenceWriter(first_frame_bytesio)
+        gif_writer.add_frame(frames[0])
+        both_frames_bytesio = BytesIO()
+        gif_writer = GifSequenceWriter(both_frames_bytesio)
+        gif_writer.add_frame(frames[0])
+        gif_writer.add_frame(frames[1])
+
+        second_frame_size = len(both_frames_bytesio.getvalue()) - len(first_frame_bytesio.getvalue())
+
+        self.assertLess(second_frame_size, len(first_frame_bytesio.getvalue()) / 4)
+
+    def test_add_frame_raises_when_too_large(self):
+        gif_writer = GifSequenceWriter(BytesIO(), max_bytes=100)
+
+        with self.assertRaises(GifTooLarge):
+            gif_writer.add_frame(self._build_frames(1)[0])
+
+    def test_add_frame_raises_on_different_size(self):
+        gif_writer = GifSequenceWriter(BytesIO())
+        gif_writer.add_frame(self._build_frames(1)[0])
+
+        with self.assertRaises(ValueError):
+            gif_writer.add_frame(Image.new('RGB', (100, 100)))
+
+    def test_close_raises_without_frames(self):
+        with self.assertRaises(ValueError):
+            GifSequenceWriter(BytesIO()).close()
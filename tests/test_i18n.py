@@ -0,0 +1,44 @@
+import os
+from unittest import TestCase
+
+from bot import i18n as i18n_module
+from bot.i18n import i18n, preload, reload
+
+
+class TestI18n(TestCase):
+
+    def setUp(self):
+        if not os.path.isfile(os.path.join('bot', 'i18n', 'pt', 'LC_MESSAGES', 'base.mo')):
+            self.skipTest("Translations are not compiled on this environment")
+        i18n_module._catalogs.clear()
+
+    def test_i18n(self):
+        result = i18n("Arnaldo's Emporium", 'pt')
+
+        self.assertEqual(result, 'Empório do Arnaldo')
+
+    def test_i18n_loads_catalog_once(self):
+        i18n("Arnaldo's Emporium", 'pt')
+        catalog = i18n_module._catalogs['pt']
+
+        i18n("Become a planet's senator", 'pt')
+
+        self.assertIs(i18n_module._catalogs['pt'], catalog)
+
+    def test_i18n_language_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            i18n("Arnaldo's Emporium", 'xx')
+
+    def test_preload(self):
+        preload(['pt'])
+
+        self.assertIn('pt', i18n_module._catalogs)
+
+    def test_reload(self):
+        preload(['pt'])
+        catalog = i18n_module._catalogs['pt']
+
+        reload()
+
+        self.assertIsNot(i18n_module._catalogs['pt'], catalog)
+        self.assertEqual(i18n("Arnaldo's Emporium", 'pt'), 'Empório do Arnaldo')
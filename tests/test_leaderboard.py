@@ -3,6 +3,7 @@ import os
 import warnings
 
 from asyncio import run
+from io import BytesIO
 from imagehash import average_hash
 from PIL import Image
 from vcr_unittest import VCRTestCase
@@ -10,6 +11,24 @@ from vcr_unittest import VCRTestCase
 from bot.sww.leaderboard import Leaderboard
 
 
+SNAPSHOT_MEDALS = {
+    "dataUser": {
+        "User1": ["Medal1:1"],
+        "User2": ["Medal2:1"]
+    },
+    "dataMedal": {
+        "Medal1": {"title": "Medal description", "image_url": "some_url"},
+        "Medal2": {"title": "Other description", "image_url": "other_url"}
+    }
+}
+SNAPSHOT_MEDALS_POINTS = {
+    "Medal1": 50,
+    "Medal2": 100,
+    "DescontoInativo": {"usuários": [], "desconto": 0.8},
+    "DescontoAdmin": {"usuários": [], "desconto": 0.8}
+}
+
+
 class TestLeaderboard(VCRTestCase):
 
     @classmethod
@@ -204,3 +223,109 @@ class TestLeaderboard(VCRTestCase):
         actual = run(complete_flow(leaderboard_bot))
 
         self.assertIsNotNone(Image.open(actual))
+
+    def test_build_snapshot(self):
+        leaderboard_bot = Leaderboard()
+
+        actual = leaderboard_bot.build_snapshot(SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS)
+
+        self.assertEqual(actual.ranking, leaderboard_bot.build_leaderboard(SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS))
+        self.assertEqual(actual.rank_by_user, {'User2': 1, 'User1': 2})
+        self.assertEqual([medal['name'] for medal in actual.medals], ['Medal1', 'Medal2'])
+        self.assertEqual(actual.medals_by_name['Medal2'], {
+            'name': 'Medal2', 'text': 'Other description', 'image_url': 'other_url', 'points': 100
+        })
+
+    def test_get_snapshot_served_from_memory(self):
+        leaderboard_bot = Leaderboard()
+        calls = []
+        async def get():
+            calls.append(None)
+            return SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS
+        leaderboard_bot.get = get
+
+        async def get_snapshots():
+            return [await leaderboard_bot.get_snapshot() for _ in range(3)]
+
+        first, second, third = run(get_snapshots())
+
+        self.assertEqual(len(calls), 1)
+        self.assertIs(first, second)
+        self.assertIs(first, third)
+
+    def test_get_snapshot_stale_refreshed_in_background(self):
+        leaderboard_bot = Leaderboard()
+        async def get():
+            return SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS
+        leaderboard_bot.get = get
+
+        async def get_snapshots():
+            stale = await leaderboard_bot.get_snapshot()
+            stale.fetched_at -= leaderboard_bot.snapshot_ttl
+            served = await leaderboard_bot.get_snapshot()
+            await leaderboard_bot._refresh_task
+            return stale, served, await leaderboard_bot.get_snapshot()
+
+        stale, served, refreshed = run(get_snapshots())
+
+        self.assertIs(served, stale)
+        self.assertIsNot(refreshed, stale)
+        self.assertEqual(refreshed.ranking, stale.ranking)
+
+    def test_refresh_snapshot_failure_keeps_stale_snapshot(self):
+        leaderboard_bot = Leaderboard()
+        async def get():
+            raise Exception("Error parsing content")
+        leaderboard_bot.get = get
+        leaderboard_bot.snapshot = leaderboard_bot.build_snapshot(SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS)
+        stale = leaderboard_bot.snapshot
+
+        actual = run(leaderboard_bot.refresh_snapshot())
+
+        self.assertIs(actual, stale)
+        self.assertIs(leaderboard_bot.snapshot, stale)
+
+    def test_get_snapshot_failure_without_snapshot(self):
+        leaderboard_bot = Leaderboard()
+        async def get():
+            raise Exception("Error parsing content")
+        leaderboard_bot.get = get
+
+        with self.assertRaises(Exception):
+            run(leaderboard_bot.get_snapshot())
+
+    def test_draw_leaderboard_page_cached_by_snapshot_version(self):
+        leaderboard_bot = Leaderboard()
+        drawn_pages = []
+        async def draw_leaderboard(leaderboard, page):
+            drawn_pages.append(page)
+            return BytesIO(f'page {page}'.encode())
+        leaderboard_bot.draw_leaderboard = draw_leaderboard
+        snapshot = leaderboard_bot.build_snapshot(SNAPSHOT_MEDALS, SNAPSHOT_MEDALS_POINTS)
+        leaderboard_bot.snapshot = snapshot
+
+        first = run(leaderboard_bot.draw_leaderboard_page(snapshot, 1))
+        second = run(leaderboard_bot.draw_leaderboard_page(snapshot, 1))
+        snapshot.version += 1
+        leaderboard_bot.snapshot = snapshot
+        third = run(leaderboard_bot.draw_leaderboard_page(snapshot, 1))
+
+        self.assertEqual(drawn_pages, [1, 1])
+        self.assertEqual(first.getvalue(), b'page 1')
+        self.assertEqual(second.getvalue(), b'page 1')
+        self.assertEqual(third.getvalue(), b'page 1')
+
+    def test_refresh_snapshot_keeps_version_if_unchanged(self):
+        leaderboard_bot = Leaderboard()
+        medals_points = dict(SNAPSHOT_MEDALS_POINTS)
+        async def get():
+            return SNAPSHOT_MEDALS, medals_points
+        leaderboard_bot.get = get
+
+        first = run(leaderboard_bot.refresh_snapshot())
+        second = run(leaderboard_bot.refresh_snapshot())
+        medals_points['Medal1'] = 10
+        third = run(leaderboard_bot.refresh_snapshot())
+
+        self.assertEqual(first.version, second.version)
+        self.assertEqual(third.version, second.version + 1)
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import TestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+from bot.sww.medal_cache import MEDAL_SIZE, MedalImageCache
+
+
+class TestMedalImageCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.requests = []
+        self.active_requests = 0
+        self.max_active_requests = 0
+        bytesio = BytesIO()
+        Image.new('RGB', (100, 100), '#2266aa').save(bytesio, format='png')
+        self.image_bytes = bytesio.getvalue()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_bytes_downloads_once(self):
+        cache = MedalImageCache()
+
+        async def get_bytes(url):
+            results = await asyncio.gather(cache.get_bytes(url('/medal.png')), cache.get_bytes(url('/medal.png')))
+            return results + [await cache.get_bytes(url('/medal.png'))]
+
+        results = self._run(get_bytes)
+
+        self.assertEqual(results, [self.image_bytes] * 3)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_get_bytes_revalidates_with_etag(self):
+        cache = MedalImageCache(revalidate_after=0)
+
+        async def get_bytes_twice(url):
+            return [await cache.get_bytes(url('/medal.png')), await cache.get_bytes(url('/medal.png'))]
+
+        results = self._run(get_bytes_twice)
+
+        self.assertEqual(results, [self.image_bytes] * 2)
+        self.assertEqual(self.requests, [None, '"v1"'])
+        self.assertEqual((cache.downloads, cache.revalidations), (1, 1))
+
+    def test_get_bytes_reads_from_disk_after_restart(self):
+        async def get_bytes_before_and_after_restart(url):
+            await MedalImageCache(disk_path=self.temp_dir).get_bytes(url('/medal.png'))
+            return await MedalImageCache(disk_path=self.temp_dir).get_bytes(url('/medal.png'))
+
+        result = self._run(get_bytes_before_and_after_restart)
+
+        self.assertEqual(result, [self.image_bytes])
+        self.assertEqual(len(self.requests), 1)
+
+    def test_get_image(self):
+        cache = MedalImageCache()
+
+        result = self._run(lambda url: cache.get_image(url('/medal.png')))[0]
+
+        self.assertEqual(result.size, (MEDAL_SIZE, MEDAL_SIZE))
+        self.assertEqual(result.mode, 'RGBA')
+
+    def test_get_image_returns_image_which_can_be_drawn_on(self):
+        cache = MedalImageCache()
+
+        async def get_images(url):
+            first_result = await cache.get_image(url('/medal.png'))
+            first_result.paste((255, 0, 0, 255), (0, 0, MEDAL_SIZE, MEDAL_SIZE))
+            return [first_result, await cache.get_image(url('/medal.png'))]
+
+        first_result, second_result = self._run(get_images)
+
+        self.assertNotEqual(second_result.tobytes(), first_result.tobytes())
+        self.assertEqual(second_result.getpixel((0, 0)), (34, 102, 170, 255))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_prefetch_limits_concurrent_downloads(self):
+        cache = MedalImageCache(max_downloads=2)
+
+        self._run(lambda url: cache.prefetch([url(f'/medal{index}.png') for index in range(6)]))
+
+        self.assertEqual(len(self.requests), 6)
+        self.assertEqual(self.max_active_requests, 2)
+
+    def _run(self, coroutine_factory):
+        async def handler(request):
+            self.requests.append(request.headers.get('If-None-Match'))
+            self.active_requests += 1
+            self.max_active_requests = max(self.max_active_requests, self.active_requests)
+            await asyncio.sleep(0.05)
+            self.active_requests -= 1
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.Response(body=self.image_bytes, headers={'ETag': '"v1"'})
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/{name}', handler)
+            async with TestServer(app) as server:
+                result = await coroutine_factory(lambda path: str(server.make_url(path)))
+            return result if isinstance(result, list) else [result]
+
+        return asyncio.run(run())
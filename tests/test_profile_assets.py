@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from bot.social.profile_assets import BADGE_SIZE, ProfileAssetCache
+
+
+class TestProfileAssetCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.badge_path = os.path.join(self.temp_dir, 'badge.png')
+        shutil.copy(os.path.join('tests', 'support', 'badge1.png'), self.badge_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_badge_resizes_and_reuses_image(self):
+        cache = ProfileAssetCache()
+
+        first_result = cache.get_badge('item', self.badge_path)
+        second_result = cache.get_badge('item', self.badge_path)
+
+        self.assertEqual(first_result.size, BADGE_SIZE)
+        self.assertEqual(first_result.tobytes(), second_result.tobytes())
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_get_wallpaper_crops_image(self):
+        cache = ProfileAssetCache()
+
+        result = cache.get_wallpaper(
+            'item', os.path.join('tests', 'support', 'wallpaper.png'), (100, 50))
+
+        self.assertEqual(result.size, (100, 50))
+        self.assertEqual(result.mode, 'RGBA')
+
+    def test_get_wallpaper_returns_image_which_can_be_drawn_on(self):
+        cache = ProfileAssetCache()
+        wallpaper_path = os.path.join('tests', 'support', 'wallpaper.png')
+        first_result = cache.get_wallpaper('item', wallpaper_path, (100, 50))
+        expected_bytes = first_result.tobytes()
+
+        first_result.paste((255, 0, 0, 255), (0, 0, 100, 50))
+        second_result = cache.get_wallpaper('item', wallpaper_path, (100, 50))
+
+        self.assertEqual(second_result.tobytes(), expected_bytes)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_file_changed(self):
+        cache = ProfileAssetCache()
+        first_result = cache.get_badge('item', self.badge_path)
+        shutil.copy(os.path.join('tests', 'support', 'badge2.png'), self.badge_path)
+        os.utime(self.badge_path, ns=(0, 0))
+
+        second_result = cache.get_badge('item', self.badge_path)
+
+        self.assertIsNot(first_result, second_result)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_missing_file(self):
+        cache = ProfileAssetCache()
+
+        result = cache.get_badge('item', os.path.join(self.temp_dir, 'missing.png'))
+
+        self.assertIsNone(result)
+
+    def test_evicts_least_recently_used_image_over_memory_limit(self):
+        badge_bytes = BADGE_SIZE[0] * BADGE_SIZE[1] * 4
+        cache = ProfileAssetCache(max_bytes=badge_bytes * 2)
+        cache.get_badge('item1', self.badge_path)
+        cache.get_badge('item2', self.badge_path)
+        cache.get_badge('item1', self.badge_path)
+
+        cache.get_badge('item3', self.badge_path)
+
+        self.assertLessEqual(cache.stats()["bytes"], badge_bytes * 2)
+        cache.get_badge('item1', self.badge_path)
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_invalidate(self):
+        cache = ProfileAssetCache()
+        cache.get_badge('item', self.badge_path)
+
+        cache.invalidate('item')
+
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["bytes"], 0)
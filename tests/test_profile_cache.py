@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from bot.social.profile_cache import RenderedProfileCache
+
+
+class TestRenderedProfileCache(TestCase):
+
+    def test_get_cached_profile(self):
+        cache = RenderedProfileCache()
+        cache.put(14, 'pt', b'avatar', b'png', cache.generation(14))
+
+        result = cache.get(14, 'pt', b'avatar')
+
+        self.assertEqual(result, b'png')
+        self.assertEqual(cache.stats(), {"entries": 1, "hits": 1, "misses": 0})
+
+    def test_get_other_language_or_avatar(self):
+        cache = RenderedProfileCache()
+        cache.put(14, 'pt', b'avatar', b'png', cache.generation(14))
+
+        self.assertIsNone(cache.get(14, 'en', b'avatar'))
+        self.assertIsNone(cache.get(14, 'pt', b'new avatar'))
+
+    def test_invalidate(self):
+        cache = RenderedProfileCache()
+        cache.put(14, 'pt', b'avatar', b'png', cache.generation(14))
+        cache.put(14, 'en', b'avatar', b'png', cache.generation(14))
+        cache.put(15, 'pt', b'avatar', b'other png', cache.generation(15))
+
+        cache.invalidate(14)
+
+        self.assertIsNone(cache.get(14, 'pt', b'avatar'))
+        self.assertIsNone(cache.get(14, 'en', b'avatar'))
+        self.assertEqual(cache.get(15, 'pt', b'avatar'), b'other png')
+
+    def test_put_after_invalidation_is_ignored(self):
+        cache = RenderedProfileCache()
+        generation = cache.generation(14)
+        cache.invalidate(14)
+
+        cache.put(14, 'pt', b'avatar', b'stale png', generation)
+
+        self.assertIsNone(cache.get(14, 'pt', b'avatar'))
+
+    def test_evicts_least_recently_used_profile(self):
+        cache = RenderedProfileCache(max_entries=2)
+        cache.put(14, 'pt', b'avatar', b'png 14', 0)
+        cache.put(15, 'pt', b'avatar', b'png 15', 0)
+        cache.get(14, 'pt', b'avatar')
+
+        cache.put(16, 'pt', b'avatar', b'png 16', 0)
+
+        self.assertEqual(cache.get(14, 'pt', b'avatar'), b'png 14')
+        self.assertIsNone(cache.get(15, 'pt', b'avatar'))
+        cache.invalidate(15)
+        self.assertEqual(cache.stats()["entries"], 2)
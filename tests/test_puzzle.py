@@ -1,24 +1,68 @@
 import asyncio
+import time
+from unittest import TestCase
 
 from chess import Board
-from vcr_unittest import VCRTestCase
+from dotenv import load_dotenv
 
 from bot.chess.game import Game
-from bot.chess.puzzle import Puzzle
+from bot.chess.puzzle import ActivePuzzles, Puzzle
+from tests.factories.chess_puzzle_factory import ChessPuzzleFactory
+from tests.support.db_connection import clear_data, Session
 
 
-class TestPuzzle(VCRTestCase):
+class TestPuzzle(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_dotenv()
+
+    def tearDown(self):
+        clear_data(Session())
 
     def test_get_puzzle(self):
+        ChessPuzzleFactory(id='0000D')
+        Session().commit()
+        puzzle_bot = Puzzle()
+
+        async def get_random_puzzle():
+            puzzle_dict = await puzzle_bot.get_random_puzzle()
+            await puzzle_bot._prefetch_task
+            return puzzle_dict
+
+        actual = asyncio.run(get_random_puzzle())
+
+        self.assertEqual(actual["data"]["id"], '0000D')
+        self.assertEqual(actual["data"]["blunderMove"], 'g4+')
+        self.assertEqual(actual["data"]["fenBefore"], '8/7p/4p1p1/1p5k/8/PB4PK/2P2q1P/4R3 w - - 0 37')
+        self.assertEqual(actual["data"]["forcedLine"], ['Kg5', 'Rf1', 'Qxf1+', 'Kg3', 'Qf4+'])
+        self.assertEqual(len(puzzle_bot.prefetched_puzzles), puzzle_bot.prefetch_size)
+
+    def test_get_puzzle_no_puzzles(self):
         puzzle_bot = Puzzle()
 
         actual = asyncio.run(puzzle_bot.get_random_puzzle())
 
-        self.assertIn("data", actual)
-        self.assertIn("blunderMove", actual["data"])
-        self.assertIn("fenBefore", actual["data"])
-        self.assertIn("forcedLine", actual["data"])
-        self.assertIn("id", actual["data"])
+        self.assertIn("error", actual)
+
+    def test_get_puzzle_from_prefetched_puzzles(self):
+        puzzle_bot = Puzzle()
+        puzzle_bot.prefetch_size = 0
+        puzzle_bot.prefetched_puzzles.append({"data": {"id": "prefetched"}})
+
+        actual = asyncio.run(puzzle_bot.get_random_puzzle())
+
+        self.assertEqual(actual, {"data": {"id": "prefetched"}})
+        self.assertEqual(len(puzzle_bot.prefetched_puzzles), 0)
+
+    def test_build_puzzle(self):
+        puzzle_bot = Puzzle()
+        puzzle_dict = ChessPuzzleFactory.build(id='0000D').to_dict()
+
+        result = puzzle_bot.build_puzzle(puzzle_dict)
+
+        self.assertEqual(result["id"], '0000D')
+        self.assertEqual(result["correct_sequence"], ['Kg5', 'Rf1', 'Qxf1+', 'Kg3', 'Qf4+'])
+        self.assertIs(puzzle_bot.puzzles['0000D'], result)
 
     def test_validate_move_correct_san_move(self):
         puzzle_bot, puzzle_id = self._build_puzzle_bot_with_one_puzzle()
@@ -108,3 +152,31 @@ class TestPuzzle(VCRTestCase):
             }
         }
         return puzzle_bot, puzzle_id
+
+
+class TestActivePuzzles(TestCase):
+
+    def test_get_puzzle(self):
+        active_puzzles = ActivePuzzles()
+        active_puzzles['a'] = {"id": "a"}
+
+        self.assertEqual(active_puzzles['a'], {"id": "a"})
+        self.assertEqual(len(active_puzzles), 1)
+
+    def test_expired_puzzle_is_dropped(self):
+        active_puzzles = ActivePuzzles(ttl=0.05)
+        active_puzzles['a'] = {"id": "a"}
+        time.sleep(0.1)
+
+        with self.assertRaises(KeyError):
+            active_puzzles['a']
+        self.assertEqual(len(active_puzzles), 0)
+
+    def test_least_recently_used_puzzle_is_dropped(self):
+        active_puzzles = ActivePuzzles(max_entries=2)
+        active_puzzles['a'] = {"id": "a"}
+        active_puzzles['b'] = {"id": "b"}
+        active_puzzles['a']
+        active_puzzles['c'] = {"id": "c"}
+
+        self.assertEqual(list(active_puzzles), ['a', 'c'])
@@ -0,0 +1,33 @@
+import os
+from unittest import TestCase
+
+from bot.chess.puzzle_importer import parse_lichess_row, read_lichess_csv
+
+
+class TestPuzzleImporter(TestCase):
+
+    def test_parse_lichess_row(self):
+        row = ['0009B', 'r2qr1k1/b1p2ppp/pp4n1/P1P1p3/4P1n1/B2P2Pb/3NBP1P/RN1QR1K1 b - - 1 16',
+               'b6c5 e2g4 h3g4 d1g4', '1112', '74', '87', '569', 'advantage middlegame short']
+
+        result = parse_lichess_row(row)
+
+        self.assertEqual(result.id, '0009B')
+        self.assertEqual(result.blunder_move, 'bxc5')
+        self.assertEqual(result.forced_line, 'Bxg4 Bxg4 Qxg4')
+        self.assertEqual(result.rating, 1112)
+        self.assertEqual(result.themes, ['advantage', 'middlegame', 'short'])
+
+    def test_parse_lichess_row_illegal_move(self):
+        row = ['000aY', 'r4rk1/pp3ppp/2n1b3/q1pp2B1/8/P1Q2NP1/1PP1PP1P/2KR3R w - - 0 15',
+               'a1a8 d8d7', '1500', '75', '90', '100', 'mate']
+
+        with self.assertRaises(ValueError):
+            parse_lichess_row(row)
+
+    def test_read_lichess_csv_skips_header_and_invalid_rows(self):
+        result = list(read_lichess_csv(os.path.join('tests', 'support', 'lichess_puzzles.csv')))
+
+        self.assertEqual([puzzle.id for puzzle in result], ['0000D', '0009B'])
+        self.assertEqual(result[0].blunder_move, 'g4+')
+        self.assertEqual(result[0].forced_line, 'Kg5 Rf1 Qxf1+ Kg3 Qf4+')
@@ -9,6 +9,14 @@ from bot.servers.servers import Servers
 from tests.factories.server_config_factory import ServerConfigFactory
 from tests.factories.server_config_autoreply_factory import ServerConfigAutoreplyFactory
 from tests.support.db_connection import clear_data, Session
+from tests.support.fake_discord_user import FakeDiscordUser
+
+
+class FakeGuild():
+
+    def __init__(self, id, members_ids):
+        self.id = id
+        self.members = [FakeDiscordUser(id=member_id) for member_id in members_ids]
 
 
 class TestServers(TestCase):
@@ -20,6 +28,7 @@ class TestServers(TestCase):
     def setUp(self):
         self.test_session = Session()
         cache.server_configs = {}
+        cache.set_servers([])
     
     def tearDown(self):
         clear_data(self.test_session)
@@ -193,3 +202,54 @@ class TestServers(TestCase):
         result = server_config_autoreply.get_reply(message)
         
         self.assertEqual(result, 'Já ouviu a história de Darth Lele, a sábia?')
+
+    def test_get_user_language_most_common_server_language(self):
+        server_config_1 = ServerConfigFactory(language='pt')
+        server_config_2 = ServerConfigFactory(language='pt')
+        server_config_3 = ServerConfigFactory(language='en')
+        cache.server_configs = {
+            server_config.id: server_config
+            for server_config in [server_config_1, server_config_2, server_config_3]
+        }
+        cache.set_servers([
+            FakeGuild(server_config_1.id, [1, 2]),
+            FakeGuild(server_config_2.id, [1]),
+            FakeGuild(server_config_3.id, [1, 2])
+        ])
+
+        self.assertEqual(cache.get_user_language(1), 'pt')
+        self.assertIn(cache.get_user_language(2), ['pt', 'en'])
+        self.assertEqual(cache.get_user_language(3), 'en')
+
+    def test_get_user_language_after_membership_changes(self):
+        server_config_1 = ServerConfigFactory(language='pt')
+        server_config_2 = ServerConfigFactory(language='en')
+        cache.server_configs = {
+            server_config_1.id: server_config_1,
+            server_config_2.id: server_config_2
+        }
+        cache.set_servers([FakeGuild(server_config_1.id, [1])])
+        self.assertEqual(cache.get_user_language(1), 'pt')
+
+        cache.remove_member(1, server_config_1.id)
+        self.assertEqual(cache.get_user_language(1), 'en')
+
+        cache.add_server(FakeGuild(server_config_2.id, [1]))
+        self.assertEqual(cache.get_user_language(1), 'en')
+        self.assertEqual(cache.get_user_servers_ids(1), {server_config_2.id})
+
+        cache.add_member(1, server_config_1.id)
+        cache.add_member(1, 404)
+        cache.remove_server(FakeGuild(server_config_2.id, []))
+        self.assertEqual(cache.get_user_servers_ids(1), {server_config_1.id, 404})
+
+    def test_get_user_language_after_server_language_changes(self):
+        server_config = ServerConfigFactory(language='en')
+        self.test_session.commit()
+        cache.server_configs = {server_config.id: server_config}
+        cache.set_servers([FakeGuild(server_config.id, [1])])
+        self.assertEqual(cache.get_user_language(1), 'en')
+
+        asyncio.run(cache.update_config(server_config.id, language='pt'))
+
+        self.assertEqual(cache.get_user_language(1), 'pt')
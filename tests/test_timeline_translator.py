@@ -215,6 +215,44 @@ class TestTimelineTranslator(PywikibotTestCase):
         self.assertEqual(result, timeline_translator.page)
         self.assertEqual(result.text, expected_content)
     
+    def test_translate_table_only_changed_rows(self):
+        timeline_translator = TimelineTranslator()
+        table_contents = "! Year || Title\n|- class=\"novel\"\n| [[5 ABY]] || ''[[Aftermath]]''\n|- class=\"novel\"\n| [[0 BBY]] || ''[[Lost Stars]]''\n"
+        translated_texts = []
+        apply_translations = timeline_translator._apply_translations
+        def count_translations(text):
+            translated_texts.append(text)
+            return apply_translations(text)
+        timeline_translator._apply_translations = count_translations
+        
+        timeline_translator._translate_table(table_contents)
+        translated_texts.clear()
+        result = timeline_translator._translate_table(table_contents.replace('[[0 BBY]]', '[[1 BBY]]'))
+        
+        self.assertEqual(result, apply_translations(table_contents.replace('[[0 BBY]]', '[[1 BBY]]')))
+        self.assertEqual(translated_texts, ["|- class=\"novel\"\n| [[1 BBY]] || ''[[Lost Stars]]''\n"])
+    
+    def test_translate_table_rows_apart(self):
+        timeline_translator = TimelineTranslator()
+        
+        with open(os.path.join('tests', 'support', 'canon_media_timeline_wookiee.txt')) as f:
+            timeline_translator._original_content = f.read()
+        table_contents = str(timeline_translator._get_tags_from_wikitext(
+            timeline_translator._parse('original', timeline_translator._original_content), 'table')[1].contents)
+        
+        result = timeline_translator._translate_table(table_contents)
+        translated_texts = []
+        apply_translations = timeline_translator._apply_translations
+        def count_translations(text):
+            translated_texts.append(text)
+            return apply_translations(text)
+        timeline_translator._apply_translations = count_translations
+        second_result = timeline_translator._translate_table(table_contents)
+        
+        self.assertEqual(result, apply_translations(table_contents))
+        self.assertEqual(second_result, result)
+        self.assertEqual(translated_texts, [])
+    
     def test_translate_page_raises_when_there_are_missing_refs(self):
         timeline_translator = TimelineTranslator()
         
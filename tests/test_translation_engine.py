@@ -0,0 +1,75 @@
+import json
+import os
+import re
+from unittest import TestCase
+
+from bot.sww.timeline_translator import TimelineTranslator
+from bot.sww.translation_engine import TranslationEngine
+
+
+def apply_sequentially(rules, text):
+    for pattern, replacement in rules:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+class TestTranslationEngine(TestCase):
+
+    def test_translate_timeline_fixtures(self):
+        rules = TimelineTranslator._TRANSLATIONS
+        engine = TranslationEngine(rules)
+        texts = []
+        for fixture in ['sww', 'wookiee', 'translated']:
+            with open(os.path.join('tests', 'support', f'canon_media_timeline_{fixture}.txt')) as f:
+                texts.append(f.read())
+        with open(os.path.join('tests', 'support', 'canon_media_timeline_translated_references.json')) as f:
+            references = json.load(f)
+        texts += list(references.keys()) + list(references.values())
+
+        for text in texts:
+            self.assertEqual(engine.translate(text), apply_sequentially(rules, text))
+        self.assertLess(engine.passes_count, len(rules))
+
+    def test_translate_merges_independent_literal_rules(self):
+        rules = [
+            ("Novelization of", "Romantização de"),
+            (r'\bLost Stars\b', 'Estrelas Perdidas'),
+            (r'\(film\)', '(filme)'),
+        ]
+        engine = TranslationEngine(rules)
+        text = "Novelization of [[Lost Stars]] and [[Rogue One (film)]], not Lost Starship"
+
+        actual = engine.translate(text)
+
+        self.assertEqual(actual, apply_sequentially(rules, text))
+        self.assertEqual(engine.passes_count, 1)
+
+    def test_translate_keeps_order_of_dependent_rules(self):
+        rules = [
+            (r'\bAftermath\b', 'Marcas da Guerra'),
+            (r'\bMarcas da Guerra: Life Debt\b', 'Marcas da Guerra: Dívida de Honra'),
+            ("adaptation of", "adaptação de"),
+            ("Partial adaptation of", "Adaptação parcial de"),
+            (r'\[\[([0-9]+) BBY\]\]', r'[[\1 ABY]]'),
+            ("ABY", "DBY"),
+        ]
+        engine = TranslationEngine(rules)
+        text = "Partial adaptation of Aftermath: Life Debt, adaptation of [[4 BBY]] and [[4 ABY]]"
+
+        actual = engine.translate(text)
+
+        self.assertEqual(actual, apply_sequentially(rules, text))
+        self.assertEqual(engine.passes_count, 6)
+
+    def test_translate_regex_rules(self):
+        rules = [
+            (r'\bChapter (\d+): ', r'Capítulo \1: '),
+            (r'\bPart\b', 'Parte'),
+            (r'cellpadding="4" cellspacing="0" style=".*"', ''),
+        ]
+        engine = TranslationEngine(rules)
+        text = 'Chapter 3: Part of Subchapter 2: Parts\n{| cellpadding="4" cellspacing="0" style="width: 100%"'
+
+        actual = engine.translate(text)
+
+        self.assertEqual(actual, apply_sequentially(rules, text))
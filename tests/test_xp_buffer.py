@@ -0,0 +1,139 @@
+import asyncio
+from unittest import TestCase
+
+from dotenv import load_dotenv
+
+from bot.level.xp_buffer import XpBuffer
+from bot.models.user import User
+from bot.models.xp_point import XpPoint
+from tests.factories.xp_point_factory import XpPointFactory
+from tests.support.db_connection import clear_data, Session
+
+
+class TestXpBuffer(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        load_dotenv()
+
+    def setUp(self):
+        self.test_session = Session()
+
+    def tearDown(self):
+        clear_data(self.test_session)
+        self.test_session.close()
+
+    def test_get_loads_existing_xp_points(self):
+        xp_point = XpPointFactory(points=140, level=3)
+        self.test_session.commit()
+        xp_buffer = XpBuffer()
+
+        result = asyncio.run(xp_buffer.get(xp_point.user_id, xp_point.server_id))
+
+        self.assertEqual(result.points, 140)
+        self.assertEqual(result.level, 3)
+        self.assertIs(xp_buffer.get_cached(xp_point.user_id, xp_point.server_id), result)
+
+    def test_get_new_xp_points(self):
+        xp_buffer = XpBuffer()
+
+        result = asyncio.run(xp_buffer.get(14, 10))
+
+        self.assertEqual(result.user_id, 14)
+        self.assertEqual(result.server_id, 10)
+        self.assertEqual(result.points, 0)
+        self.assertEqual(result.level, 1)
+        self.assertEqual(self.test_session.query(XpPoint).count(), 0)
+
+    def test_mark_changed_does_not_write_until_flush(self):
+        xp_buffer = XpBuffer()
+
+        async def gain_xp():
+            xp_points = await xp_buffer.get(14, 10)
+            xp_points.points += 15
+            await xp_buffer.mark_changed(xp_points, 'Me')
+
+        asyncio.run(gain_xp())
+
+        self.assertEqual(xp_buffer.pending, 1)
+        self.assertEqual(self.test_session.query(XpPoint).count(), 0)
+
+        asyncio.run(xp_buffer.flush())
+        Session.remove()
+
+        self.assertEqual(xp_buffer.pending, 0)
+        self.assertEqual(self.test_session.query(XpPoint).get((14, 10)).points, 15)
+        self.assertEqual(self.test_session.query(User).get(14).name, 'Me')
+
+    def test_mark_changed_flushes_when_too_many_pending(self):
+        xp_buffer = XpBuffer(max_pending=2)
+
+        async def gain_xp(user_id):
+            xp_points = await xp_buffer.get(user_id, 10)
+            xp_points.points += 15
+            await xp_buffer.mark_changed(xp_points, f'User {user_id}')
+
+        asyncio.run(gain_xp(14))
+        self.assertEqual(self.test_session.query(XpPoint).count(), 0)
+
+        asyncio.run(gain_xp(15))
+
+        self.assertEqual(xp_buffer.pending, 0)
+        self.assertEqual(self.test_session.query(XpPoint).count(), 2)
+
+    def test_get_reads_again_expired_xp_points(self):
+        xp_point = XpPointFactory(points=140, level=3)
+        self.test_session.commit()
+        xp_buffer = XpBuffer(ttl=0)
+
+        first_result = asyncio.run(xp_buffer.get(xp_point.user_id, xp_point.server_id))
+        xp_point.points = 200
+        self.test_session.commit()
+        second_result = asyncio.run(xp_buffer.get(xp_point.user_id, xp_point.server_id))
+
+        self.assertEqual(first_result.points, 140)
+        self.assertEqual(second_result.points, 200)
+
+    def test_get_keeps_pending_expired_xp_points(self):
+        xp_point = XpPointFactory(points=140, level=3)
+        self.test_session.commit()
+        xp_buffer = XpBuffer(ttl=0)
+
+        async def gain_xp_twice():
+            xp_points = await xp_buffer.get(xp_point.user_id, xp_point.server_id)
+            xp_points.points += 15
+            xp_buffer.mark_pending(xp_points, 'Me')
+            return xp_points, await xp_buffer.get(xp_point.user_id, xp_point.server_id)
+
+        first_result, second_result = asyncio.run(gain_xp_twice())
+
+        self.assertIs(second_result, first_result)
+        self.assertEqual(second_result.points, 155)
+        self.assertEqual(xp_buffer.pending, 1)
+
+    def test_update_user_name_skips_stored_name(self):
+        xp_point = XpPointFactory(points=140, level=3)
+        self.test_session.commit()
+        xp_buffer = XpBuffer()
+
+        asyncio.run(xp_buffer.get(xp_point.user_id, xp_point.server_id))
+        xp_buffer.update_user_name(xp_point.user_id, xp_point.user.name)
+        xp_buffer.update_user_name(15, 'New user')
+
+        self.assertEqual(xp_buffer._pending_user_names, {15: 'New user'})
+        self.assertEqual(xp_buffer.pending, 0)
+
+    def test_get_drops_least_recently_used_xp_points(self):
+        xp_buffer = XpBuffer(max_entries=2)
+
+        async def get_xp_points():
+            await xp_buffer.get(14, 10)
+            await xp_buffer.get(15, 10)
+            await xp_buffer.get(14, 10)
+            await xp_buffer.get(16, 10)
+
+        asyncio.run(get_xp_points())
+
+        self.assertIsNotNone(xp_buffer.get_cached(14, 10))
+        self.assertIsNone(xp_buffer.get_cached(15, 10))
+        self.assertIsNotNone(xp_buffer.get_cached(16, 10))